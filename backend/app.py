@@ -1,44 +1,268 @@
-from flask import Flask, request, jsonify
+import time
+# Startup is measured from here, before the framework and providers are imported
+STARTUP_BEGAN = time.perf_counter()
+
+from flask import Flask, request, jsonify, Response, stream_with_context, g  # noqa: E402
 from flask_cors import CORS
-from openai import OpenAI
 from config import Config
+from context_pipeline import ContextPipeline
+from cache import TTLCache
+from sessions import create_session_store, DEFAULT_SESSION_ID
+from prompt_builder import PromptBuilder
+from intent_router import IntentRouter
+from gazetteer import get_city_index, get_ticker_index
+from local_answers import LocalAnswerer
+from response_cache import ResponseCache
+from quotes import create_quote_provider
+from metrics import registry
+from resilience import Upstream
+from llm_scheduler import LLMScheduler, QueueTimeout, FALLBACK_RESPONSE
+from llm_routes import CompletionPolicy
+from watchlist import Watchlist
+from tts import create_tts_engine, SpeechSynthesizer, COMMON_PHRASES
+from stt import create_stt_engine, EnergyVAD, StreamingTranscriber
+from system_monitor import SystemSampler, format_system_info, describe_window
+from plugins import lazy_import, lazy_object, warm, plugin_stats
 import datetime
-import pytz
 import requests
 import os
 import subprocess
 import platform
-import psutil
-import yfinance as yf
 import json
 import shutil
+import threading
+from concurrent.futures import ThreadPoolExecutor
 
 app = Flask(__name__)
 CORS(app)
 
-# Configure OpenAI
-client = OpenAI(api_key=Config.OPENAI_API_KEY)
+openai = lazy_import('openai')
+pytz = lazy_import('pytz')
+
+# CoinGecko IDs for the crypto symbols we know by name
+CRYPTO_IDS = {
+    'BTC': 'bitcoin',
+    'ETH': 'ethereum',
+    'ADA': 'cardano',
+    'DOT': 'polkadot',
+    'LTC': 'litecoin',
+    'XRP': 'ripple',
+    'DOGE': 'dogecoin',
+    'SOL': 'solana',
+    'MATIC': 'matic-network',
+    'AVAX': 'avalanche-2'
+}
+
+# Seconds between SSE keep-alive comments on /prices/stream
+SSE_KEEPALIVE_SECONDS = 15
+
+# Spoken ahead of the error details when a completion call fails
+ERROR_RESPONSE = "I'm sorry, I'm having trouble processing that request."
+
+# Configure OpenAI (the client and its large SDK load with the first AI request)
+client = lazy_object('openai_client', lambda: openai.OpenAI(api_key=Config.OPENAI_API_KEY, base_url=Config.OPENAI_BASE_URL))
+
+def prefetched_context(context):
+    """A context provider that returns an already built context"""
+    return lambda route: context
 
 class JarvisAssistant:
     def __init__(self):
-        self.conversation_history = []
+        self.router = IntentRouter.from_file()
+        # Keep-alive connection pool shared by all upstream API calls
+        self.http = requests.Session()
+        self.http.mount('http://', requests.adapters.HTTPAdapter(pool_maxsize=Config.HTTP_POOL_SIZE))
+        self.http.mount('https://', requests.adapters.HTTPAdapter(pool_maxsize=Config.HTTP_POOL_SIZE))
+        self.sessions = create_session_store(
+            Config.SESSION_BACKEND,
+            path=Config.SESSION_DB_PATH,
+            max_messages=Config.SESSION_MAX_MESSAGES,
+            idle_timeout=Config.SESSION_IDLE_TIMEOUT,
+            max_sessions=Config.SESSION_MAX_SESSIONS
+        )
+        self.context_pipeline = ContextPipeline(
+            max_workers=Config.CONTEXT_MAX_WORKERS,
+            budget=Config.CONTEXT_BUDGET_SECONDS
+        )
+        # Upstream lookups shared by every user, each source with its own TTL
+        # Expired entries are kept as last-known-good data for STALE_DATA_TTL
+        self.caches = {
+            'weather': TTLCache(Config.WEATHER_CACHE_TTL, Config.CACHE_MAX_SIZE, Config.STALE_DATA_TTL),
+            'stock': TTLCache(Config.STOCK_CACHE_TTL, Config.CACHE_MAX_SIZE, Config.STALE_DATA_TTL),
+            'crypto': TTLCache(Config.CRYPTO_CACHE_TTL, Config.CACHE_MAX_SIZE, Config.STALE_DATA_TTL),
+            'stock_details': TTLCache(Config.STOCK_DETAILS_CACHE_TTL, Config.CACHE_MAX_SIZE)
+        }
+        # Per-provider timeouts and circuit breakers, so an outage fails fast
+        self.upstreams = {
+            name: Upstream(
+                name,
+                connect_timeout=Config.UPSTREAM_CONNECT_TIMEOUT,
+                read_timeout=Config.UPSTREAM_READ_TIMEOUT,
+                failure_threshold=Config.BREAKER_FAILURE_THRESHOLD,
+                reset_timeout=Config.BREAKER_RESET_SECONDS,
+                hedge_percentile=Config.HEDGE_PERCENTILE
+            )
+            for name in ('weather', 'stock', 'crypto')
+        }
+        self.quote_provider = create_quote_provider(
+            Config.QUOTE_PROVIDER, path=Config.QUOTE_STATIC_PATH, timeout=Config.UPSTREAM_READ_TIMEOUT
+        )
+        # Every OpenAI call is admitted here first, voice turns ahead of batch work
+        self.llm_scheduler = LLMScheduler(
+            max_concurrency=Config.LLM_MAX_CONCURRENCY,
+            requests_per_minute=Config.LLM_REQUESTS_PER_MINUTE,
+            tokens_per_minute=Config.LLM_TOKENS_PER_MINUTE,
+            deadlines={'interactive': Config.LLM_QUEUE_DEADLINE, 'batch': Config.LLM_BATCH_QUEUE_DEADLINE},
+            burst_seconds=Config.LLM_BURST_SECONDS
+        )
+        # Model, reply budget and instruction per kind of request (Config.LLM_ROUTES)
+        self.completion_policy = CompletionPolicy(
+            Config.LLM_ROUTES, Config.OPENAI_MODEL, enabled=Config.LLM_ROUTING_ENABLED
+        )
+        self.prompt_builder = PromptBuilder(
+            Config.ASSISTANT_PERSONALITY,
+            Config.OPENAI_MODEL,
+            history_budget=Config.HISTORY_TOKEN_BUDGET,
+            max_input_tokens=Config.MAX_INPUT_TOKENS,
+            summary_budget=Config.HISTORY_SUMMARY_TOKENS
+        )
+        self.system_sampler = SystemSampler(
+            interval=Config.SYSTEM_SAMPLE_INTERVAL,
+            history=Config.SYSTEM_SAMPLE_HISTORY
+        )
+        self.local_answerer = LocalAnswerer(
+            self.get_system_info, self.get_stock_data, self.get_crypto_data,
+            self.get_system_trend
+        )
+        self.prefetch_executor = ThreadPoolExecutor(max_workers=Config.PREFETCH_MAX_WORKERS, thread_name_prefix="prefetch")
+        self.prefetching = set()
+        self.prefetch_lock = threading.Lock()
+        # Load the gazetteers and start sampling in the background rather than on the first request
+        self.prefetch_executor.submit(get_city_index)
+        self.prefetch_executor.submit(get_ticker_index)
+        self.prefetch_executor.submit(self.system_sampler.start)
+        self.watchlist = None
+        if Config.WATCHLIST_ENABLED:
+            self.watchlist = Watchlist(
+                {'stock': self.fetch_stock_quotes, 'crypto': self.fetch_crypto_quotes},
+                self.store_quotes,
+                interval=Config.WATCHLIST_INTERVAL,
+                max_symbols=Config.WATCHLIST_MAX_SYMBOLS,
+                min_hits=Config.WATCHLIST_MIN_HITS,
+                idle_seconds=Config.WATCHLIST_IDLE_SECONDS
+            )
+            self.prefetch_executor.submit(self.start_watchlist)
+        if Config.WARM_START:
+            self.prefetch_executor.submit(warm)
+        self.response_cache = None
+        if Config.RESPONSE_CACHE_ENABLED:
+            self.response_cache = ResponseCache(
+                ttl=Config.RESPONSE_CACHE_TTL,
+                max_size=Config.RESPONSE_CACHE_MAX_SIZE,
+                threshold=Config.RESPONSE_CACHE_THRESHOLD
+            )
+        self.speech = None
+        tts_engine = create_tts_engine(Config.TTS_ENGINE, rate=Config.TTS_RATE)
+        if tts_engine is not None:
+            self.speech = SpeechSynthesizer(
+                tts_engine,
+                cache_size=Config.TTS_CACHE_SIZE,
+                cache_ttl=Config.TTS_CACHE_TTL,
+                max_workers=Config.TTS_MAX_WORKERS
+            )
+            self.speech.warm(COMMON_PHRASES + [ERROR_RESPONSE])
+        self.stt_engine = create_stt_engine(Config.STT_ENGINE, model_path=Config.STT_MODEL_PATH)
+
+    def process_command(self, user_input, session_id=DEFAULT_SESSION_ID, metadata=None, priority='interactive'):
+        """Process user command and return appropriate response
 
-    def process_command(self, user_input):
-        """Process user command and return appropriate response"""
-        user_input_lower = user_input.lower().strip()
+        Per-request details (e.g. prompt token count, stage timings) are added
+        to metadata. priority is the LLM scheduler class ('batch' for /chat/batch).
+        """
+        with registry.span('route', metadata):
+            route = self.router.route(user_input)
 
         # Handle website opening commands
-        if "open" in user_input_lower and any(site in user_input_lower for site in ["youtube", "google", "github", "stackoverflow"]):
-            return self.handle_website_command(user_input_lower)
+        if self.is_website_command(route):
+            registry.inc('jarvis_responses_total', source='action')
+            return self.handle_website_command(route)
 
         # Handle system control commands that require direct action
-        if self.is_system_command(user_input_lower):
-            return self.handle_system_command(user_input_lower)
+        if self.is_system_command(route):
+            registry.inc('jarvis_responses_total', source='action')
+            with registry.span('action', metadata):
+                return self.handle_system_command(route)
+
+        # Answer simple time, date, price and system questions without the LLM
+        local_answer = self.answer_locally(user_input, route, session_id, metadata)
+        if local_answer:
+            return local_answer
 
         # Let OpenAI handle all other queries intelligently
-        return self.get_ai_response(user_input)
+        return self.get_ai_response(user_input, session_id, metadata, route, priority)
+
+    def stream_command(self, user_input, session_id=DEFAULT_SESSION_ID, metadata=None):
+        """Process user command, yielding response events as they become available"""
+        with registry.span('route', metadata):
+            route = self.router.route(user_input)
+
+        # Direct actions complete immediately, so they arrive as a single event
+        if self.is_website_command(route) or self.is_system_command(route):
+            response = self.process_command(user_input, session_id, metadata)
+            if isinstance(response, tuple):
+                message, url = response
+                yield {"type": "done", "response": message, "action": "open_website", "url": url}
+            else:
+                yield {"type": "done", "response": response}
+            return
+
+        local_answer = self.answer_locally(user_input, route, session_id, metadata)
+        if local_answer:
+            yield {"type": "done", "response": local_answer}
+            return
+
+        parts = []
+        for delta in self.stream_ai_response(user_input, session_id, metadata, route):
+            parts.append(delta)
+            yield {"type": "delta", "content": delta}
+        yield {"type": "done", "response": "".join(parts).strip()}
+
+    def answer_locally(self, user_input, route, session_id=DEFAULT_SESSION_ID, metadata=None):
+        """Answer from local data or the response cache, recording the turn in the session"""
+        details = None
+        if Config.LOCAL_ANSWERS_ENABLED:
+            with registry.span('local_answer', metadata):
+                result = self.local_answerer.answer(route)
+            if result:
+                intent, response = result
+                details = {'source': 'local', 'intent': intent}
+
+        if details is None and self.response_cache is not None:
+            with registry.span('response_cache', metadata):
+                cached = self.response_cache.lookup(route)
+            if cached:
+                response, similarity = cached
+                details = {'source': 'cache', 'similarity': similarity}
+
+        if details is None:
+            return None
+
+        registry.inc('jarvis_responses_total', source=details['source'])
+
+        self.sessions.append(
+            session_id,
+            {"role": "user", "content": user_input},
+            {"role": "assistant", "content": response}
+        )
+        if metadata is not None:
+            metadata.update(details)
+        return response
 
-    def handle_website_command(self, command):
+    def is_website_command(self, route):
+        """Check if command asks to open a known website"""
+        return route.has('open_website')
+
+    def handle_website_command(self, route):
         """Handle website opening commands"""
         websites = {
             "youtube": "https://youtube.com",
@@ -47,124 +271,105 @@ class JarvisAssistant:
             "stackoverflow": "https://stackoverflow.com"
         }
 
-        for site, url in websites.items():
-            if site in command:
-                return f"Opening {site.title()} for you", url
+        site = route.first('site')
+        if site in websites:
+            return f"Opening {site.title()} for you", websites[site]
 
         return "I'm not sure which website you'd like me to open"
 
-    def is_system_command(self, command):
+    def is_system_command(self, route):
         """Check if command requires direct system action"""
-        system_triggers = [
-            "create folder", "make folder", "new folder",
-            "open calculator", "open notepad", "open file manager",
-            "open application", "launch app", "start app"
-        ]
-        return any(trigger in command for trigger in system_triggers)
+        return route.has('create_folder', 'open_app')
 
-    def handle_system_command(self, command):
+    def handle_system_command(self, route):
         """Handle system control commands"""
         try:
             # Folder creation
-            if any(phrase in command for phrase in ["create folder", "make folder", "new folder"]):
-                # Extract folder name
-                folder_name = self.extract_folder_name(command)
+            if route.has('create_folder'):
+                folder_name = route.first('folder_name')
                 if folder_name:
                     return self.create_folder(folder_name)
                 else:
                     return "Please specify a folder name to create"
 
             # Application opening
-            elif any(phrase in command for phrase in ["open calculator", "open notepad", "open file manager"]):
-                if "calculator" in command:
-                    return self.open_application("calculator")
-                elif "notepad" in command:
-                    return self.open_application("notepad")
-                elif "file manager" in command:
-                    return self.open_application("file manager")
+            elif route.has('open_app'):
+                app_name = route.first('app')
+                if app_name in ["calculator", "notepad", "file manager"]:
+                    return self.open_application(app_name)
 
             return "I'm not sure how to handle that system command"
 
         except Exception as e:
             return f"Error executing system command: {str(e)}"
 
-    def extract_folder_name(self, command):
-        """Extract folder name from command"""
-        # Simple extraction - look for quoted names or names after "called"
-        if '"' in command:
-            start = command.find('"') + 1
-            end = command.find('"', start)
-            if end > start:
-                return command[start:end]
-
-        if "called" in command:
-            parts = command.split("called")
-            if len(parts) > 1:
-                return parts[1].strip().strip('"\'')
-
-        # Fallback: look for common patterns
-        words = command.split()
-        for i, word in enumerate(words):
-            if word in ["folder", "directory"] and i + 1 < len(words):
-                return words[i + 1].strip('"\'')
-
-        return None
-
-    def get_current_time_context(self):
-        """Get current time information for AI context"""
+    def get_current_time_context(self, route=None):
+        """Get current time information for AI context, for the cities the route mentions"""
         now_utc = datetime.datetime.now(pytz.UTC)
         local_time = datetime.datetime.now()
 
-        # Get times for major cities
-        timezones = {
-            'UTC': now_utc,
-            'Los Angeles': now_utc.astimezone(pytz.timezone('America/Los_Angeles')),
-            'New York': now_utc.astimezone(pytz.timezone('America/New_York')),
-            'London': now_utc.astimezone(pytz.timezone('Europe/London')),
-            'Tokyo': now_utc.astimezone(pytz.timezone('Asia/Tokyo')),
-            'Mumbai': now_utc.astimezone(pytz.timezone('Asia/Kolkata')),
-            'Sydney': now_utc.astimezone(pytz.timezone('Australia/Sydney'))
-        }
-
         time_context = f"Current time information (for reference):\n"
         time_context += f"Local time: {local_time.strftime('%I:%M %p, %A, %B %d, %Y')}\n"
         time_context += f"UTC: {now_utc.strftime('%I:%M %p, %A, %B %d, %Y')}\n"
 
-        for city, time_obj in timezones.items():
-            if city != 'UTC':
-                time_context += f"{city}: {time_obj.strftime('%I:%M %p, %A, %B %d, %Y')} ({time_obj.tzinfo.zone})\n"
+        cities = get_city_index()
+        for name in route.get('city') if route else []:
+            city = cities.lookup(name)
+            if city:
+                time_obj = now_utc.astimezone(pytz.timezone(city.timezone))
+                time_context += f"{city.name}: {time_obj.strftime('%I:%M %p, %A, %B %d, %Y')} ({city.timezone})\n"
 
         return time_context
 
+    def get_time_context(self, route):
+        """Get time context for time-related queries"""
+        if route.has('time'):
+            return self.get_current_time_context(route)
+        return None
+
     def get_weather_data(self, city):
         """Get current weather data for a city"""
-        if not Config.OPENWEATHER_API_KEY or Config.OPENWEATHER_API_KEY == "your_openweather_api_key_here":
+        key = city.strip().lower()
+        return self.with_stale('weather', key, self.caches['weather'].get_or_fetch(
+            key, lambda: self.fetch_weather_data(city)
+        ))
+
+    def with_stale(self, cache_name, key, value):
+        """Fall back to last-known-good data, flagged as stale, when a fetch failed"""
+        if value is not None:
+            return value
+        stale = self.caches[cache_name].get_stale(key)
+        if stale is None:
+            return None
+        value, age = stale
+        return {**value, 'stale': True, 'age_seconds': round(age)}
+
+    def with_stale_many(self, cache_name, keys, values):
+        """with_stale for a {key: value} batch result"""
+        for key in keys:
+            if key not in values:
+                value = self.with_stale(cache_name, key, None)
+                if value is not None:
+                    values[key] = value
+        return values
+
+    def describe_staleness(self, data):
+        """Note for data served from the last-known-good cache"""
+        if not data.get('stale'):
+            return ""
+        return f"(Live data unavailable; last known value from {describe_window(data['age_seconds'])} ago)\n"
+
+    def fetch_weather_data(self, city):
+        """Fetch current weather data for a city from OpenWeatherMap"""
+        weather_request = self.get_weather_request(city)
+        if not weather_request:
             return None
 
         try:
-            url = f"http://api.openweathermap.org/data/2.5/weather"
-            params = {
-                'q': city,
-                'appid': Config.OPENWEATHER_API_KEY,
-                'units': 'metric'  # Celsius
-            }
-
-            response = requests.get(url, params=params, timeout=5)
+            url, params = weather_request
+            response = self.upstreams['weather'].get(self.http, url, params)
             if response.status_code == 200:
-                data = response.json()
-
-                weather_info = {
-                    'city': data['name'],
-                    'country': data['sys']['country'],
-                    'temperature': data['main']['temp'],
-                    'feels_like': data['main']['feels_like'],
-                    'humidity': data['main']['humidity'],
-                    'description': data['weather'][0]['description'],
-                    'main': data['weather'][0]['main'],
-                    'wind_speed': data.get('wind', {}).get('speed', 'N/A')
-                }
-
-                return weather_info
+                return self.parse_weather_data(response.json())
             else:
                 return None
 
@@ -172,131 +377,206 @@ class JarvisAssistant:
             print(f"Weather API error: {e}")
             return None
 
-    def get_weather_context(self, user_input):
-        """Extract city from user input and get weather data"""
-        # Simple city extraction - you could make this more sophisticated
-        weather_keywords = ['weather', 'temperature', 'hot', 'cold', 'rain', 'sunny', 'cloudy']
-        if not any(keyword in user_input.lower() for keyword in weather_keywords):
+    def get_weather_request(self, city):
+        """OpenWeatherMap URL and query parameters for a city, or None without an API key"""
+        if not Config.OPENWEATHER_API_KEY or Config.OPENWEATHER_API_KEY == "your_openweather_api_key_here":
             return None
 
-        # Common city patterns
-        city_patterns = [
-            'weather in ', 'weather at ', 'temperature in ', 'temperature at ',
-            'hot in ', 'cold in ', 'rain in ', 'sunny in ', 'cloudy in '
-        ]
+        # Qualify known cities with their country, so "Portland" isn't a guess upstream
+        known = get_city_index().lookup(city)
+        url = f"{Config.OPENWEATHER_BASE_URL}/weather"
+        params = {
+            'q': f"{known.name},{known.country}" if known and known.country else city,
+            'appid': Config.OPENWEATHER_API_KEY,
+            'units': 'metric'  # Celsius
+        }
+        return url, params
+
+    def parse_weather_data(self, data):
+        """Extract the fields we use from an OpenWeatherMap response"""
+        return {
+            'city': data['name'],
+            'country': data['sys']['country'],
+            'temperature': data['main']['temp'],
+            'feels_like': data['main']['feels_like'],
+            'humidity': data['main']['humidity'],
+            'description': data['weather'][0]['description'],
+            'main': data['weather'][0]['main'],
+            'wind_speed': data.get('wind', {}).get('speed', 'N/A')
+        }
 
-        city = None
-        user_lower = user_input.lower()
-
-        for pattern in city_patterns:
-            if pattern in user_lower:
-                start_idx = user_lower.find(pattern) + len(pattern)
-                remaining = user_input[start_idx:].strip()
-                # Take the next word(s) as city name
-                city = remaining.split('?')[0].split('.')[0].strip()
-                break
-
-        # If no pattern found, try to extract city names from common cities
-        common_cities = [
-            'mumbai', 'delhi', 'bangalore', 'chennai', 'kolkata', 'hyderabad',
-            'london', 'paris', 'tokyo', 'new york', 'los angeles', 'chicago',
-            'sydney', 'melbourne', 'toronto', 'vancouver', 'dubai', 'singapore'
-        ]
+    def weather_city(self, route):
+        """The city a weather question is about: the one it names, else the configured default"""
+        return route.first('city') or Config.DEFAULT_CITY or None
 
-        if not city:
-            for common_city in common_cities:
-                if common_city in user_lower:
-                    city = common_city
-                    break
-
-        if city:
-            weather_data = self.get_weather_data(city)
-            if weather_data:
-                weather_context = f"\nCurrent weather in {weather_data['city']}, {weather_data['country']}:\n"
-                weather_context += f"Temperature: {weather_data['temperature']}°C (feels like {weather_data['feels_like']}°C)\n"
-                weather_context += f"Condition: {weather_data['description'].title()}\n"
-                weather_context += f"Humidity: {weather_data['humidity']}%\n"
-                weather_context += f"Wind Speed: {weather_data['wind_speed']} m/s\n"
-                return weather_context
+    def get_weather_context(self, route):
+        """Get weather data for the city mentioned in a weather query"""
+        if not route.has('weather'):
+            return None
 
-        return None
+        city = self.weather_city(route)
+        return self.describe_weather(self.get_weather_data(city)) if city else None
+
+    def describe_weather(self, weather_data):
+        """Prompt context for fetched weather data"""
+        if not weather_data:
+            return None
+        weather_context = f"\nCurrent weather in {weather_data['city']}, {weather_data['country']}:\n"
+        weather_context += f"Temperature: {weather_data['temperature']}°C (feels like {weather_data['feels_like']}°C)\n"
+        weather_context += f"Condition: {weather_data['description'].title()}\n"
+        weather_context += f"Humidity: {weather_data['humidity']}%\n"
+        weather_context += f"Wind Speed: {weather_data['wind_speed']} m/s\n"
+        weather_context += self.describe_staleness(weather_data)
+        return weather_context
 
     # ===== REAL-TIME DATA INTEGRATION =====
 
+    def start_watchlist(self):
+        """Seed the watchlist with the best-known stocks and coins and start refreshing"""
+        self.watchlist.seed('stock', list(get_ticker_index().companies)[:Config.WATCHLIST_SEED_SIZE])
+        self.watchlist.seed('crypto', list(CRYPTO_IDS)[:Config.WATCHLIST_SEED_SIZE])
+        self.watchlist.start()
+
+    def store_quotes(self, kind, quotes):
+        """Put watchlist quotes in the cache the request path reads"""
+        for symbol, data in quotes.items():
+            self.caches[kind].set(symbol, data)
+
+    def observe_symbols(self, kind, symbols):
+        if self.watchlist is not None:
+            self.watchlist.observe(kind, symbols)
+
     def get_stock_data(self, symbol):
         """Get current stock price data"""
+        self.observe_symbols('stock', [symbol.upper()])
+        return self.with_stale('stock', symbol.upper(), self.caches['stock'].get_or_fetch(
+            symbol.upper(), lambda: self.fetch_stock_data(symbol)
+        ))
+
+    def get_stock_quotes(self, symbols):
+        """Get price data for several stocks, fetching all cache misses at once"""
+        keys = [symbol.upper() for symbol in symbols]
+        self.observe_symbols('stock', keys)
+        return self.with_stale_many('stock', keys, self.caches['stock'].get_many_or_fetch(
+            keys, self.fetch_stock_quotes
+        ))
+
+    def fetch_stock_quotes(self, symbols):
+        """Fetch several stocks with a single quote provider call"""
         try:
-            stock = yf.Ticker(symbol.upper())
-            info = stock.info
-            hist = stock.history(period="1d")
+            quotes = self.upstreams['stock'].call(lambda: self.quote_provider.quotes(symbols))
+        except Exception as e:
+            print(f"Stock API error: {e}")
+            return {}
+        return {symbol: self.make_stock_data(quote) for symbol, quote in quotes.items()}
 
-            if hist.empty:
-                return None
+    def fetch_stock_data(self, symbol):
+        """Fetch current stock price data (price, previous close and currency only)"""
+        try:
+            quote = self.upstreams['stock'].call(lambda: self.quote_provider.quote(symbol.upper()))
+            return self.make_stock_data(quote) if quote else None
+        except Exception as e:
+            print(f"Stock API error: {e}")
+            return None
 
-            current_price = hist['Close'].iloc[-1]
-            prev_close = info.get('previousClose', current_price)
-            change = current_price - prev_close
-            change_percent = (change / prev_close) * 100 if prev_close else 0
+    def make_stock_data(self, quote):
+        """Stock data dict from a provider quote, with details if already cached"""
+        details = self.caches['stock_details'].get(quote['symbol']) or {}
+        change = quote['price'] - quote['previous_close']
+        change_percent = (change / quote['previous_close']) * 100 if quote['previous_close'] else 0
+        return {
+            'symbol': quote['symbol'],
+            'name': details.get('name') or self.get_stock_name(quote['symbol']),
+            'price': round(quote['price'], 2),
+            'change': round(change, 2),
+            'change_percent': round(change_percent, 2),
+            'currency': quote['currency'],
+            'market_cap': details.get('market_cap'),
+            'volume': quote['volume']
+        }
 
-            return {
-                'symbol': symbol.upper(),
-                'name': info.get('longName', symbol.upper()),
-                'price': round(current_price, 2),
-                'change': round(change, 2),
-                'change_percent': round(change_percent, 2),
-                'currency': info.get('currency', 'USD'),
-                'market_cap': info.get('marketCap'),
-                'volume': info.get('volume')
-            }
+    def get_stock_details(self, symbol):
+        """Get company name and market cap (slow upstream call, cached for long)"""
+        return self.caches['stock_details'].get_or_fetch(
+            symbol.upper(), lambda: self.fetch_stock_details(symbol.upper())
+        )
+
+    def fetch_stock_details(self, symbol):
+        try:
+            return self.upstreams['stock'].call(lambda: self.quote_provider.details(symbol))
         except Exception as e:
-            print(f"Stock API error: {e}")
+            print(f"Stock details error: {e}")
             return None
 
     def get_crypto_data(self, symbol):
-        """Get cryptocurrency data using free API"""
+        """Get cryptocurrency data"""
+        self.observe_symbols('crypto', [symbol.upper()])
+        return self.with_stale('crypto', symbol.upper(), self.caches['crypto'].get_or_fetch(
+            symbol.upper(), lambda: self.fetch_crypto_data(symbol)
+        ))
+
+    def fetch_crypto_data(self, symbol):
+        """Fetch cryptocurrency data using free API"""
+        return self.fetch_crypto_quotes([symbol.upper()]).get(symbol.upper())
+
+    def get_crypto_quotes(self, symbols):
+        """Get data for several cryptocurrencies, fetching all cache misses at once"""
+        keys = [symbol.upper() for symbol in symbols]
+        self.observe_symbols('crypto', keys)
+        return self.with_stale_many('crypto', keys, self.caches['crypto'].get_many_or_fetch(
+            keys, self.fetch_crypto_quotes
+        ))
+
+    def fetch_crypto_quotes(self, symbols):
+        """Fetch several cryptocurrencies with a single CoinGecko call"""
         try:
-            # Using CoinGecko free API (no key required)
-            url = f"https://api.coingecko.com/api/v3/simple/price"
-            params = {
-                'ids': self.get_crypto_id(symbol),
-                'vs_currencies': 'usd',
-                'include_24hr_change': 'true',
-                'include_market_cap': 'true'
-            }
-
-            response = requests.get(url, params=params, timeout=5)
+            url, params = self.get_crypto_request(*symbols)
+            response = self.upstreams['crypto'].get(self.http, url, params)
             if response.status_code == 200:
-                data = response.json()
-                crypto_id = self.get_crypto_id(symbol)
-
-                if crypto_id in data:
-                    crypto_info = data[crypto_id]
-                    return {
-                        'symbol': symbol.upper(),
-                        'price': crypto_info.get('usd', 0),
-                        'change_24h': crypto_info.get('usd_24h_change', 0),
-                        'market_cap': crypto_info.get('usd_market_cap', 0)
-                    }
-            return None
+                return self.parse_crypto_quotes(symbols, response.json())
+            return {}
         except Exception as e:
             print(f"Crypto API error: {e}")
+            return {}
+
+    def get_crypto_request(self, *symbols):
+        """CoinGecko URL and query parameters for one or more crypto symbols"""
+        # Using CoinGecko free API (no key required)
+        url = f"{Config.COINGECKO_BASE_URL}/simple/price"
+        params = {
+            'ids': ','.join(self.get_crypto_id(symbol) for symbol in symbols),
+            'vs_currencies': 'usd',
+            'include_24hr_change': 'true',
+            'include_market_cap': 'true'
+        }
+        return url, params
+
+    def parse_crypto_data(self, symbol, data):
+        """Extract the fields we use from a CoinGecko simple/price response"""
+        crypto_id = self.get_crypto_id(symbol)
+        if crypto_id not in data:
             return None
 
+        crypto_info = data[crypto_id]
+        return {
+            'symbol': symbol.upper(),
+            'price': crypto_info.get('usd', 0),
+            'change_24h': crypto_info.get('usd_24h_change', 0),
+            'market_cap': crypto_info.get('usd_market_cap', 0)
+        }
+
+    def parse_crypto_quotes(self, symbols, data):
+        """Split a multi-id CoinGecko response into {symbol: data}"""
+        quotes = {}
+        for symbol in symbols:
+            crypto_data = self.parse_crypto_data(symbol, data)
+            if crypto_data:
+                quotes[symbol.upper()] = crypto_data
+        return quotes
+
     def get_crypto_id(self, symbol):
         """Map crypto symbols to CoinGecko IDs"""
-        crypto_map = {
-            'BTC': 'bitcoin',
-            'ETH': 'ethereum',
-            'ADA': 'cardano',
-            'DOT': 'polkadot',
-            'LTC': 'litecoin',
-            'XRP': 'ripple',
-            'DOGE': 'dogecoin',
-            'SOL': 'solana',
-            'MATIC': 'matic-network',
-            'AVAX': 'avalanche-2'
-        }
-        return crypto_map.get(symbol.upper(), symbol.lower())
+        return CRYPTO_IDS.get(symbol.upper(), symbol.lower())
 
     def get_sports_data(self, team_name):
         """Get sports scores (using free API)"""
@@ -315,29 +595,18 @@ class JarvisAssistant:
     # ===== SYSTEM CONTROL FUNCTIONS =====
 
     def get_system_info(self):
-        """Get system information"""
+        """Get system information from the latest background sample"""
         try:
-            # Get system stats
-            cpu_percent = psutil.cpu_percent(interval=1)
-            memory = psutil.virtual_memory()
-            disk = psutil.disk_usage('/')
-
-            return {
-                'cpu_usage': f"{cpu_percent}%",
-                'memory_total': f"{memory.total // (1024**3)} GB",
-                'memory_used': f"{memory.used // (1024**3)} GB",
-                'memory_percent': f"{memory.percent}%",
-                'disk_total': f"{disk.total // (1024**3)} GB",
-                'disk_used': f"{disk.used // (1024**3)} GB",
-                'disk_free': f"{disk.free // (1024**3)} GB",
-                'disk_percent': f"{(disk.used/disk.total)*100:.1f}%",
-                'platform': platform.system(),
-                'platform_version': platform.version()
-            }
+            sample = self.system_sampler.latest() or self.system_sampler.collect()
+            return format_system_info(sample)
         except Exception as e:
             print(f"System info error: {e}")
             return None
 
+    def get_system_trend(self, seconds=None):
+        """Get CPU and memory usage statistics over a recent window"""
+        return self.system_sampler.trend(seconds)
+
     def create_folder(self, folder_name, path=None):
         """Create a new folder"""
         try:
@@ -395,54 +664,111 @@ class JarvisAssistant:
         except Exception as e:
             return f"Error opening application: {str(e)}"
 
+    # ===== SPECULATIVE PREFETCH =====
+
+    def get_prefetch_lookups(self, route):
+        """(name, callable) cache warm-ups for the data an utterance will need"""
+        lookups = []
+        # Interim transcripts often end mid-word, so only prefetch known cities
+        cities = [city for city in route.get('city') if self.router.is_known('city', city)]
+        if not cities and Config.DEFAULT_CITY:
+            cities = [Config.DEFAULT_CITY]
+        if route.has('weather') and cities:
+            lookups.append((f"weather:{cities[0]}", lambda: self.get_weather_data(cities[0])))
+
+        tickers = route.get('ticker')
+        if tickers and route.has('stock', 'compare'):
+            lookups.append((f"stock:{','.join(tickers)}", lambda: self.get_stock_quotes(tickers)))
+
+        cryptos = route.get('crypto')
+        if cryptos and route.has('crypto', 'stock', 'compare'):
+            lookups.append((f"crypto:{','.join(cryptos)}", lambda: self.get_crypto_quotes(cryptos)))
+        return lookups
+
+    def prefetch(self, text, session_id=DEFAULT_SESSION_ID):
+        """Start warming caches and the session prompt for an interim transcript
+
+        Returns the names of the lookups started; identical lookups already in
+        flight are skipped, so rapid interim results don't pile up.
+        """
+        with registry.span('prefetch_route'):
+            route = self.router.route(text)
+        lookups = self.get_prefetch_lookups(route)
+        lookups.append((f"prompt:{session_id}",
+                        lambda: self.prompt_builder.warm(self.sessions.get_history(session_id))))
+
+        started = []
+        with self.prefetch_lock:
+            for name, lookup in lookups:
+                if name in self.prefetching:
+                    continue
+                self.prefetching.add(name)
+                self.prefetch_executor.submit(self.run_prefetch, name, lookup)
+                started.append(name)
+        return started
+
+    def run_prefetch(self, name, lookup):
+        try:
+            lookup()
+        except Exception as e:
+            print(f"Prefetch error ({name}): {e}")
+        finally:
+            with self.prefetch_lock:
+                self.prefetching.discard(name)
+
     # ===== CONTEXT INTEGRATION METHODS =====
 
-    def get_realtime_data_context(self, user_input):
-        """Get real-time data context for stocks, crypto, sports"""
-        user_input_lower = user_input.lower()
-
-        # Stock price queries
-        stock_keywords = ['stock', 'price', 'share', 'ticker', 'market']
-        if any(keyword in user_input_lower for keyword in stock_keywords):
-            # Extract stock symbol
-            common_stocks = ['apple', 'aapl', 'google', 'googl', 'microsoft', 'msft',
-                           'tesla', 'tsla', 'amazon', 'amzn', 'meta', 'nvidia', 'nvda']
-
-            for stock in common_stocks:
-                if stock in user_input_lower:
-                    symbol = self.get_stock_symbol(stock)
-                    stock_data = self.get_stock_data(symbol)
-                    if stock_data:
-                        context = f"\nCurrent stock data for {stock_data['name']} ({stock_data['symbol']}):\n"
-                        context += f"Price: ${stock_data['price']} {stock_data['currency']}\n"
-                        context += f"Change: ${stock_data['change']} ({stock_data['change_percent']:+.2f}%)\n"
-                        if stock_data['market_cap']:
-                            context += f"Market Cap: ${stock_data['market_cap']:,}\n"
-                        return context
-
-        # Cryptocurrency queries
-        crypto_keywords = ['bitcoin', 'btc', 'ethereum', 'eth', 'crypto', 'cryptocurrency']
-        if any(keyword in user_input_lower for keyword in crypto_keywords):
-            for crypto in ['btc', 'eth', 'ada', 'sol', 'doge']:
-                if crypto in user_input_lower or self.get_crypto_name(crypto) in user_input_lower:
-                    crypto_data = self.get_crypto_data(crypto)
-                    if crypto_data:
-                        context = f"\nCurrent cryptocurrency data for {crypto_data['symbol']}:\n"
-                        context += f"Price: ${crypto_data['price']:,.2f} USD\n"
-                        context += f"24h Change: {crypto_data['change_24h']:+.2f}%\n"
-                        if crypto_data['market_cap']:
-                            context += f"Market Cap: ${crypto_data['market_cap']:,.0f}\n"
-                        return context
+    def wants_stock_quotes(self, route):
+        return bool(route.get('ticker')) and route.has('stock', 'compare')
 
-        return None
+    def wants_crypto_quotes(self, route):
+        return bool(route.get('crypto')) and route.has('crypto', 'stock', 'compare')
 
-    def get_system_context(self, user_input):
+    def get_realtime_data_context(self, route):
+        """Get real-time data context for stocks, crypto, sports"""
+        # Every mentioned ticker (and coin) in one upstream call
+        stock_quotes = self.get_stock_quotes(route.get('ticker')) if self.wants_stock_quotes(route) else {}
+        details = None
+        if stock_quotes and route.has('market_cap'):
+            details = {symbol: self.get_stock_details(symbol) for symbol in route.get('ticker')
+                       if symbol in stock_quotes}
+        crypto_quotes = self.get_crypto_quotes(route.get('crypto')) if self.wants_crypto_quotes(route) else {}
+        return self.describe_realtime_data(route, stock_quotes, crypto_quotes, details)
+
+    def describe_realtime_data(self, route, stock_quotes, crypto_quotes, details=None):
+        """Prompt context for fetched stock and crypto quotes (details: market caps by symbol)"""
+        context = ""
+
+        if self.wants_stock_quotes(route):
+            for symbol in route.get('ticker'):
+                stock_data = stock_quotes.get(symbol)
+                if stock_data and details is not None:
+                    stock_data = {**stock_data, 'market_cap': (details.get(symbol) or {}).get('market_cap')}
+                if stock_data:
+                    context += f"\nCurrent stock data for {stock_data['name']} ({stock_data['symbol']}):\n"
+                    context += f"Price: ${stock_data['price']} {stock_data['currency']}\n"
+                    context += f"Change: ${stock_data['change']} ({stock_data['change_percent']:+.2f}%)\n"
+                    if stock_data['market_cap']:
+                        context += f"Market Cap: ${stock_data['market_cap']:,}\n"
+                    context += self.describe_staleness(stock_data)
+
+        if self.wants_crypto_quotes(route):
+            for symbol in route.get('crypto'):
+                crypto_data = crypto_quotes.get(symbol)
+                if crypto_data:
+                    context += f"\nCurrent cryptocurrency data for {crypto_data['symbol']}:\n"
+                    context += f"Price: ${crypto_data['price']:,.2f} USD\n"
+                    context += f"24h Change: {crypto_data['change_24h']:+.2f}%\n"
+                    if crypto_data['market_cap']:
+                        context += f"Market Cap: ${crypto_data['market_cap']:,.0f}\n"
+                    context += self.describe_staleness(crypto_data)
+
+        return context or None
+
+    def get_system_context(self, route):
         """Get system information context"""
-        user_input_lower = user_input.lower()
-
         # System info queries
-        system_keywords = ['system', 'cpu', 'memory', 'ram', 'disk', 'storage', 'performance']
-        if any(keyword in user_input_lower for keyword in system_keywords):
+        if route.has('system_info'):
             system_info = self.get_system_info()
             if system_info:
                 context = f"\nCurrent system information:\n"
@@ -450,124 +776,554 @@ class JarvisAssistant:
                 context += f"Memory: {system_info['memory_used']}/{system_info['memory_total']} ({system_info['memory_percent']})\n"
                 context += f"Disk: {system_info['disk_used']}/{system_info['disk_total']} ({system_info['disk_percent']})\n"
                 context += f"Platform: {system_info['platform']}\n"
+                if system_info['top_processes']:
+                    top = ", ".join(f"{p['name']} ({p['cpu_percent']}% CPU)" for p in system_info['top_processes'])
+                    context += f"Top processes: {top}\n"
+                if route.has('trend'):
+                    trend = self.get_system_trend(route.first('window_seconds'))
+                    if trend:
+                        context += f"Over the last {describe_window(trend['window_seconds'])} ({trend['samples']} samples):\n"
+                        context += "CPU: min {min}%, avg {avg}%, max {max}%\n".format(**trend['cpu_percent'])
+                        context += "Memory: min {min}%, avg {avg}%, max {max}%\n".format(**trend['memory_percent'])
                 return context
 
         return None
 
     def get_stock_symbol(self, name):
         """Map company names to stock symbols"""
-        stock_map = {
-            'apple': 'AAPL',
-            'google': 'GOOGL',
-            'microsoft': 'MSFT',
-            'tesla': 'TSLA',
-            'amazon': 'AMZN',
-            'meta': 'META',
-            'nvidia': 'NVDA',
-            'netflix': 'NFLX',
-            'spotify': 'SPOT'
-        }
-        return stock_map.get(name.lower(), name.upper())
-
-    def get_crypto_name(self, symbol):
-        """Map crypto symbols to names"""
-        crypto_names = {
-            'btc': 'bitcoin',
-            'eth': 'ethereum',
-            'ada': 'cardano',
-            'sol': 'solana',
-            'doge': 'dogecoin'
-        }
-        return crypto_names.get(symbol.lower(), symbol)
+        return get_ticker_index().lookup(name) or name.upper()
 
-    def get_ai_response(self, user_input):
+    def get_stock_name(self, symbol):
+        """Map stock symbols back to company names (the symbol if unknown)"""
+        return get_ticker_index().name_of(symbol) or symbol.upper()
+
+    def create_transcriber(self):
+        """A StreamingTranscriber for one /audio stream, or None when STT is disabled"""
+        if self.stt_engine is None:
+            return None
+        return StreamingTranscriber(
+            self.stt_engine,
+            EnergyVAD(Config.STT_VAD_THRESHOLD, sample_rate=Config.STT_SAMPLE_RATE),
+            sample_rate=Config.STT_SAMPLE_RATE,
+            silence_ms=Config.STT_SILENCE_MS,
+            max_utterance_seconds=Config.STT_MAX_UTTERANCE_SECONDS,
+            partial_interval_ms=Config.STT_PARTIAL_INTERVAL_MS
+        )
+
+    def get_upstream_stats(self):
+        """Circuit breaker state and call counters for each data provider"""
+        return {name: upstream.stats() for name, upstream in self.upstreams.items()}
+
+    def get_cache_stats(self):
+        """Hit/miss counters for each upstream data cache"""
+        return {name: cache.stats() for name, cache in self.caches.items()}
+
+    def get_context_providers(self):
+        """Context providers run for every AI query, in prompt order"""
+        return [
+            ('time', self.get_time_context),
+            ('weather', self.get_weather_context),
+            ('realtime_data', self.get_realtime_data_context),
+            ('system', self.get_system_context)
+        ]
+
+    def build_context(self, route, metadata=None, prefetched=None):
+        """Run all context providers within the latency budget
+
+        prefetched maps provider names to contexts already built from data
+        fetched elsewhere (the async server), which are used instead of
+        running those providers again.
+        """
+        providers = self.get_context_providers()
+        if prefetched:
+            providers = [(name, prefetched_context(prefetched[name]) if name in prefetched else provider)
+                         for name, provider in providers]
+        with registry.span('context', metadata):
+            contexts, timings = self.context_pipeline.run(providers, route)
+
+        for name, timing in timings.items():
+            registry.observe('jarvis_context_provider_seconds', timing['ms'] / 1000,
+                             provider=name, status=timing['status'])
+            if metadata is not None:
+                metadata.setdefault('timings', {})[f"context.{name}"] = timing['ms']
+
+        slow = {name: t for name, t in timings.items() if t['status'] in ('timeout', 'error', 'busy')}
+        if slow:
+            print(f"Context providers dropped: {slow}")
+        return contexts, timings
+
+    def build_messages(self, user_input, session_id=DEFAULT_SESSION_ID, metadata=None, route=None,
+                       instruction=None, prefetched=None):
+        """Record the user turn and build the message list for OpenAI"""
+        route = route or self.router.route(user_input)
+
+        # Add user input to this session's history (the store keeps it bounded)
+        self.sessions.append(session_id, {"role": "user", "content": user_input})
+        history = self.sessions.get_history(session_id)
+
+        # Gather time, weather, real-time data and system context concurrently
+        contexts, timings = self.build_context(route, metadata, prefetched)
+        if instruction:
+            contexts = [*contexts, instruction]
+
+        # Trim history to the token budget behind the fixed personality prefix
+        with registry.span('prompt_build', metadata):
+            messages, prompt_tokens = self.prompt_builder.build(history, contexts)
+        if metadata is not None:
+            metadata['prompt_tokens'] = prompt_tokens
+        return messages
+
+    def select_completion(self, route, metadata=None):
+        """Completion route (model, reply budget, instruction) for the request's intents"""
+        completion = self.completion_policy.select(route)
+        if metadata is not None:
+            metadata['llm_route'] = completion.name
+        return completion
+
+    def get_completion_options(self, completion=None):
+        """Model settings for chat completion calls"""
+        return self.completion_policy.options(completion or self.completion_policy.fallback)
+
+    def llm_admission(self, messages, completion=None):
+        """Token estimate (prompt plus longest reply) for admitting a completion call"""
+        return self.prompt_builder.counter.count_messages(messages) + self.get_completion_options(completion)['max_tokens']
+
+    def llm_error_response(self, e):
+        """Reply for a failed completion call; a full queue or rate limit gets a spoken fallback"""
+        if getattr(e, 'status_code', None) == 429:
+            retry_after = getattr(getattr(e, 'response', None), 'headers', {}).get('retry-after')
+            try:
+                backoff = float(retry_after)
+            except (TypeError, ValueError):
+                backoff = Config.LLM_RATE_LIMIT_BACKOFF
+            self.llm_scheduler.pause(backoff)
+        elif not isinstance(e, QueueTimeout):
+            return f"{ERROR_RESPONSE} Error: {str(e)}"
+        registry.inc('jarvis_responses_total', source='fallback')
+        return FALLBACK_RESPONSE
+
+    def record_ai_response(self, route, session_id, ai_response, metadata=None, usage=None, completion=None):
+        """Add the AI reply to the session and response cache and note token usage"""
+        if self.response_cache is not None:
+            self.response_cache.store(route, ai_response)
+
+        registry.inc('jarvis_responses_total', source='llm')
+        if usage:
+            labels = {'route': completion.name} if completion else {}
+            registry.inc('jarvis_llm_tokens_total', usage.prompt_tokens, kind='prompt', **labels)
+            registry.inc('jarvis_llm_tokens_total', usage.completion_tokens, kind='completion', **labels)
+        if metadata is not None and usage:
+            metadata['prompt_tokens'] = usage.prompt_tokens
+            metadata['completion_tokens'] = usage.completion_tokens
+
+        # Add AI response to conversation history
+        self.sessions.append(session_id, {"role": "assistant", "content": ai_response})
+
+    def get_ai_response(self, user_input, session_id=DEFAULT_SESSION_ID, metadata=None, route=None,
+                        priority='interactive'):
         """Get response from OpenAI GPT"""
         try:
-            # Add user input to conversation history
-            self.conversation_history.append({"role": "user", "content": user_input})
-
-            # Keep conversation history manageable (last 10 messages)
-            if len(self.conversation_history) > 10:
-                self.conversation_history = self.conversation_history[-10:]
-
-            # Add current time context for time-related queries
-            enhanced_personality = Config.ASSISTANT_PERSONALITY
-            if any(keyword in user_input.lower() for keyword in ['time', 'date', 'when', 'what day']):
-                enhanced_personality += f"\n\n{self.get_current_time_context()}"
-
-            # Add weather context for weather-related queries
-            weather_context = self.get_weather_context(user_input)
-            if weather_context:
-                enhanced_personality += f"\n\n{weather_context}"
-
-            # Add real-time data context
-            data_context = self.get_realtime_data_context(user_input)
-            if data_context:
-                enhanced_personality += f"\n\n{data_context}"
-
-            # Add system context for system-related queries
-            system_context = self.get_system_context(user_input)
-            if system_context:
-                enhanced_personality += f"\n\n{system_context}"
-
-            # Create messages for OpenAI
-            messages = [
-                {"role": "system", "content": enhanced_personality}
-            ] + self.conversation_history
-
-            response = client.chat.completions.create(
-                model="gpt-3.5-turbo",
-                messages=messages,
-                max_tokens=150,
-                temperature=0.7
-            )
+            route = route or self.router.route(user_input)
+            completion = self.select_completion(route, metadata)
+            messages = self.build_messages(user_input, session_id, metadata, route, completion.instruction)
+
+            estimate = self.llm_admission(messages, completion)
+            with self.llm_scheduler.slot(priority, estimate, metadata):
+                start = time.perf_counter()
+                with registry.span('llm', metadata):
+                    response = client.chat.completions.create(
+                        messages=messages,
+                        **self.get_completion_options(completion)
+                    )
+                self.completion_policy.observe(completion, time.perf_counter() - start)
+            self.llm_scheduler.settle(estimate, getattr(response.usage, 'total_tokens', None))
 
             ai_response = response.choices[0].message.content.strip()
+            self.record_ai_response(route, session_id, ai_response, metadata, response.usage, completion)
+            return ai_response
 
-            # Add AI response to conversation history
-            self.conversation_history.append({"role": "assistant", "content": ai_response})
+        except Exception as e:
+            return self.llm_error_response(e)
 
-            return ai_response
+    def stream_ai_response(self, user_input, session_id=DEFAULT_SESSION_ID, metadata=None, route=None):
+        """Stream response deltas from OpenAI GPT as they arrive"""
+        try:
+            route = route or self.router.route(user_input)
+            completion = self.select_completion(route, metadata)
+            messages = self.build_messages(user_input, session_id, metadata, route, completion.instruction)
+
+            # The slot is held until the stream ends
+            estimate = self.llm_admission(messages, completion)
+            with self.llm_scheduler.slot('interactive', estimate, metadata):
+                start = time.perf_counter()
+                stream = client.chat.completions.create(
+                    messages=messages,
+                    stream=True,
+                    stream_options={"include_usage": True},
+                    **self.get_completion_options(completion)
+                )
+
+                parts = []
+                usage = None
+                for chunk in stream:
+                    # The last chunk carries token usage and no choices
+                    usage = getattr(chunk, 'usage', None) or usage
+                    if not chunk.choices:
+                        continue
+                    delta = chunk.choices[0].delta.content
+                    if delta:
+                        if not parts:
+                            registry.record('llm_first_token', time.perf_counter() - start, metadata)
+                        parts.append(delta)
+                        yield delta
+                elapsed = time.perf_counter() - start
+                registry.record('llm', elapsed, metadata)
+                self.completion_policy.observe(completion, elapsed)
+            self.llm_scheduler.settle(estimate, getattr(usage, 'total_tokens', None))
+
+            self.record_ai_response(route, session_id, "".join(parts).strip(), metadata, usage, completion)
 
         except Exception as e:
-            return f"I'm sorry, I'm having trouble processing that request. Error: {str(e)}"
+            yield self.llm_error_response(e)
 
 # Initialize Jarvis
 jarvis = JarvisAssistant()
+batch_executor = ThreadPoolExecutor(max_workers=Config.BATCH_MAX_WORKERS, thread_name_prefix="batch")
+STARTUP_SECONDS = time.perf_counter() - STARTUP_BEGAN
+registry.set('jarvis_startup_seconds', STARTUP_SECONDS)
 
 @app.route('/')
 def home():
     return jsonify({"message": "Jarvis AI Assistant Backend is running!"})
 
+# Requests carrying this header get a per-stage "timings" field (milliseconds)
+DEBUG_HEADER = 'X-Jarvis-Debug'
+
+def wants_timings(headers):
+    return headers.get(DEBUG_HEADER, '').lower() in ('1', 'true', 'yes')
+
+def chat_payload(response, metadata, include_timings=False):
+    """JSON body for a processed command"""
+    timings = metadata.pop('timings', None)
+
+    # Handle website opening commands
+    if isinstance(response, tuple):
+        message, url = response
+        payload = {
+            "response": message,
+            "action": "open_website",
+            "url": url,
+            "metadata": metadata
+        }
+    else:
+        payload = {"response": response, "metadata": metadata}
+
+    if include_timings:
+        payload["timings"] = timings or {}
+    return payload
+
+def encode_chat_payload(response, metadata, include_timings, encode):
+    """encode(payload) for a processed command, timed as the 'serialize' stage
+
+    The encoding can't contain its own duration, so when timings were asked
+    for the payload is encoded again with the 'serialize' time added.
+    """
+    payload = chat_payload(response, metadata, include_timings)
+    start = time.perf_counter()
+    body = encode(payload)
+    seconds = time.perf_counter() - start
+    # Not recorded into metadata, which is already part of the payload
+    registry.record('serialize', seconds)
+    if include_timings:
+        payload["timings"]["serialize"] = round(seconds * 1000, 1)
+        body = encode(payload)
+    return body
+
+def collect_assistant_metrics(metrics):
+    """Mirror cache and session stats into the metrics registry"""
+    for name, stats in jarvis.get_cache_stats().items():
+        for result in ('hits', 'misses', 'coalesced'):
+            metrics.set_counter('jarvis_cache_requests_total', stats[result], cache=name, result=result)
+        metrics.set('jarvis_cache_entries', stats['size'], cache=name)
+    metrics.set('jarvis_sessions', jarvis.sessions.count())
+    for name, stats in jarvis.get_upstream_stats().items():
+        metrics.set('jarvis_upstream_circuit_open', int(stats['state'] != 'closed'), provider=name)
+        for result in ('failures', 'rejected', 'hedges'):
+            metrics.set_counter('jarvis_upstream_events_total', stats[result], provider=name, event=result)
+    for name, _ in jarvis.get_context_providers():
+        metrics.set('jarvis_context_stragglers', jarvis.context_pipeline.stats().get(name, 0), provider=name)
+
+registry.add_collector(collect_assistant_metrics)
+
+@app.before_request
+def start_request_timer():
+    g.request_start = time.perf_counter()
+
+@app.after_request
+def record_request_metrics(response):
+    endpoint = request.endpoint or 'unknown'
+    registry.observe('jarvis_http_request_seconds', time.perf_counter() - g.request_start, endpoint=endpoint)
+    registry.inc('jarvis_http_requests_total', endpoint=endpoint, status=response.status_code)
+    return response
+
+def health_status(stt_websocket=False):
+    """Service status; stt_websocket tells clients whether the server accepts the /audio WebSocket"""
+    return {
+        "status": "healthy",
+        "assistant": Config.ASSISTANT_NAME,
+        "cache": jarvis.get_cache_stats(),
+        "sessions": jarvis.sessions.count(),
+        "response_cache": jarvis.response_cache.stats() if jarvis.response_cache else None,
+        "upstreams": jarvis.get_upstream_stats(),
+        "tts": Config.TTS_ENGINE if jarvis.speech else None,
+        "stt": Config.STT_ENGINE if jarvis.stt_engine else None,
+        "stt_websocket": stt_websocket,
+        "llm_scheduler": jarvis.llm_scheduler.stats(),
+        "watchlist": jarvis.watchlist.stats() if jarvis.watchlist else None,
+        "startup": startup_status()
+    }
+
+def startup_status():
+    """Time from import to ready, against STARTUP_BUDGET_SECONDS, and which plugins have loaded"""
+    return {
+        "seconds": round(STARTUP_SECONDS, 3),
+        "budget_seconds": Config.STARTUP_BUDGET_SECONDS,
+        "within_budget": STARTUP_SECONDS <= Config.STARTUP_BUDGET_SECONDS,
+        "warm_start": Config.WARM_START,
+        "plugins": plugin_stats()
+    }
+
+def read_batch(data):
+    """Parse a /chat/batch body into [(message, session_id)]
+
+    Items may be plain strings or {"message", "session_id"} objects.
+    """
+    items = data.get('messages') if isinstance(data, dict) else None
+    if not isinstance(items, list) or not items:
+        raise ValueError("No messages provided")
+    if len(items) > Config.BATCH_MAX_MESSAGES:
+        raise ValueError(f"At most {Config.BATCH_MAX_MESSAGES} messages per batch")
+
+    batch = []
+    for item in items:
+        if isinstance(item, dict):
+            batch.append((item.get('message', ''), item.get('session_id') or DEFAULT_SESSION_ID))
+        else:
+            batch.append((item if isinstance(item, str) else '', DEFAULT_SESSION_ID))
+    return batch
+
+def group_by_session(batch):
+    """Batch indexes per session, so each conversation stays in order"""
+    groups = {}
+    for index, (_, session_id) in enumerate(batch):
+        groups.setdefault(session_id, []).append(index)
+    return list(groups.values())
+
+def read_price_filter(args):
+    """{"stock": [...], "crypto": [...]} from ?stocks=AAPL,MSFT&crypto=BTC, or None for everything
+
+    Only known symbols are kept, at most WATCHLIST_MAX_STREAM_SYMBOLS of each
+    kind, since a subscriber's symbols are added to the shared watchlist.
+    """
+    if not args.get('stocks') and not args.get('crypto'):
+        return None
+    known = {'stock': get_ticker_index().companies, 'crypto': CRYPTO_IDS}
+    kinds = {}
+    for kind, param in (('stock', 'stocks'), ('crypto', 'crypto')):
+        symbols = dict.fromkeys(symbol.strip().upper() for symbol in args.get(param, '').split(','))
+        kinds[kind] = [symbol for symbol in symbols if symbol in known[kind]][:Config.WATCHLIST_MAX_STREAM_SYMBOLS]
+    return kinds
+
+def sse_event(name, data):
+    return f"event: {name}\ndata: {json.dumps(data)}\n\n"
+
+def read_audio_chunks(stream):
+    """Read an uploaded audio body in STT_CHUNK_BYTES pieces"""
+    while True:
+        chunk = stream.read(Config.STT_CHUNK_BYTES)
+        if not chunk:
+            return
+        yield chunk
+
+def audio_events(transcriber, chunks, session_id):
+    """Transcript events for PCM chunks, each final transcript followed by Jarvis's response"""
+    def with_responses(events):
+        for event in events:
+            yield event
+            if event["type"] == "final":
+                metadata = {}
+                response = jarvis.process_command(event["text"], session_id, metadata)
+                yield {"type": "response", **chat_payload(response, metadata)}
+
+    for chunk in chunks:
+        yield from with_responses(transcriber.feed(chunk))
+    yield from with_responses(transcriber.flush())
+
+def batch_result(user_message, response, metadata, include_timings=False):
+    if not user_message:
+        return {"error": "No message provided"}
+    return chat_payload(response, metadata, include_timings)
+
 @app.route('/chat', methods=['POST'])
 def chat():
     try:
         data = request.get_json()
         user_message = data.get('message', '')
+        session_id = data.get('session_id') or DEFAULT_SESSION_ID
 
         if not user_message:
             return jsonify({"error": "No message provided"}), 400
 
         # Process the command
-        response = jarvis.process_command(user_message)
-
-        # Handle website opening commands
-        if isinstance(response, tuple):
-            message, url = response
-            return jsonify({
-                "response": message,
-                "action": "open_website",
-                "url": url
-            })
-
-        return jsonify({"response": response})
+        metadata = {}
+        response = jarvis.process_command(user_message, session_id, metadata)
+        return encode_chat_payload(response, metadata, wants_timings(request.headers), jsonify)
 
     except Exception as e:
         return jsonify({"error": str(e)}), 500
 
+@app.route('/chat/stream', methods=['POST'])
+def chat_stream():
+    """Stream the response as newline-delimited JSON events"""
+    data = request.get_json(silent=True) or {}
+    user_message = data.get('message', '')
+    session_id = data.get('session_id') or DEFAULT_SESSION_ID
+
+    if not user_message:
+        return jsonify({"error": "No message provided"}), 400
+
+    include_timings = wants_timings(request.headers)
+    with_audio = bool(data.get('audio')) and jarvis.speech is not None
+
+    def generate():
+        try:
+            metadata = {}
+            events = jarvis.stream_command(user_message, session_id, metadata)
+            if with_audio:
+                events = jarvis.speech.with_audio(events)
+            for event in events:
+                if event["type"] == "done":
+                    timings = metadata.pop('timings', None)
+                    event["metadata"] = metadata
+                    if include_timings:
+                        event["timings"] = timings or {}
+                yield json.dumps(event) + "\n"
+        except Exception as e:
+            yield json.dumps({"type": "error", "error": str(e)}) + "\n"
+
+    return Response(stream_with_context(generate()), mimetype='application/x-ndjson')
+
+@app.route('/chat/batch', methods=['POST'])
+def chat_batch():
+    """Process several messages concurrently and return results in order"""
+    try:
+        batch = read_batch(request.get_json(silent=True))
+    except ValueError as e:
+        return jsonify({"error": str(e)}), 400
+
+    results = [None] * len(batch)
+    include_timings = wants_timings(request.headers)
+
+    def run_session(indexes):
+        for index in indexes:
+            user_message, session_id = batch[index]
+            try:
+                metadata = {}
+                response = jarvis.process_command(user_message, session_id, metadata, 'batch') if user_message else None
+                results[index] = batch_result(user_message, response, metadata, include_timings)
+            except Exception as e:
+                results[index] = {"error": str(e)}
+
+    for future in [batch_executor.submit(run_session, indexes) for indexes in group_by_session(batch)]:
+        future.result()
+
+    return jsonify({"results": results})
+
+@app.route('/prefetch', methods=['POST'])
+def prefetch():
+    """Warm caches from an interim transcript while the user is still speaking"""
+    data = request.get_json(silent=True) or {}
+    text = data.get('text', '')
+    session_id = data.get('session_id') or DEFAULT_SESSION_ID
+
+    if not text:
+        return jsonify({"error": "No text provided"}), 400
+    if not Config.PREFETCH_ENABLED:
+        return jsonify({"prefetching": []}), 202
+
+    return jsonify({"prefetching": jarvis.prefetch(text, session_id)}), 202
+
+@app.route('/audio', methods=['POST'])
+def audio():
+    """Transcribe a streamed (chunked) upload of raw PCM, answering each utterance
+
+    Responds with newline-delimited JSON: "partial" and "final" transcripts,
+    and a "response" event with the /chat payload after each final one.
+    """
+    session_id = request.args.get('session_id') or DEFAULT_SESSION_ID
+    transcriber = jarvis.create_transcriber()
+    if transcriber is None:
+        return jsonify({"error": "Server-side speech recognition is disabled (set STT_ENGINE)"}), 404
+
+    def generate():
+        try:
+            for event in audio_events(transcriber, read_audio_chunks(request.stream), session_id):
+                yield json.dumps(event) + "\n"
+        except Exception as e:
+            yield json.dumps({"type": "error", "error": str(e)}) + "\n"
+
+    return Response(stream_with_context(generate()), mimetype='application/x-ndjson')
+
+@app.route('/tts', methods=['POST'])
+def tts():
+    """Stream synthesized speech for arbitrary text as newline-delimited JSON audio events"""
+    data = request.get_json(silent=True) or {}
+    text = data.get('text', '')
+
+    if not text:
+        return jsonify({"error": "No text provided"}), 400
+    if jarvis.speech is None:
+        return jsonify({"error": "Server-side speech is disabled (set TTS_ENGINE)"}), 404
+
+    def generate():
+        for event in jarvis.speech.speak(text):
+            yield json.dumps(event) + "\n"
+
+    return Response(stream_with_context(generate()), mimetype='application/x-ndjson')
+
+@app.route('/metrics', methods=['GET'])
+def metrics():
+    """Latency histograms and counters in Prometheus text format"""
+    return Response(registry.render(), mimetype='text/plain; version=0.0.4')
+
+@app.route('/prices/stream', methods=['GET'])
+def prices_stream():
+    """Server-sent events with the latest prices of watched stocks and coins, then each change"""
+    if jarvis.watchlist is None:
+        return jsonify({"error": "Watchlist is disabled"}), 404
+    kinds = read_price_filter(request.args)
+
+    def generate():
+        wake = threading.Event()
+        subscription = jarvis.watchlist.subscribe(wake.set, kinds)
+        try:
+            yield sse_event('prices', jarvis.watchlist.current(subscription))
+            while True:
+                wake.wait(SSE_KEEPALIVE_SECONDS)
+                wake.clear()
+                if not subscription.updates:
+                    yield ": keep-alive\n\n"
+                while subscription.updates:
+                    yield sse_event('prices', subscription.updates.popleft())
+        finally:
+            jarvis.watchlist.unsubscribe(subscription)
+
+    return Response(stream_with_context(generate()), mimetype='text/event-stream',
+                    headers={'Cache-Control': 'no-cache', 'X-Accel-Buffering': 'no'})
+
 @app.route('/health', methods=['GET'])
 def health_check():
-    return jsonify({"status": "healthy", "assistant": Config.ASSISTANT_NAME})
+    return jsonify(health_status())
 
 if __name__ == '__main__':
     app.run(debug=Config.FLASK_DEBUG, host='0.0.0.0', port=5000)
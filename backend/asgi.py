@@ -0,0 +1,553 @@
+"""Async (ASGI) server for the Jarvis backend
+
+Serves the same JSON contract as the Flask app, but waits on upstream APIs
+and OpenAI without holding a worker thread per request. Run it with:
+
+    uvicorn asgi:app --host 0.0.0.0 --port 5000
+"""
+import asyncio
+import contextlib
+import functools
+import json
+import time
+
+import httpx
+from starlette.applications import Starlette
+from starlette.middleware import Middleware
+from starlette.middleware.cors import CORSMiddleware
+from starlette.responses import JSONResponse, PlainTextResponse, StreamingResponse
+from starlette.routing import Route, WebSocketRoute
+from starlette.websockets import WebSocketDisconnect
+
+from app import (jarvis, chat_payload, encode_chat_payload, health_status, read_batch, group_by_session,
+                 batch_result, wants_timings, read_price_filter, sse_event, SSE_KEEPALIVE_SECONDS)
+from config import Config
+from metrics import registry
+from plugins import lazy_import, lazy_object, is_loaded
+from sessions import DEFAULT_SESSION_ID
+
+openai = lazy_import('openai')
+
+
+class AsyncJarvis:
+    """Async front end to the shared JarvisAssistant
+
+    Upstream weather and crypto lookups use one pooled httpx client and fill
+    the same caches the sync side reads, sharing its per-provider circuit
+    breakers. The prompt's weather and market data context is built from
+    these results, so the sync context providers don't fetch (and wait for)
+    the same data again.
+    """
+
+    def __init__(self, assistant):
+        self.assistant = assistant
+        self.http = None
+        self.client = lazy_object('openai_async_client', lambda: openai.AsyncOpenAI(
+            api_key=Config.OPENAI_API_KEY, base_url=Config.OPENAI_BASE_URL
+        ))
+
+    async def start(self):
+        self.http = httpx.AsyncClient(
+            timeout=5,
+            limits=httpx.Limits(
+                max_connections=Config.HTTP_POOL_SIZE,
+                max_keepalive_connections=Config.HTTP_POOL_SIZE
+            )
+        )
+
+    async def close(self):
+        await self.http.aclose()
+        if is_loaded('openai_async_client'):
+            await self.client.close()
+
+    async def get_weather_data(self, city):
+        weather_request = self.assistant.get_weather_request(city)
+        if not weather_request:
+            return None
+        url, params = weather_request
+
+        async def fetch():
+            try:
+                response = await self.assistant.upstreams['weather'].get_async(self.http, url, params)
+                if response.status_code == 200:
+                    return self.assistant.parse_weather_data(response.json())
+            except Exception as e:
+                print(f"Weather API error: {e}")
+            return None
+
+        key = city.strip().lower()
+        value = await self.assistant.caches['weather'].get_or_fetch_async(key, fetch)
+        return self.assistant.with_stale('weather', key, value)
+
+    async def get_crypto_quotes(self, symbols):
+        async def fetch(missing):
+            try:
+                url, params = self.assistant.get_crypto_request(*missing)
+                response = await self.assistant.upstreams['crypto'].get_async(self.http, url, params)
+                if response.status_code == 200:
+                    return self.assistant.parse_crypto_quotes(missing, response.json())
+            except Exception as e:
+                print(f"Crypto API error: {e}")
+            return {}
+
+        keys = [symbol.upper() for symbol in symbols]
+        self.assistant.observe_symbols('crypto', keys)
+        values = await self.assistant.caches['crypto'].get_many_or_fetch_async(keys, fetch)
+        return self.assistant.with_stale_many('crypto', keys, values)
+
+    async def get_stock_quotes(self, symbols):
+        # yfinance has no async API, so it runs in a worker thread
+        return await asyncio.to_thread(self.assistant.get_stock_quotes, symbols)
+
+    async def get_stock_details(self, symbols):
+        return await asyncio.to_thread(lambda: {symbol: self.assistant.get_stock_details(symbol) for symbol in symbols})
+
+    async def prefetch(self, route):
+        """Fetch every upstream lookup the utterance needs within the context budget
+
+        Returns prompt contexts by provider name for the providers whose data
+        was fetched here; lookups still running at the deadline count as
+        missing and keep filling the caches in the background.
+        """
+        assistant = self.assistant
+        lookups = {}
+        city = assistant.weather_city(route)
+        if route.has('weather') and city:
+            lookups['weather'] = self.get_weather_data(city)
+        if assistant.wants_stock_quotes(route):
+            lookups['stock'] = self.get_stock_quotes(route.get('ticker'))
+            if route.has('market_cap'):
+                lookups['stock_details'] = self.get_stock_details(route.get('ticker'))
+        if assistant.wants_crypto_quotes(route):
+            lookups['crypto'] = self.get_crypto_quotes(route.get('crypto'))
+        if not lookups:
+            return {}
+
+        tasks = {name: asyncio.ensure_future(lookup) for name, lookup in lookups.items()}
+        await asyncio.wait(tasks.values(), timeout=Config.CONTEXT_BUDGET_SECONDS)
+        results = {name: task.result() for name, task in tasks.items()
+                   if task.done() and not task.cancelled() and task.exception() is None}
+
+        contexts = {}
+        if 'weather' in lookups:
+            contexts['weather'] = assistant.describe_weather(results.get('weather'))
+        if 'stock' in lookups or 'crypto' in lookups:
+            contexts['realtime_data'] = assistant.describe_realtime_data(
+                route, results.get('stock') or {}, results.get('crypto') or {}, results.get('stock_details')
+            )
+        return contexts
+
+    async def process_command(self, user_input, session_id=DEFAULT_SESSION_ID, metadata=None, priority='interactive'):
+        """Async counterpart of JarvisAssistant.process_command"""
+        with registry.span('route', metadata):
+            route = self.assistant.router.route(user_input)
+
+        if self.assistant.is_website_command(route):
+            registry.inc('jarvis_responses_total', source='action')
+            return self.assistant.handle_website_command(route)
+        if self.assistant.is_system_command(route):
+            registry.inc('jarvis_responses_total', source='action')
+            with registry.span('action', metadata):
+                return await asyncio.to_thread(self.assistant.handle_system_command, route)
+
+        with registry.span('prefetch', metadata):
+            prefetched = await self.prefetch(route)
+
+        local_answer = await asyncio.to_thread(
+            self.assistant.answer_locally, user_input, route, session_id, metadata
+        )
+        if local_answer:
+            return local_answer
+
+        return await self.get_ai_response(user_input, session_id, metadata, route, prefetched, priority)
+
+    async def stream_command(self, user_input, session_id=DEFAULT_SESSION_ID, metadata=None):
+        """Async counterpart of JarvisAssistant.stream_command"""
+        with registry.span('route', metadata):
+            route = self.assistant.router.route(user_input)
+
+        if self.assistant.is_website_command(route) or self.assistant.is_system_command(route):
+            response = await self.process_command(user_input, session_id, metadata)
+            yield {"type": "done", **chat_payload(response, metadata)}
+            return
+
+        with registry.span('prefetch', metadata):
+            prefetched = await self.prefetch(route)
+
+        local_answer = await asyncio.to_thread(
+            self.assistant.answer_locally, user_input, route, session_id, metadata
+        )
+        if local_answer:
+            yield {"type": "done", "response": local_answer}
+            return
+
+        parts = []
+        async for delta in self.stream_ai_response(user_input, session_id, metadata, route, prefetched):
+            parts.append(delta)
+            yield {"type": "delta", "content": delta}
+        yield {"type": "done", "response": "".join(parts).strip()}
+
+    async def get_ai_response(self, user_input, session_id=DEFAULT_SESSION_ID, metadata=None, route=None,
+                              prefetched=None, priority='interactive'):
+        """Get response from OpenAI GPT without blocking the event loop"""
+        try:
+            route = route or self.assistant.router.route(user_input)
+            completion = self.assistant.select_completion(route, metadata)
+            messages = await asyncio.to_thread(
+                self.assistant.build_messages, user_input, session_id, metadata, route, completion.instruction,
+                prefetched
+            )
+
+            scheduler = self.assistant.llm_scheduler
+            estimate = self.assistant.llm_admission(messages, completion)
+            async with scheduler.slot_async(priority, estimate, metadata):
+                start = time.perf_counter()
+                with registry.span('llm', metadata):
+                    response = await self.client.chat.completions.create(
+                        messages=messages,
+                        **self.assistant.get_completion_options(completion)
+                    )
+                self.assistant.completion_policy.observe(completion, time.perf_counter() - start)
+            scheduler.settle(estimate, getattr(response.usage, 'total_tokens', None))
+
+            ai_response = response.choices[0].message.content.strip()
+            self.assistant.record_ai_response(route, session_id, ai_response, metadata, response.usage, completion)
+            return ai_response
+
+        except Exception as e:
+            return self.assistant.llm_error_response(e)
+
+    async def stream_ai_response(self, user_input, session_id=DEFAULT_SESSION_ID, metadata=None, route=None,
+                                 prefetched=None):
+        """Stream response deltas from OpenAI GPT as they arrive"""
+        try:
+            route = route or self.assistant.router.route(user_input)
+            completion = self.assistant.select_completion(route, metadata)
+            messages = await asyncio.to_thread(
+                self.assistant.build_messages, user_input, session_id, metadata, route, completion.instruction,
+                prefetched
+            )
+
+            scheduler = self.assistant.llm_scheduler
+            estimate = self.assistant.llm_admission(messages, completion)
+            async with scheduler.slot_async('interactive', estimate, metadata):
+                start = time.perf_counter()
+                stream = await self.client.chat.completions.create(
+                    messages=messages,
+                    stream=True,
+                    stream_options={"include_usage": True},
+                    **self.assistant.get_completion_options(completion)
+                )
+
+                parts = []
+                usage = None
+                async for chunk in stream:
+                    # The last chunk carries token usage and no choices
+                    usage = getattr(chunk, 'usage', None) or usage
+                    if not chunk.choices:
+                        continue
+                    delta = chunk.choices[0].delta.content
+                    if delta:
+                        if not parts:
+                            registry.record('llm_first_token', time.perf_counter() - start, metadata)
+                        parts.append(delta)
+                        yield delta
+                elapsed = time.perf_counter() - start
+                registry.record('llm', elapsed, metadata)
+                self.assistant.completion_policy.observe(completion, elapsed)
+            scheduler.settle(estimate, getattr(usage, 'total_tokens', None))
+
+            self.assistant.record_ai_response(route, session_id, "".join(parts).strip(), metadata, usage, completion)
+
+        except Exception as e:
+            yield self.assistant.llm_error_response(e)
+
+
+async_jarvis = AsyncJarvis(jarvis)
+
+
+async def read_body(request):
+    """JSON request body as a dict, or {} when missing or malformed"""
+    try:
+        data = await request.json()
+    except Exception:
+        data = {}
+    return data if isinstance(data, dict) else {}
+
+
+async def read_message(request):
+    """Parse a chat request body into (message, session_id)"""
+    data = await read_body(request)
+    return data.get('message', ''), data.get('session_id') or DEFAULT_SESSION_ID
+
+
+def instrumented(handler):
+    """Record request latency and status for a route handler"""
+    @functools.wraps(handler)
+    async def wrapper(request):
+        start = time.perf_counter()
+        response = await handler(request)
+        registry.observe('jarvis_http_request_seconds', time.perf_counter() - start, endpoint=handler.__name__)
+        registry.inc('jarvis_http_requests_total', endpoint=handler.__name__, status=response.status_code)
+        return response
+    return wrapper
+
+
+async def home(request):
+    return JSONResponse({"message": "Jarvis AI Assistant Backend is running!"})
+
+
+async def chat(request):
+    try:
+        user_message, session_id = await read_message(request)
+
+        if not user_message:
+            return JSONResponse({"error": "No message provided"}, status_code=400)
+
+        metadata = {}
+        response = await async_jarvis.process_command(user_message, session_id, metadata)
+        return encode_chat_payload(response, metadata, wants_timings(request.headers), JSONResponse)
+
+    except Exception as e:
+        return JSONResponse({"error": str(e)}, status_code=500)
+
+
+async def chat_batch(request):
+    """Process several messages concurrently and return results in order"""
+    try:
+        data = await request.json()
+    except Exception:
+        data = None
+    try:
+        batch = read_batch(data)
+    except ValueError as e:
+        return JSONResponse({"error": str(e)}, status_code=400)
+
+    results = [None] * len(batch)
+    include_timings = wants_timings(request.headers)
+
+    async def run_session(indexes):
+        for index in indexes:
+            user_message, session_id = batch[index]
+            try:
+                metadata = {}
+                response = await async_jarvis.process_command(user_message, session_id, metadata, 'batch') if user_message else None
+                results[index] = batch_result(user_message, response, metadata, include_timings)
+            except Exception as e:
+                results[index] = {"error": str(e)}
+
+    await asyncio.gather(*(run_session(indexes) for indexes in group_by_session(batch)))
+    return JSONResponse({"results": results})
+
+
+async def chat_stream(request):
+    """Stream the response as newline-delimited JSON events"""
+    data = await read_body(request)
+    user_message = data.get('message', '')
+    session_id = data.get('session_id') or DEFAULT_SESSION_ID
+
+    if not user_message:
+        return JSONResponse({"error": "No message provided"}, status_code=400)
+
+    include_timings = wants_timings(request.headers)
+    with_audio = bool(data.get('audio')) and jarvis.speech is not None
+
+    async def generate():
+        try:
+            metadata = {}
+            events = async_jarvis.stream_command(user_message, session_id, metadata)
+            if with_audio:
+                events = jarvis.speech.with_audio_async(events)
+            async for event in events:
+                if event["type"] == "done":
+                    timings = metadata.pop('timings', None)
+                    event["metadata"] = metadata
+                    if include_timings:
+                        event["timings"] = timings or {}
+                yield json.dumps(event) + "\n"
+        except Exception as e:
+            yield json.dumps({"type": "error", "error": str(e)}) + "\n"
+
+    return StreamingResponse(generate(), media_type='application/x-ndjson')
+
+
+async def prefetch(request):
+    """Warm caches from an interim transcript while the user is still speaking"""
+    data = await read_body(request)
+    text = data.get('text', '')
+    session_id = data.get('session_id') or DEFAULT_SESSION_ID
+
+    if not text:
+        return JSONResponse({"error": "No text provided"}, status_code=400)
+    if not Config.PREFETCH_ENABLED:
+        return JSONResponse({"prefetching": []}, status_code=202)
+
+    # Only routes and queues the lookups, so it returns almost immediately
+    started = jarvis.prefetch(text, session_id)
+    return JSONResponse({"prefetching": started}, status_code=202)
+
+
+async def transcribe(transcriber, chunk, session_id):
+    """Transcript events for one PCM chunk (None ends the stream), plus Jarvis's responses"""
+    # Recognition is CPU-bound, so keep it off the event loop
+    if chunk is None:
+        events = await asyncio.to_thread(transcriber.flush)
+    else:
+        events = await asyncio.to_thread(transcriber.feed, chunk)
+
+    results = []
+    for event in events:
+        results.append(event)
+        if event["type"] == "final":
+            metadata = {}
+            response = await async_jarvis.process_command(event["text"], session_id, metadata)
+            results.append({"type": "response", **chat_payload(response, metadata)})
+    return results
+
+
+async def audio(request):
+    """Transcribe a streamed (chunked) upload of raw PCM, answering each utterance
+
+    The upload is transcribed chunk by chunk as it arrives, but the events are
+    sent once it ends: a streaming response would compete with the request
+    body for the ASGI receive channel. Use the /audio WebSocket for live
+    partial transcripts.
+    """
+    session_id = request.query_params.get('session_id') or DEFAULT_SESSION_ID
+    transcriber = jarvis.create_transcriber()
+    if transcriber is None:
+        return JSONResponse({"error": "Server-side speech recognition is disabled (set STT_ENGINE)"},
+                            status_code=404)
+
+    events = []
+    try:
+        async for body in request.stream():
+            for offset in range(0, len(body), Config.STT_CHUNK_BYTES):
+                events += await transcribe(transcriber, body[offset:offset + Config.STT_CHUNK_BYTES], session_id)
+        events += await transcribe(transcriber, None, session_id)
+    except Exception as e:
+        events.append({"type": "error", "error": str(e)})
+
+    return PlainTextResponse(''.join(json.dumps(event) + "\n" for event in events),
+                             media_type='application/x-ndjson')
+
+
+async def audio_socket(websocket):
+    """Transcribe binary PCM messages as they arrive; a {"type": "end"} text message ends the stream"""
+    session_id = websocket.query_params.get('session_id') or DEFAULT_SESSION_ID
+    await websocket.accept()
+    transcriber = jarvis.create_transcriber()
+    if transcriber is None:
+        await websocket.send_json({"type": "error", "error": "Server-side speech recognition is disabled (set STT_ENGINE)"})
+        await websocket.close()
+        return
+
+    try:
+        while True:
+            message = await websocket.receive()
+            if message["type"] == "websocket.disconnect":
+                return
+
+            chunk = message.get("bytes")
+            if chunk is None:
+                try:
+                    ended = json.loads(message.get("text") or "{}").get("type") == "end"
+                except (ValueError, AttributeError):
+                    ended = False
+                if not ended:
+                    continue
+            elif len(chunk) > Config.STT_CHUNK_BYTES:
+                await websocket.send_json({"type": "error", "error": f"Audio chunks are limited to {Config.STT_CHUNK_BYTES} bytes"})
+                continue
+
+            for event in await transcribe(transcriber, chunk, session_id):
+                await websocket.send_json(event)
+            if chunk is None:
+                await websocket.close()
+                return
+    except WebSocketDisconnect:
+        pass
+
+
+async def tts(request):
+    """Stream synthesized speech for arbitrary text as newline-delimited JSON audio events"""
+    data = await read_body(request)
+    text = data.get('text', '')
+
+    if not text:
+        return JSONResponse({"error": "No text provided"}, status_code=400)
+    if jarvis.speech is None:
+        return JSONResponse({"error": "Server-side speech is disabled (set TTS_ENGINE)"}, status_code=404)
+
+    async def generate():
+        events = jarvis.speech.speak(text)
+        # Each chunk waits on synthesis, so pull them off the event loop
+        while True:
+            event = await asyncio.to_thread(next, events, None)
+            if event is None:
+                break
+            yield json.dumps(event) + "\n"
+
+    return StreamingResponse(generate(), media_type='application/x-ndjson')
+
+
+async def prices_stream(request):
+    """Server-sent events with the latest prices of watched stocks and coins, then each change"""
+    if jarvis.watchlist is None:
+        return JSONResponse({"error": "Watchlist is disabled"}, status_code=404)
+    kinds = read_price_filter(request.query_params)
+
+    async def generate():
+        loop = asyncio.get_running_loop()
+        wake = asyncio.Event()
+        subscription = jarvis.watchlist.subscribe(lambda: loop.call_soon_threadsafe(wake.set), kinds)
+        try:
+            yield sse_event('prices', jarvis.watchlist.current(subscription))
+            while True:
+                with contextlib.suppress(asyncio.TimeoutError):
+                    await asyncio.wait_for(wake.wait(), SSE_KEEPALIVE_SECONDS)
+                wake.clear()
+                if not subscription.updates:
+                    yield ": keep-alive\n\n"
+                while subscription.updates:
+                    yield sse_event('prices', subscription.updates.popleft())
+        finally:
+            jarvis.watchlist.unsubscribe(subscription)
+
+    return StreamingResponse(generate(), media_type='text/event-stream',
+                             headers={'Cache-Control': 'no-cache', 'X-Accel-Buffering': 'no'})
+
+
+async def health_check(request):
+    return JSONResponse(health_status(stt_websocket=True))
+
+
+async def metrics(request):
+    """Latency histograms and counters in Prometheus text format"""
+    return PlainTextResponse(registry.render(), media_type='text/plain; version=0.0.4')
+
+
+@contextlib.asynccontextmanager
+async def lifespan(app):
+    await async_jarvis.start()
+    yield
+    await async_jarvis.close()
+
+
+app = Starlette(
+    routes=[
+        Route('/', instrumented(home)),
+        Route('/chat', instrumented(chat), methods=['POST']),
+        Route('/chat/batch', instrumented(chat_batch), methods=['POST']),
+        Route('/chat/stream', instrumented(chat_stream), methods=['POST']),
+        Route('/prefetch', instrumented(prefetch), methods=['POST']),
+        Route('/audio', instrumented(audio), methods=['POST']),
+        WebSocketRoute('/audio', audio_socket),
+        Route('/tts', instrumented(tts), methods=['POST']),
+        Route('/prices/stream', instrumented(prices_stream), methods=['GET']),
+        Route('/health', instrumented(health_check), methods=['GET']),
+        Route('/metrics', instrumented(metrics), methods=['GET'])
+    ],
+    middleware=[Middleware(CORSMiddleware, allow_origins=['*'], allow_methods=['*'], allow_headers=['*'])],
+    lifespan=lifespan
+)
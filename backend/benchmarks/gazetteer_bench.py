@@ -0,0 +1,112 @@
+"""Measure the city and ticker gazetteers: load time, memory and lookup speed
+
+Compares the one-pass trie scan with checking every name as a substring,
+which is what a flat entity table amounts to once it holds hundreds of names.
+
+Run from the backend directory:
+    python benchmarks/gazetteer_bench.py [--iterations N] [--json]
+"""
+import argparse
+import json
+import os
+import sys
+import time
+import timeit
+import tracemalloc
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from gazetteer import CityIndex, TickerIndex, normalize  # noqa: E402
+
+CORPUS = [
+    "What's the weather in London?",
+    "Is it going to rain in Mumbai today",
+    "what's the weather like in sao paulo",
+    "nice weather today",
+    "what's the weather in Nice",
+    "what time is it in Los Angeles",
+    "What's Apple's stock price?",
+    "compare nvidia and microsoft shares",
+    "what is the price of target stock",
+    "how much is NVDA",
+    "Tell me a joke",
+    "Explain how the metadata in a PDF file is stored",
+]
+
+MISSPELLED = ["Lndon", "los angelos", "sau paulo", "Tokio", "singapur", "johannesberg"]
+
+
+def load(cls):
+    """Seconds and bytes of memory to load an index from its data file"""
+    tracemalloc.start()
+    start = time.perf_counter()
+    index = cls.from_file()
+    elapsed = time.perf_counter() - start
+    size = tracemalloc.get_traced_memory()[0]
+    tracemalloc.stop()
+    return index, elapsed, size
+
+
+def substring_scan(index, text):
+    """Every name found anywhere in the normalized text, longest first"""
+    padded = f" {normalize(text)} "
+    return [value for key, value in index.names.items() if f" {key} " in padded]
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--iterations", type=int, default=500)
+    parser.add_argument("--json", action="store_true", help="print machine-readable results")
+    args = parser.parse_args()
+
+    cities, city_seconds, city_bytes = load(CityIndex)
+    tickers, ticker_seconds, ticker_bytes = load(TickerIndex)
+    utterances = len(CORPUS) * args.iterations
+
+    def trie():
+        for text in CORPUS:
+            cities.find(text)
+            tickers.find(text)
+
+    def scan():
+        for text in CORPUS:
+            substring_scan(cities, text)
+            substring_scan(tickers, text)
+
+    trie_seconds = timeit.timeit(trie, number=args.iterations)
+    scan_seconds = timeit.timeit(scan, number=args.iterations)
+    exact_seconds = timeit.timeit(lambda: [cities.resolve(name) for name in ["London", "the UK", "Sao Paulo"]],
+                                  number=args.iterations)
+    fuzzy_seconds = timeit.timeit(lambda: [cities.resolve(name) for name in MISSPELLED], number=args.iterations)
+
+    results = {
+        "cities": len(cities),
+        "tickers": len(tickers),
+        "city_load_ms": round(city_seconds * 1000, 2),
+        "city_memory_kb": round(city_bytes / 1024, 1),
+        "ticker_load_ms": round(ticker_seconds * 1000, 2),
+        "ticker_memory_kb": round(ticker_bytes / 1024, 1),
+        "trie_us_per_utterance": round(trie_seconds / utterances * 1e6, 2),
+        "substring_us_per_utterance": round(scan_seconds / utterances * 1e6, 2),
+        "speedup": round(scan_seconds / trie_seconds, 2),
+        "exact_resolve_us": round(exact_seconds / (3 * args.iterations) * 1e6, 2),
+        "fuzzy_resolve_us": round(fuzzy_seconds / (len(MISSPELLED) * args.iterations) * 1e6, 2),
+    }
+
+    if args.json:
+        print(json.dumps(results))
+        return
+
+    for key, value in results.items():
+        print(f"{key}: {value}")
+    print()
+    for utterance in CORPUS:
+        print(f"{utterance!r:50} cities={[city.name for city in cities.find(utterance)]} "
+              f"tickers={tickers.find(utterance)}")
+    for name in MISSPELLED:
+        city = cities.resolve(name)
+        print(f"{name!r:50} -> {city.name if city else None}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,110 @@
+"""Compare the compiled intent router with the original substring scans
+
+Run from the backend directory:
+    python benchmarks/intent_router_bench.py [--iterations N] [--json]
+"""
+import argparse
+import json
+import os
+import sys
+import timeit
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from intent_router import IntentRouter  # noqa: E402
+
+CORPUS = [
+    "Open YouTube",
+    "open github for me",
+    "Create a folder called Projects",
+    "make folder reports",
+    "open calculator",
+    "What time is it?",
+    "What time is it in Tokyo?",
+    "What's today's date?",
+    "What's the weather in London?",
+    "Is it going to rain in Mumbai today",
+    "How hot is it in Dubai",
+    "What's Apple's stock price?",
+    "How is Tesla stock doing?",
+    "compare nvidia and microsoft shares",
+    "What's the Bitcoin price?",
+    "how much is ethereum worth",
+    "Show me system information",
+    "What's my CPU usage?",
+    "how much memory is free",
+    "Tell me a joke",
+    "Explain how the metadata in a PDF file is stored",
+    "Who wrote Pride and Prejudice?",
+    "Give me a recipe for pancakes",
+    "What can you do?",
+]
+
+
+def legacy_scan(user_input):
+    """The per-handler keyword scans process_command and the context providers used to run"""
+    intents = set()
+    lower = user_input.lower().strip()
+    if "open" in lower and any(site in lower for site in ["youtube", "google", "github", "stackoverflow"]):
+        intents.add("open_website")
+    if any(t in lower for t in ["create folder", "make folder", "new folder", "open calculator",
+                                "open notepad", "open file manager", "open application",
+                                "launch app", "start app"]):
+        intents.add("system_command")
+    if any(k in user_input.lower() for k in ['time', 'date', 'when', 'what day']):
+        intents.add("time")
+    if any(k in user_input.lower() for k in ['weather', 'temperature', 'hot', 'cold', 'rain', 'sunny', 'cloudy']):
+        intents.add("weather")
+        user_lower = user_input.lower()
+        for pattern in ['weather in ', 'weather at ', 'temperature in ', 'temperature at ',
+                        'hot in ', 'cold in ', 'rain in ', 'sunny in ', 'cloudy in ']:
+            if pattern in user_lower:
+                break
+    lower = user_input.lower()
+    if any(k in lower for k in ['stock', 'price', 'share', 'ticker', 'market']):
+        for stock in ['apple', 'aapl', 'google', 'googl', 'microsoft', 'msft', 'tesla', 'tsla',
+                      'amazon', 'amzn', 'meta', 'nvidia', 'nvda']:
+            if stock in lower:
+                intents.add("stock")
+                break
+    if any(k in lower for k in ['bitcoin', 'btc', 'ethereum', 'eth', 'crypto', 'cryptocurrency']):
+        intents.add("crypto")
+    lower = user_input.lower()
+    if any(k in lower for k in ['system', 'cpu', 'memory', 'ram', 'disk', 'storage', 'performance']):
+        intents.add("system_info")
+    return intents
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--iterations", type=int, default=2000)
+    parser.add_argument("--json", action="store_true", help="print machine-readable results")
+    args = parser.parse_args()
+
+    router = IntentRouter.from_file()
+    utterances = len(CORPUS) * args.iterations
+
+    legacy = timeit.timeit(lambda: [legacy_scan(u) for u in CORPUS], number=args.iterations)
+    routed = timeit.timeit(lambda: [router.route(u) for u in CORPUS], number=args.iterations)
+
+    results = {
+        "utterances": utterances,
+        "legacy_us_per_utterance": round(legacy / utterances * 1e6, 2),
+        "router_us_per_utterance": round(routed / utterances * 1e6, 2),
+        "speedup": round(legacy / routed, 2),
+    }
+
+    if args.json:
+        print(json.dumps(results))
+        return
+
+    for key, value in results.items():
+        print(f"{key}: {value}")
+    print()
+    for utterance in CORPUS:
+        print(f"{utterance!r:55} legacy={sorted(legacy_scan(utterance))} "
+              f"router={router.route(utterance).to_dict()}")
+
+
+if __name__ == "__main__":
+    main()
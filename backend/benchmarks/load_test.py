@@ -0,0 +1,337 @@
+"""Load-test the Flask backend offline against local stand-in upstream servers
+
+OpenAI, OpenWeatherMap and CoinGecko are served by a local HTTP stand-in and
+stock quotes by the static quote provider, each with injectable latency.
+Reports throughput and p50/p95/p99 latency per intent.
+
+Run from the backend directory:
+    python benchmarks/load_test.py [--mode client|http] [--requests N] [--concurrency N]
+        [--mix weather=2,freeform=3] [--latency openai=300,weather=80] [--openai-rpm N]
+        [--output results.json] [--baseline old.json --tolerance 0.2]
+
+Exits non-zero on request errors or p95 regressions against --baseline.
+"""
+import argparse
+import itertools
+import json
+import os
+import random
+import sys
+import tempfile
+import threading
+import time
+from collections import deque
+from concurrent.futures import ThreadPoolExecutor
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from urllib.parse import parse_qs, urlparse
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+UTTERANCES = {
+    "website": ["Open YouTube", "open github for me", "open google"],
+    "folder": ["Create a folder called Reports", "make folder drafts"],
+    "time": ["What time is it?", "What time is it in Tokyo?", "What's today's date?"],
+    "weather": ["What's the weather in London?", "Is it raining in Mumbai", "How hot is it in Dubai"],
+    "stock": ["What's Apple's stock price?", "How is Tesla stock doing?", "compare nvidia and microsoft shares"],
+    "crypto": ["What's the Bitcoin price?", "how much is ethereum worth", "prices of BTC, ETH and SOL"],
+    "system": ["What's my CPU usage?", "Show me system information", "how much memory is free"],
+    "freeform": ["Tell me a joke", "Who wrote Pride and Prejudice?", "Give me a recipe for pancakes",
+                 "Explain how vaccines work in simple terms"],
+}
+
+DEFAULT_MIX = {"website": 1, "folder": 1, "time": 2, "weather": 2, "stock": 2,
+               "crypto": 2, "system": 2, "freeform": 4}
+
+# Simulated upstream round trips in milliseconds
+DEFAULT_LATENCY = {"openai": 300, "weather": 80, "crypto": 80, "stock": 120}
+
+CRYPTO_PRICES = {"bitcoin": 43250.0, "ethereum": 2280.5, "solana": 98.4, "cardano": 0.52,
+                 "dogecoin": 0.082, "ripple": 0.61, "polkadot": 7.2, "litecoin": 71.3}
+
+
+class StandInHandler(BaseHTTPRequestHandler):
+    """Minimal OpenAI, OpenWeatherMap and CoinGecko endpoints"""
+
+    latency = DEFAULT_LATENCY
+    # Chat completions allowed per rolling minute before answering 429 (0 = unlimited)
+    openai_rpm = 0
+    openai_calls = deque()
+    openai_rate_limited = 0
+    rate_lock = threading.Lock()
+
+    def log_message(self, format, *args):
+        pass
+
+    def send_json(self, body, status=200, headers=None):
+        data = json.dumps(body).encode()
+        self.send_response(status)
+        self.send_header("Content-Type", "application/json")
+        for name, value in (headers or {}).items():
+            self.send_header(name, value)
+        self.send_header("Content-Length", str(len(data)))
+        self.end_headers()
+        self.wfile.write(data)
+
+    def do_GET(self):
+        url = urlparse(self.path)
+        query = {key: values[0] for key, values in parse_qs(url.query).items()}
+
+        if url.path.endswith("/weather"):
+            time.sleep(self.latency["weather"] / 1000)
+            self.send_json({
+                "name": query.get("q", "London"),
+                "sys": {"country": "GB"},
+                "main": {"temp": 14.2, "feels_like": 13.1, "humidity": 71},
+                "weather": [{"main": "Rain", "description": "light rain"}],
+                "wind": {"speed": 4.1}
+            })
+        elif url.path.endswith("/simple/price"):
+            time.sleep(self.latency["crypto"] / 1000)
+            ids = [crypto_id for crypto_id in query.get("ids", "").split(",") if crypto_id in CRYPTO_PRICES]
+            self.send_json({crypto_id: {"usd": CRYPTO_PRICES[crypto_id], "usd_24h_change": 1.7,
+                                        "usd_market_cap": CRYPTO_PRICES[crypto_id] * 1e8}
+                            for crypto_id in ids})
+        else:
+            self.send_json({"error": "not found"}, 404)
+
+    def over_rate_limit(self):
+        if not self.openai_rpm:
+            return False
+        now = time.monotonic()
+        with self.rate_lock:
+            calls = StandInHandler.openai_calls
+            while calls and now - calls[0] >= 60:
+                calls.popleft()
+            if len(calls) >= self.openai_rpm:
+                StandInHandler.openai_rate_limited += 1
+                return True
+            calls.append(now)
+        return False
+
+    def do_POST(self):
+        length = int(self.headers.get("Content-Length", 0))
+        body = json.loads(self.rfile.read(length) or b"{}")
+        if not self.path.endswith("/chat/completions"):
+            self.send_json({"error": "not found"}, 404)
+            return
+        if self.over_rate_limit():
+            self.send_json({"error": {"message": "Rate limit reached for requests", "type": "requests",
+                                      "code": "rate_limit_exceeded"}}, 429, {"Retry-After": "1"})
+            return
+
+        time.sleep(self.latency["openai"] / 1000)
+        content = "Here is a short answer from the stand-in model."
+        if body.get("stream"):
+            self.send_response(200)
+            self.send_header("Content-Type", "text/event-stream")
+            self.end_headers()
+            for word in content.split(" "):
+                chunk = {"id": "bench", "object": "chat.completion.chunk", "created": 0, "model": body["model"],
+                         "choices": [{"index": 0, "delta": {"content": word + " "}, "finish_reason": None}]}
+                self.wfile.write(f"data: {json.dumps(chunk)}\n\n".encode())
+            if body.get("stream_options", {}).get("include_usage"):
+                chunk = {"id": "bench", "object": "chat.completion.chunk", "created": 0, "model": body["model"],
+                         "choices": [], "usage": {"prompt_tokens": 300, "completion_tokens": 9, "total_tokens": 309}}
+                self.wfile.write(f"data: {json.dumps(chunk)}\n\n".encode())
+            self.wfile.write(b"data: [DONE]\n\n")
+            return
+
+        self.send_json({
+            "id": "bench", "object": "chat.completion", "created": 0, "model": body["model"],
+            "choices": [{"index": 0, "finish_reason": "stop",
+                         "message": {"role": "assistant", "content": content}}],
+            "usage": {"prompt_tokens": 300, "completion_tokens": 12, "total_tokens": 312}
+        })
+
+
+def start_server(server):
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    return f"http://127.0.0.1:{server.server_address[1]}"
+
+
+def parse_weights(text, defaults, cast=float):
+    """Parse "name=value,..." overrides on top of defaults"""
+    values = dict(defaults)
+    for item in filter(None, (text or "").split(",")):
+        name, _, value = item.partition("=")
+        if name not in defaults:
+            raise SystemExit(f"Unknown name {name!r}, expected one of {sorted(defaults)}")
+        values[name] = cast(value)
+    return values
+
+
+def percentile(sorted_values, fraction):
+    """Nearest-rank percentile of an already sorted list"""
+    if not sorted_values:
+        return None
+    index = max(0, min(len(sorted_values) - 1, round(fraction * len(sorted_values) + 0.5) - 1))
+    return sorted_values[index]
+
+
+def summarize(latencies):
+    values = sorted(latencies)
+    return {
+        "count": len(values),
+        "mean_ms": round(sum(values) / len(values), 2) if values else None,
+        "p50_ms": round(percentile(values, 0.50), 2) if values else None,
+        "p95_ms": round(percentile(values, 0.95), 2) if values else None,
+        "p99_ms": round(percentile(values, 0.99), 2) if values else None,
+    }
+
+
+def build_workload(mix, count, seed):
+    rng = random.Random(seed)
+    intents = [intent for intent, weight in mix.items() if weight > 0]
+    weights = [mix[intent] for intent in intents]
+    cycles = {intent: itertools.cycle(UTTERANCES[intent]) for intent in intents}
+    return [(intent, next(cycles[intent])) for intent in rng.choices(intents, weights, k=count)]
+
+
+def configure_environment(upstream_url, home):
+    """Point the backend at the stand-ins before it is imported"""
+    os.environ.update({
+        "OPENAI_API_KEY": "bench",
+        "OPENAI_BASE_URL": f"{upstream_url}/v1",
+        "OPENWEATHER_API_KEY": "bench",
+        "OPENWEATHER_BASE_URL": upstream_url,
+        "COINGECKO_BASE_URL": upstream_url,
+        "QUOTE_PROVIDER": "static",
+        # create_folder writes under ~/Desktop
+        "HOME": home,
+    })
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--mode", choices=["client", "http"], default="client",
+                        help="Flask test client, or real HTTP against a local server")
+    parser.add_argument("--requests", type=int, default=200)
+    parser.add_argument("--concurrency", type=int, default=8)
+    parser.add_argument("--mix", help="intent weights, e.g. weather=2,freeform=3")
+    parser.add_argument("--latency", help="upstream latency in ms, e.g. openai=300,weather=80")
+    parser.add_argument("--openai-rpm", type=int, default=0,
+                        help="make the stand-in OpenAI answer 429 above this many requests per minute")
+    parser.add_argument("--seed", type=int, default=7)
+    parser.add_argument("--output", help="write JSON results to this file")
+    parser.add_argument("--baseline", help="earlier JSON results to compare p95 latency against")
+    parser.add_argument("--tolerance", type=float, default=0.2,
+                        help="allowed p95 slowdown vs the baseline before failing (0.2 = 20%%)")
+    parser.add_argument("--min-delta-ms", type=float, default=10,
+                        help="ignore p95 slowdowns smaller than this, to skip noise on fast intents")
+    parser.add_argument("--json", action="store_true", help="print machine-readable results only")
+    args = parser.parse_args()
+
+    # Keep the backend's own log prints out of machine-readable output
+    output = sys.stdout
+    if args.json:
+        sys.stdout = sys.stderr
+
+    mix = parse_weights(args.mix, DEFAULT_MIX)
+    latency = parse_weights(args.latency, DEFAULT_LATENCY)
+    StandInHandler.latency = latency
+    StandInHandler.openai_rpm = args.openai_rpm
+
+    upstream = ThreadingHTTPServer(("127.0.0.1", 0), StandInHandler)
+    upstream.daemon_threads = True
+    configure_environment(start_server(upstream), tempfile.mkdtemp(prefix="jarvis-bench-"))
+
+    import app as backend  # noqa: E402
+    from quotes import create_quote_provider  # noqa: E402
+    backend.jarvis.quote_provider = create_quote_provider("static", latency=latency["stock"] / 1000)
+
+    if args.mode == "http":
+        import requests
+        from werkzeug.serving import make_server
+        server = make_server("127.0.0.1", 0, backend.app, threaded=True)
+        base_url = start_server(server)
+        local = threading.local()
+
+        def send(message, session_id):
+            if not hasattr(local, "session"):
+                local.session = requests.Session()
+            response = local.session.post(f"{base_url}/chat", json={"message": message, "session_id": session_id})
+            return response.status_code
+    else:
+        def send(message, session_id):
+            return backend.app.test_client().post("/chat", json={"message": message, "session_id": session_id}).status_code
+
+    workload = build_workload(mix, args.requests, args.seed)
+    latencies = {intent: [] for intent in mix}
+    errors = {intent: 0 for intent in mix}
+    lock = threading.Lock()
+
+    def run(index):
+        intent, message = workload[index]
+        start = time.perf_counter()
+        try:
+            ok = send(message, f"bench-{index % args.concurrency}") == 200
+        except Exception:
+            ok = False
+        elapsed = (time.perf_counter() - start) * 1000
+        with lock:
+            latencies[intent].append(elapsed)
+            if not ok:
+                errors[intent] += 1
+
+    started = time.perf_counter()
+    with ThreadPoolExecutor(max_workers=args.concurrency) as executor:
+        list(executor.map(run, range(len(workload))))
+    duration = time.perf_counter() - started
+
+    results = {
+        "mode": args.mode,
+        "requests": len(workload),
+        "concurrency": args.concurrency,
+        "upstream_latency_ms": latency,
+        "duration_s": round(duration, 3),
+        "throughput_rps": round(len(workload) / duration, 2),
+        "errors": sum(errors.values()),
+        "overall": summarize([value for values in latencies.values() for value in values]),
+        "intents": {intent: {**summarize(values), "errors": errors[intent]}
+                    for intent, values in latencies.items() if values},
+        "openai_rate_limited": StandInHandler.openai_rate_limited,
+        "llm_scheduler": backend.jarvis.llm_scheduler.stats(),
+    }
+
+    if args.output:
+        with open(args.output, "w", encoding="utf-8") as f:
+            json.dump(results, f, indent=2)
+
+    regressions = compare(results, args.baseline, args.tolerance, args.min_delta_ms) if args.baseline else []
+
+    if args.json:
+        print(json.dumps(results), file=output)
+    else:
+        print(f"{results['requests']} requests in {results['duration_s']}s "
+              f"({results['throughput_rps']} req/s, {results['errors']} errors, mode={args.mode})")
+        scheduler = results["llm_scheduler"]
+        print(f"LLM calls admitted {scheduler['admitted']}, rejected at queue deadline {scheduler['rejected']}, "
+              f"stand-in 429s {results['openai_rate_limited']}")
+        print(f"{'intent':10} {'count':>6} {'p50 ms':>9} {'p95 ms':>9} {'p99 ms':>9}")
+        for intent, stats in [*results["intents"].items(), ("overall", results["overall"])]:
+            print(f"{intent:10} {stats['count']:>6} {stats['p50_ms']:>9} {stats['p95_ms']:>9} {stats['p99_ms']:>9}")
+        for regression in regressions:
+            print(f"REGRESSION {regression}")
+
+    upstream.shutdown()
+    sys.exit(1 if regressions or results["errors"] else 0)
+
+
+def compare(results, baseline_path, tolerance, min_delta_ms=0):
+    """p95 regressions against a baseline results file"""
+    with open(baseline_path, encoding="utf-8") as f:
+        baseline = json.load(f)
+
+    regressions = []
+    for intent, stats in [*results["intents"].items(), ("overall", results["overall"])]:
+        before = baseline["overall"] if intent == "overall" else baseline.get("intents", {}).get(intent)
+        if not before or not before.get("p95_ms"):
+            continue
+        slower = stats["p95_ms"] - before["p95_ms"]
+        if stats["p95_ms"] > before["p95_ms"] * (1 + tolerance) and slower >= min_delta_ms:
+            regressions.append(f"{intent}: p95 {before['p95_ms']} -> {stats['p95_ms']} ms")
+    return regressions
+
+
+if __name__ == "__main__":
+    main()
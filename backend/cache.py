@@ -0,0 +1,236 @@
+import asyncio
+import threading
+import time
+from collections import OrderedDict
+
+
+class _InflightCall:
+    """A pending upstream fetch that concurrent callers wait on"""
+
+    def __init__(self):
+        self.event = threading.Event()
+        self.value = None
+
+
+class TTLCache:
+    """Thread-safe LRU cache with a time-to-live and single-flight fetching
+
+    Expired entries are kept for another stale_ttl seconds so get_stale() can
+    serve last-known-good data while the upstream source is failing.
+    """
+
+    def __init__(self, ttl, max_size=256, stale_ttl=0):
+        self.ttl = ttl
+        self.max_size = max_size
+        self.stale_ttl = stale_ttl
+        self.entries = OrderedDict()
+        self.inflight = {}
+        self.async_inflight = {}
+        self.lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+        self.coalesced = 0
+        self.evictions = 0
+
+    def get(self, key):
+        """Return a fresh cached value or None"""
+        with self.lock:
+            return self._get_fresh(key)
+
+    def _get_fresh(self, key):
+        entry = self.entries.get(key)
+        if entry is None:
+            return None
+        expires_at, value = entry
+        now = time.monotonic()
+        if expires_at <= now:
+            if expires_at + self.stale_ttl <= now:
+                del self.entries[key]
+            return None
+        self.entries.move_to_end(key)
+        return value
+
+    def get_stale(self, key):
+        """Return (value, age_seconds) for a cached value even if expired, or None"""
+        with self.lock:
+            entry = self.entries.get(key)
+            if entry is None:
+                return None
+            expires_at, value = entry
+            now = time.monotonic()
+            if expires_at + self.stale_ttl <= now:
+                del self.entries[key]
+                return None
+            return value, now - (expires_at - self.ttl)
+
+    def set(self, key, value):
+        """Store a value, evicting the least recently used entries if full"""
+        with self.lock:
+            self._set(key, value)
+
+    def _set(self, key, value):
+        self.entries[key] = (time.monotonic() + self.ttl, value)
+        self.entries.move_to_end(key)
+        while len(self.entries) > self.max_size:
+            self.entries.popitem(last=False)
+            self.evictions += 1
+
+    def get_or_fetch(self, key, fetch):
+        """Return the cached value for key, calling fetch() on a miss
+
+        Concurrent misses for the same key share a single fetch() call.
+        None results are treated as failures and are not cached.
+        """
+        with self.lock:
+            value = self._get_fresh(key)
+            if value is not None:
+                self.hits += 1
+                return value
+
+            call = self.inflight.get(key)
+            if call is not None:
+                self.coalesced += 1
+                leader = False
+            else:
+                call = _InflightCall()
+                self.inflight[key] = call
+                self.misses += 1
+                leader = True
+
+        if not leader:
+            call.event.wait()
+            return call.value
+
+        value = None
+        try:
+            value = fetch()
+            return value
+        finally:
+            with self.lock:
+                if value is not None:
+                    self._set(key, value)
+                del self.inflight[key]
+            call.value = value
+            call.event.set()
+
+    async def get_or_fetch_async(self, key, fetch):
+        """Async variant of get_or_fetch where fetch() returns an awaitable"""
+        with self.lock:
+            value = self._get_fresh(key)
+            if value is not None:
+                self.hits += 1
+                return value
+
+            future = self.async_inflight.get(key)
+            if future is not None:
+                self.coalesced += 1
+                leader = False
+            else:
+                future = asyncio.get_running_loop().create_future()
+                self.async_inflight[key] = future
+                self.misses += 1
+                leader = True
+
+        if not leader:
+            return await asyncio.shield(future)
+
+        value = None
+        try:
+            value = await fetch()
+            return value
+        finally:
+            with self.lock:
+                if value is not None:
+                    self._set(key, value)
+                del self.async_inflight[key]
+            if not future.done():
+                future.set_result(value)
+
+    def get_many_or_fetch(self, keys, fetch_many):
+        """Return {key: value} for keys, fetching every miss in one call
+
+        fetch_many(missing_keys) returns a dict of the values it found; keys
+        it leaves out are treated as failures and are not cached. Keys another
+        caller is already fetching are waited on rather than fetched again.
+        """
+        results, leading, waiting = self._claim_many(keys, self.inflight, _InflightCall)
+        if leading:
+            fetched = None
+            try:
+                fetched = fetch_many(list(leading))
+            finally:
+                self._store_fetched(leading, fetched, self.inflight, results)
+                for key, call in leading.items():
+                    call.value = results.get(key)
+                    call.event.set()
+
+        for key, call in waiting.items():
+            call.event.wait()
+            if call.value is not None:
+                results[key] = call.value
+        return results
+
+    async def get_many_or_fetch_async(self, keys, fetch_many):
+        """Async variant of get_many_or_fetch where fetch_many() returns an awaitable"""
+        loop = asyncio.get_running_loop()
+        results, leading, waiting = self._claim_many(keys, self.async_inflight, loop.create_future)
+        if leading:
+            fetched = None
+            try:
+                fetched = await fetch_many(list(leading))
+            finally:
+                self._store_fetched(leading, fetched, self.async_inflight, results)
+                for key, future in leading.items():
+                    if not future.done():
+                        future.set_result(results.get(key))
+
+        for key, future in waiting.items():
+            value = await asyncio.shield(future)
+            if value is not None:
+                results[key] = value
+        return results
+
+    def _claim_many(self, keys, inflight, new_call):
+        """Split keys into cached values, misses this caller fetches and misses already in flight"""
+        results = {}
+        leading = {}
+        waiting = {}
+        with self.lock:
+            for key in dict.fromkeys(keys):
+                value = self._get_fresh(key)
+                if value is not None:
+                    self.hits += 1
+                    results[key] = value
+                elif key in inflight:
+                    self.coalesced += 1
+                    waiting[key] = inflight[key]
+                else:
+                    self.misses += 1
+                    leading[key] = inflight[key] = new_call()
+        return results, leading, waiting
+
+    def _store_fetched(self, leading, fetched, inflight, results):
+        fetched = fetched or {}
+        with self.lock:
+            for key in leading:
+                value = fetched.get(key)
+                if value is not None:
+                    self._set(key, value)
+                    results[key] = value
+                del inflight[key]
+
+    def clear(self):
+        with self.lock:
+            self.entries.clear()
+
+    def stats(self):
+        with self.lock:
+            return {
+                'size': len(self.entries),
+                'max_size': self.max_size,
+                'ttl': self.ttl,
+                'hits': self.hits,
+                'misses': self.misses,
+                'coalesced': self.coalesced,
+                'evictions': self.evictions
+            }
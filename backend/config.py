@@ -8,8 +8,161 @@ class Config:
     OPENWEATHER_API_KEY = os.getenv('OPENWEATHER_API_KEY')
     ALPHA_VANTAGE_API_KEY = os.getenv('ALPHA_VANTAGE_API_KEY')
     SPORTS_API_KEY = os.getenv('SPORTS_API_KEY')
+
+    # Upstream endpoints (override to use a proxy or local stand-in servers)
+    OPENAI_BASE_URL = os.getenv('OPENAI_BASE_URL') or None
+    OPENWEATHER_BASE_URL = os.getenv('OPENWEATHER_BASE_URL', 'http://api.openweathermap.org/data/2.5')
+    # Weather questions that name no known city ("weather in my area") use this one, if set
+    DEFAULT_CITY = os.getenv('DEFAULT_CITY', '')
+    COINGECKO_BASE_URL = os.getenv('COINGECKO_BASE_URL', 'https://api.coingecko.com/api/v3')
     FLASK_ENV = os.getenv('FLASK_ENV', 'development')
     FLASK_DEBUG = os.getenv('FLASK_DEBUG', 'True').lower() == 'true'
+    OPENAI_MODEL = os.getenv('OPENAI_MODEL', 'gpt-3.5-turbo')
+
+    # Answer simple time, date, price and system questions without calling OpenAI
+    LOCAL_ANSWERS_ENABLED = os.getenv('LOCAL_ANSWERS_ENABLED', 'True').lower() == 'true'
+
+    # Reuse LLM answers for repeated general questions (similarity is 0-1)
+    RESPONSE_CACHE_ENABLED = os.getenv('RESPONSE_CACHE_ENABLED', 'False').lower() == 'true'
+    RESPONSE_CACHE_TTL = int(os.getenv('RESPONSE_CACHE_TTL', '3600'))
+    RESPONSE_CACHE_MAX_SIZE = int(os.getenv('RESPONSE_CACHE_MAX_SIZE', '500'))
+    RESPONSE_CACHE_THRESHOLD = float(os.getenv('RESPONSE_CACHE_THRESHOLD', '0.9'))
+
+    # Context enrichment settings
+    CONTEXT_BUDGET_SECONDS = float(os.getenv('CONTEXT_BUDGET_SECONDS', '2.5'))
+    CONTEXT_MAX_WORKERS = int(os.getenv('CONTEXT_MAX_WORKERS', '8'))
+    HTTP_POOL_SIZE = int(os.getenv('HTTP_POOL_SIZE', '20'))
+
+    # Stock quote source ("yahoo", or "static" to serve QUOTE_STATIC_PATH offline)
+    QUOTE_PROVIDER = os.getenv('QUOTE_PROVIDER', 'yahoo')
+    QUOTE_STATIC_PATH = os.getenv('QUOTE_STATIC_PATH', '')
+
+    # Upstream data provider resilience (timeouts in seconds; HEDGE_PERCENTILE=0 disables hedging)
+    UPSTREAM_CONNECT_TIMEOUT = float(os.getenv('UPSTREAM_CONNECT_TIMEOUT', '1.5'))
+    UPSTREAM_READ_TIMEOUT = float(os.getenv('UPSTREAM_READ_TIMEOUT', '3'))
+    BREAKER_FAILURE_THRESHOLD = int(os.getenv('BREAKER_FAILURE_THRESHOLD', '3'))
+    BREAKER_RESET_SECONDS = float(os.getenv('BREAKER_RESET_SECONDS', '30'))
+    HEDGE_PERCENTILE = float(os.getenv('HEDGE_PERCENTILE', '0'))
+    STALE_DATA_TTL = int(os.getenv('STALE_DATA_TTL', '3600'))
+
+    # Warm caches from interim speech transcripts sent to /prefetch
+    PREFETCH_ENABLED = os.getenv('PREFETCH_ENABLED', 'True').lower() == 'true'
+    PREFETCH_MAX_WORKERS = int(os.getenv('PREFETCH_MAX_WORKERS', '4'))
+
+    # Admission control for OpenAI calls: concurrency, rate limits (0 = unlimited) and how long
+    # a call may wait in the queue before the user gets a fallback reply (seconds, per priority)
+    LLM_MAX_CONCURRENCY = int(os.getenv('LLM_MAX_CONCURRENCY', '8'))
+    LLM_REQUESTS_PER_MINUTE = int(os.getenv('LLM_REQUESTS_PER_MINUTE', '0'))
+    LLM_TOKENS_PER_MINUTE = int(os.getenv('LLM_TOKENS_PER_MINUTE', '0'))
+    LLM_BURST_SECONDS = float(os.getenv('LLM_BURST_SECONDS', '10'))
+    LLM_QUEUE_DEADLINE = float(os.getenv('LLM_QUEUE_DEADLINE', '3'))
+    LLM_BATCH_QUEUE_DEADLINE = float(os.getenv('LLM_BATCH_QUEUE_DEADLINE', '30'))
+    LLM_RATE_LIMIT_BACKOFF = float(os.getenv('LLM_RATE_LIMIT_BACKOFF', '5'))
+
+    # Completion settings by intent: the first route sharing an intent with the request is
+    # used (model None = OPENAI_MODEL) and its instruction is added to the prompt. Data
+    # lookups get short, deterministic replies; larger budgets only when detail is asked for.
+    LLM_ROUTING_ENABLED = os.getenv('LLM_ROUTING_ENABLED', 'True').lower() == 'true'
+    LLM_DATA_MAX_TOKENS = int(os.getenv('LLM_DATA_MAX_TOKENS', '80'))
+    LLM_DEFAULT_MAX_TOKENS = int(os.getenv('LLM_DEFAULT_MAX_TOKENS', '150'))
+    LLM_CREATIVE_MAX_TOKENS = int(os.getenv('LLM_CREATIVE_MAX_TOKENS', '250'))
+    LLM_DETAILED_MAX_TOKENS = int(os.getenv('LLM_DETAILED_MAX_TOKENS', '450'))
+    LLM_DETAILED_MODEL = os.getenv('LLM_DETAILED_MODEL') or None
+    LLM_ROUTES = [
+        {
+            "name": "detailed",
+            "intents": ["detailed"],
+            "model": LLM_DETAILED_MODEL,
+            "max_tokens": LLM_DETAILED_MAX_TOKENS,
+            "temperature": 0.7,
+            "instruction": "The user asked for detail, so give a complete answer of up to about 300 words."
+        },
+        {
+            "name": "creative",
+            "intents": ["creative"],
+            "max_tokens": LLM_CREATIVE_MAX_TOKENS,
+            "temperature": 0.9,
+            "instruction": "Be imaginative, but keep it short enough to read aloud."
+        },
+        {
+            "name": "data",
+            "intents": ["ask_time", "ask_date", "weather", "stock", "price", "crypto",
+                        "system_info", "trend", "compare", "market_cap"],
+            # Only readouts of something that was resolved; "explain how virtual memory works" is not one
+            "entities": ["ticker", "crypto", "city", "resource"],
+            "excluded_intents": ["explain"],
+            "max_tokens": LLM_DATA_MAX_TOKENS,
+            "temperature": 0.2,
+            "instruction": "Answer in one or two short sentences and state any figures from the data above plainly."
+        },
+        {
+            "name": "general",
+            "max_tokens": LLM_DEFAULT_MAX_TOKENS,
+            "temperature": 0.7
+        }
+    ]
+
+    # /chat/batch limits (sessions run concurrently, each session's messages in order)
+    BATCH_MAX_MESSAGES = int(os.getenv('BATCH_MAX_MESSAGES', '50'))
+    BATCH_MAX_WORKERS = int(os.getenv('BATCH_MAX_WORKERS', '8'))
+
+    # Server-side speech for /tts and {"audio": true} streams ("none", "stub" or "pyttsx3")
+    TTS_ENGINE = os.getenv('TTS_ENGINE', 'none')
+    TTS_RATE = int(os.getenv('TTS_RATE', '0'))
+    TTS_CACHE_SIZE = int(os.getenv('TTS_CACHE_SIZE', '256'))
+    TTS_CACHE_TTL = int(os.getenv('TTS_CACHE_TTL', '86400'))
+    TTS_MAX_WORKERS = int(os.getenv('TTS_MAX_WORKERS', '2'))
+
+    # Server-side speech recognition on /audio ("none", "stub" or "vosk" with STT_MODEL_PATH)
+    # Audio is 16-bit mono PCM at STT_SAMPLE_RATE; silence and intervals in milliseconds
+    STT_ENGINE = os.getenv('STT_ENGINE', 'none')
+    STT_MODEL_PATH = os.getenv('STT_MODEL_PATH', '')
+    STT_SAMPLE_RATE = int(os.getenv('STT_SAMPLE_RATE', '16000'))
+    STT_VAD_THRESHOLD = float(os.getenv('STT_VAD_THRESHOLD', '500'))
+    STT_SILENCE_MS = int(os.getenv('STT_SILENCE_MS', '700'))
+    STT_PARTIAL_INTERVAL_MS = int(os.getenv('STT_PARTIAL_INTERVAL_MS', '300'))
+    STT_MAX_UTTERANCE_SECONDS = int(os.getenv('STT_MAX_UTTERANCE_SECONDS', '15'))
+    STT_CHUNK_BYTES = int(os.getenv('STT_CHUNK_BYTES', '32768'))
+
+    # Startup: heavy dependencies (yfinance, openai, psutil, pytz) load on first use unless
+    # WARM_START preloads them in the background; /health compares startup with the budget
+    WARM_START = os.getenv('WARM_START', 'False').lower() == 'true'
+    STARTUP_BUDGET_SECONDS = float(os.getenv('STARTUP_BUDGET_SECONDS', '1.0'))
+
+    # Background refresh of frequently asked stocks and coins into the quote caches
+    # (keep WATCHLIST_INTERVAL below STOCK_CACHE_TTL and CRYPTO_CACHE_TTL); refreshing
+    # pauses after WATCHLIST_IDLE_SECONDS without asks or /prices/stream subscribers.
+    # Every worker process polls on its own, so enable it on one worker or a single-process deployment
+    WATCHLIST_ENABLED = os.getenv('WATCHLIST_ENABLED', 'False').lower() == 'true'
+    WATCHLIST_INTERVAL = float(os.getenv('WATCHLIST_INTERVAL', '15'))
+    WATCHLIST_SEED_SIZE = int(os.getenv('WATCHLIST_SEED_SIZE', '10'))
+    WATCHLIST_MAX_SYMBOLS = int(os.getenv('WATCHLIST_MAX_SYMBOLS', '25'))
+    WATCHLIST_MIN_HITS = int(os.getenv('WATCHLIST_MIN_HITS', '2'))
+    WATCHLIST_IDLE_SECONDS = float(os.getenv('WATCHLIST_IDLE_SECONDS', '600'))
+    WATCHLIST_MAX_STREAM_SYMBOLS = int(os.getenv('WATCHLIST_MAX_STREAM_SYMBOLS', '10'))
+
+    # Background system metrics sampling (interval in seconds, history in samples)
+    SYSTEM_SAMPLE_INTERVAL = float(os.getenv('SYSTEM_SAMPLE_INTERVAL', '5'))
+    SYSTEM_SAMPLE_HISTORY = int(os.getenv('SYSTEM_SAMPLE_HISTORY', '120'))
+
+    # Upstream data cache settings (TTLs in seconds)
+    WEATHER_CACHE_TTL = int(os.getenv('WEATHER_CACHE_TTL', '600'))
+    STOCK_CACHE_TTL = int(os.getenv('STOCK_CACHE_TTL', '60'))
+    CRYPTO_CACHE_TTL = int(os.getenv('CRYPTO_CACHE_TTL', '30'))
+    STOCK_DETAILS_CACHE_TTL = int(os.getenv('STOCK_DETAILS_CACHE_TTL', '3600'))
+    CACHE_MAX_SIZE = int(os.getenv('CACHE_MAX_SIZE', '256'))
+
+    # Conversation session settings ("memory" or "sqlite" for multi-worker deployments)
+    SESSION_BACKEND = os.getenv('SESSION_BACKEND', 'memory')
+    SESSION_DB_PATH = os.getenv('SESSION_DB_PATH', 'sessions.db')
+    SESSION_MAX_MESSAGES = int(os.getenv('SESSION_MAX_MESSAGES', '20'))
+    SESSION_IDLE_TIMEOUT = int(os.getenv('SESSION_IDLE_TIMEOUT', '1800'))
+    SESSION_MAX_SESSIONS = int(os.getenv('SESSION_MAX_SESSIONS', '1000'))
+
+    # Prompt size limits (in tokens)
+    HISTORY_TOKEN_BUDGET = int(os.getenv('HISTORY_TOKEN_BUDGET', '1200'))
+    MAX_INPUT_TOKENS = int(os.getenv('MAX_INPUT_TOKENS', '500'))
+    HISTORY_SUMMARY_TOKENS = int(os.getenv('HISTORY_SUMMARY_TOKENS', '150'))
 
     # Jarvis personality settings
     ASSISTANT_NAME = "Jarvis"
@@ -0,0 +1,91 @@
+import threading
+import time
+from collections import Counter
+from concurrent.futures import ThreadPoolExecutor, wait
+
+
+class ContextPipeline:
+    """Run context providers concurrently within a per-request latency budget
+
+    A provider call that misses the budget keeps its pool thread until it
+    returns. Once such stragglers would leave too few threads for a request's
+    providers, the providers that own them are skipped ('busy'), so one hung
+    upstream cannot starve the others; a single slow call skips nothing.
+    """
+
+    def __init__(self, max_workers=4, budget=2.5):
+        self.executor = ThreadPoolExecutor(max_workers=max_workers, thread_name_prefix="context")
+        self.max_workers = max_workers
+        self.budget = budget
+        self.stragglers = Counter()  # provider name -> timed-out calls still running
+        self.lock = threading.Lock()
+
+    def _timed(self, provider, query):
+        """Call a provider and measure how long it took"""
+        start = time.perf_counter()
+        try:
+            return provider(query), time.perf_counter() - start, None
+        except Exception as e:
+            return None, time.perf_counter() - start, e
+
+    def run(self, providers, query, budget=None):
+        """Run (name, callable) providers and return (contexts, timings)
+
+        Providers that raise, return nothing or miss the deadline are dropped
+        instead of blocking the reply. Contexts keep the providers' order.
+        """
+        budget = self.budget if budget is None else budget
+        timings = {}
+        futures = []
+        for name, provider in providers:
+            if self.is_busy(name, len(providers)):
+                timings[name] = {'ms': 0.0, 'status': 'busy'}
+            else:
+                futures.append((name, self.executor.submit(self._timed, provider, query)))
+        done, _ = wait([future for _, future in futures], timeout=budget)
+
+        contexts = []
+        for name, future in futures:
+            if future not in done:
+                # Still running in the pool; its result is discarded when it lands
+                if not future.cancel():
+                    self._abandon(name, future)
+                timings[name] = {'ms': round(budget * 1000, 1), 'status': 'timeout'}
+                continue
+
+            result, elapsed, error = future.result()
+            if error:
+                print(f"Context provider '{name}' error: {error}")
+                status = 'error'
+            else:
+                status = 'ok' if result else 'empty'
+            timings[name] = {'ms': round(elapsed * 1000, 1), 'status': status}
+            if result:
+                contexts.append(result)
+
+        return contexts, timings
+
+    def is_busy(self, name, reserve):
+        """Whether stragglers leave fewer than reserve free threads and name owns some of them"""
+        with self.lock:
+            total = sum(self.stragglers.values())
+            if total >= self.max_workers:
+                return True
+            return self.stragglers[name] > 0 and total + reserve > self.max_workers
+
+    def _abandon(self, name, future):
+        """Count a timed-out call against its provider until it finishes"""
+        with self.lock:
+            self.stragglers[name] += 1
+        future.add_done_callback(lambda _future: self._release(name))
+
+    def _release(self, name):
+        with self.lock:
+            self.stragglers[name] -= 1
+            if not self.stragglers[name]:
+                del self.stragglers[name]
+
+    def stats(self):
+        """Timed-out provider calls still holding a pool thread, per provider"""
+        with self.lock:
+            return dict(self.stragglers)
@@ -0,0 +1,220 @@
+import csv
+import difflib
+import functools
+import os
+import re
+import unicodedata
+from collections import namedtuple
+
+DATA_DIR = os.path.join(os.path.dirname(os.path.abspath(__file__)), 'data')
+DEFAULT_CITIES_PATH = os.path.join(DATA_DIR, 'cities.tsv')
+DEFAULT_TICKERS_PATH = os.path.join(DATA_DIR, 'tickers.tsv')
+
+WORD_PATTERN = re.compile(r"[a-z0-9]+")
+# "$F" or an upper-case token such as "NVDA" or "BRK.B"
+SYMBOL_PATTERN = re.compile(r"\$([A-Za-z][A-Za-z0-9]*(?:[.-][A-Za-z])?)\b|\b([A-Z][A-Z0-9]+(?:[.-][A-Z])?)\b")
+
+# Names that are also everyday words ("nice weather", "target practice") and
+# only count with supporting context
+COMMON_WORDS = {
+    'nice', 'split', 'male', 'mobile', 'reading', 'orange', 'bath', 'la', 'kl', 'sf', 'hk', 'dc',
+    'target', 'visa', 'ford', 'shell', 'block', 'snap', 'unity', 'arm', 'dow', 'southwest', 'delta',
+    'chase', 'coke', 'zoom', 'booking', 'net', 'now', 'lulu', 'yum', 'square', 'citi', 'lilly', 'novo',
+    'turkey', 'chad', 'jordan', 'georgia', 'guinea', 'jersey', 'reunion', 'stanley',
+    # Symbols that are also words or abbreviations when typed in capitals
+    'low', 'so', 'ma', 'ms', 'de', 'se', 'el', 'dis', 'mo', 'ge', 'it', 'on', 'all', 'team', 'u', 't', 'c', 'v', 'f'
+}
+PLACE_PREPOSITIONS = {'in', 'at', 'for', 'near', 'of', 'around'}
+
+# Trie key marking the end of a name (words are never empty)
+END = ''
+
+City = namedtuple('City', ['name', 'country', 'timezone', 'population'])
+
+
+def normalize(text):
+    """Lowercase words without accents or punctuation ("São Paulo!" -> "sao paulo")"""
+    text = text.lower()
+    if not text.isascii():
+        text = unicodedata.normalize('NFKD', text)
+        text = ''.join(char for char in text if not unicodedata.combining(char))
+    return ' '.join(WORD_PATTERN.findall(text))
+
+
+class PhraseTrie:
+    """Word-level trie for finding known (multi-word) names in one pass over an utterance"""
+
+    def __init__(self):
+        self.root = {}
+
+    def add(self, phrase, value):
+        node = self.root
+        for word in phrase.split():
+            node = node.setdefault(word, {})
+        node.setdefault(END, value)
+
+    def find(self, words):
+        """Longest non-overlapping matches as (start, end, value), left to right"""
+        matches = []
+        start = 0
+        while start < len(words):
+            node = self.root
+            best = None
+            for end in range(start, len(words)):
+                node = node.get(words[end])
+                if node is None:
+                    break
+                if END in node:
+                    best = (start, end + 1, node[END])
+            if best:
+                matches.append(best)
+                start = best[1]
+            else:
+                start += 1
+        return matches
+
+
+class NameIndex:
+    """Normalized names and aliases mapped to values, with exact, in-text and fuzzy lookup
+
+    Earlier names win, so data files list the most important entry first.
+    """
+
+    def __init__(self, names):
+        self.names = {}
+        for name, value in names:
+            key = normalize(name)
+            if key:
+                self.names.setdefault(key, value)
+        self.trie = PhraseTrie()
+        for key, value in self.names.items():
+            self.trie.add(key, value)
+        # Fuzzy candidates grouped by first letter, to keep difflib's search small
+        self.by_initial = {}
+        for key in self.names:
+            self.by_initial.setdefault(key[0], []).append(key)
+
+    def __len__(self):
+        return len(self.names)
+
+    def lookup(self, name):
+        """The value with exactly this name or alias, or None"""
+        return self.names.get(normalize(name))
+
+    def fuzzy(self, key, cutoff=0.85):
+        """Closest name to a normalized key (misspellings, transcription errors), or None"""
+        if len(key) < 4:
+            return None
+        matches = difflib.get_close_matches(key, self.by_initial.get(key[0], ()), n=1, cutoff=cutoff)
+        return self.names[matches[0]] if matches else None
+
+    def find(self, text, context=False, words=None):
+        """Values named in an utterance, in order
+
+        Names in COMMON_WORDS only count when context(words, start) is true.
+        """
+        words = words if words is not None else normalize(text).split()
+        found = []
+        for start, end, value in self.trie.find(words):
+            key = ' '.join(words[start:end])
+            if key in COMMON_WORDS and not (context and context(words, start)):
+                continue
+            if value not in found:
+                found.append(value)
+        return found
+
+
+class CityIndex(NameIndex):
+    """City names and aliases mapped to their country and timezone
+
+    Rows are ordered by population, so an ambiguous name ("Portland") resolves
+    to the largest city with that name.
+    """
+
+    @classmethod
+    def from_file(cls, path=DEFAULT_CITIES_PATH):
+        cities = []
+        aliases = []
+        with open(path, encoding='utf-8', newline='') as f:
+            for row in csv.DictReader(f, delimiter='\t'):
+                city = City(row['name'], row['country'], row['timezone'], int(row['population'] or 0))
+                cities.append((city.name, city))
+                aliases.extend((alias, city) for alias in row['aliases'].split(',') if alias)
+        return cls(cities + aliases)
+
+    def find(self, text, context=None, words=None):
+        """Cities named in an utterance; everyday-word names need "in"/"at"/... before them"""
+        return super().find(text, context or self.after_preposition, words)
+
+    @staticmethod
+    def after_preposition(words, start):
+        return start > 0 and words[start - 1] in PLACE_PREPOSITIONS
+
+    def resolve(self, text, fuzzy=True):
+        """Best city for a free-text place ("los angelos right now"), or None
+
+        Tries the whole text, then shorter leading word runs, then a fuzzy
+        match for misspellings and transcription errors.
+        """
+        words = normalize(text).split()
+        if len(words) > 1 and words[0] == 'the' and ' '.join(words) not in self.names:
+            words = words[1:]
+        for length in range(len(words), 0, -1):
+            city = self.names.get(' '.join(words[:length]))
+            if city:
+                return city
+        if not fuzzy:
+            return None
+
+        for length in range(min(len(words), 4), 0, -1):
+            city = self.fuzzy(' '.join(words[:length]))
+            if city:
+                return city
+        return None
+
+
+class TickerIndex(NameIndex):
+    """Company names, aliases and symbols mapped to stock ticker symbols"""
+
+    def __init__(self, companies, aliases=()):
+        self.companies = dict(companies)
+        super().__init__([(name, symbol) for symbol, name in companies] + list(aliases))
+
+    @classmethod
+    def from_file(cls, path=DEFAULT_TICKERS_PATH):
+        companies = []
+        aliases = []
+        with open(path, encoding='utf-8', newline='') as f:
+            for row in csv.DictReader(f, delimiter='\t'):
+                companies.append((row['symbol'], row['name']))
+                aliases.extend((alias, row['symbol']) for alias in row['aliases'].split(',') if alias)
+        return cls(companies, aliases)
+
+    def name_of(self, symbol):
+        return self.companies.get(symbol.upper())
+
+    def find(self, text, context=False, words=None):
+        """Symbols for the companies named in an utterance, plus upper-case symbols ("NVDA", "$F")
+
+        context (bool) admits everyday-word names such as "Target" or "Visa".
+        """
+        symbols = super().find(text, (lambda _words, _start: True) if context else None, words)
+        for dollar, upper in SYMBOL_PATTERN.findall(text):
+            symbol = (dollar or upper).upper().replace('.', '-')
+            if upper and symbol.lower() in COMMON_WORDS and not context:
+                continue
+            if symbol in self.companies and symbol not in symbols:
+                symbols.append(symbol)
+        return symbols
+
+
+@functools.lru_cache(maxsize=None)
+def get_city_index():
+    """The shared CityIndex, loaded from the bundled data on first use"""
+    return CityIndex.from_file()
+
+
+@functools.lru_cache(maxsize=None)
+def get_ticker_index():
+    """The shared TickerIndex, loaded from the bundled data on first use"""
+    return TickerIndex.from_file()
@@ -0,0 +1,282 @@
+import json
+import os
+import re
+
+from gazetteer import COMMON_WORDS, get_city_index, get_ticker_index, normalize
+
+DEFAULT_TABLE_PATH = os.path.join(os.path.dirname(os.path.abspath(__file__)), 'data', 'intents.json')
+
+WORD_PATTERN = re.compile(r"[a-z0-9]+")
+
+# Free-text entities that are not in the phrase table
+CITY_PATTERN = re.compile(
+    r"\b(?:weather|temperature|hot|cold|rain|raining|sunny|cloudy)\s+(?:in|at|for)\s+([^?.!,;]+)",
+    re.IGNORECASE
+)
+TIME_PLACE_PATTERN = re.compile(
+    r"\b(?:time|date|day|clock)\b[^?.!,;]*?\b(?:in|at)\s+([^?.!,;]+)",
+    re.IGNORECASE
+)
+# Words that start a time or a relative place rather than a city name ("weather in the morning")
+NON_PLACE_WORDS = {
+    'morning', 'afternoon', 'evening', 'night', 'tonight', 'today', 'tomorrow', 'yesterday', 'noon',
+    'midnight', 'weekend', 'week', 'month', 'moment', 'next', 'this', 'that', 'these', 'my', 'our',
+    'your', 'here', 'there', 'area', 'town', 'city', 'home', 'outside', 'general', 'a', 'an'
+}
+
+# Verbs that open an app when they come right before its name ("launch the calculator")
+APP_VERBS = {'open', 'launch', 'start'}
+
+# Intents under which ordinary-word company names ("Target", "Visa") count as tickers
+TICKER_CONTEXT_INTENTS = ('stock', 'market_cap')
+FUZZY_TICKER_CUTOFF = 0.9
+# Words that ask for a quote; misheard company names are only looked for right beside one
+TICKER_CUES = {'stock', 'stocks', 'share', 'shares', 'price', 'prices', 'quote', 'ticker'}
+TRAILING_FILLER = re.compile(r"(?:\s+(?:today|tonight|tomorrow|now|right now|currently|please))+$", re.IGNORECASE)
+QUOTED_NAME = re.compile(r"[\"']([^\"']+)[\"']")
+CALLED_NAME = re.compile(r"\b(?:called|named)\s+(.+)$", re.IGNORECASE)
+FOLDER_WORD_NAME = re.compile(r"\b(?:folder|directory)\s+(?!called\b|named\b)(\S+)", re.IGNORECASE)
+TIME_WINDOW = re.compile(r"\b(\d+|a|an|one)?\s*(second|sec|minute|min|hour|hr)s?\b", re.IGNORECASE)
+TIME_UNITS = {'second': 1, 'sec': 1, 'minute': 60, 'min': 60, 'hour': 3600, 'hr': 3600}
+
+
+class Route:
+    """Intents and entities detected in one utterance"""
+
+    def __init__(self, text):
+        self.text = text
+        self.intents = set()
+        self.entities = {}
+        # Normalized words that named an entity, so callers can tell what else was said
+        self.entity_words = set()
+
+    def has(self, *intents):
+        return any(intent in self.intents for intent in intents)
+
+    def get(self, entity):
+        return self.entities.get(entity, [])
+
+    def first(self, entity):
+        values = self.get(entity)
+        return values[0] if values else None
+
+    def add_entity(self, entity, value, front=False):
+        values = self.entities.setdefault(entity, [])
+        if value in values:
+            if not front:
+                return
+            values.remove(value)
+        if front:
+            values.insert(0, value)
+        else:
+            values.append(value)
+
+    def to_dict(self):
+        return {'intents': sorted(self.intents), 'entities': self.entities}
+
+
+class IntentRouter:
+    """Classify an utterance in a single pass over its words
+
+    Keywords and entity names come from a data table (data/intents.json), so
+    new intents, cities, tickers or coins can be added without code changes.
+    """
+
+    def __init__(self, table):
+        # Phrases are indexed by their first word, so routing is one tokenizing
+        # regex pass plus a dict lookup per word
+        self.phrases = {}
+        # Intent keywords ("cost", "value") are never company names
+        self.intent_words = {word for phrases in table.get('intents', {}).values()
+                             for phrase in phrases for word in WORD_PATTERN.findall(phrase.lower())}
+        self.entity_values = {entity: set(names.values()) for entity, names in table.get('entities', {}).items()}
+        for intent, phrases in table.get('intents', {}).items():
+            for phrase in phrases:
+                self._add_phrase(phrase, ('intent', intent, None))
+        for entity, names in table.get('entities', {}).items():
+            for name, value in names.items():
+                self._add_phrase(name, ('entity', entity, value))
+
+    def _add_phrase(self, phrase, tag):
+        words = tuple(WORD_PATTERN.findall(phrase.lower()))
+        if not words:
+            return
+        candidates = self.phrases.setdefault(words[0], {})
+        candidates.setdefault(words, []).append(tag)
+
+    @classmethod
+    def from_file(cls, path=DEFAULT_TABLE_PATH):
+        with open(path, encoding='utf-8') as f:
+            return cls(json.load(f))
+
+    def route(self, text):
+        """Return the Route for an utterance"""
+        text = ' '.join(text.split())
+        route = Route(text)
+
+        words = WORD_PATTERN.findall(text.lower())
+        app_starts = []
+        for index, word in enumerate(words):
+            candidates = self.phrases.get(word)
+            if not candidates:
+                continue
+            for phrase, tags in candidates.items():
+                if len(phrase) > 1 and tuple(words[index:index + len(phrase)]) != phrase:
+                    continue
+                for kind, name, value in tags:
+                    if kind == 'intent':
+                        route.intents.add(name)
+                    else:
+                        route.add_entity(name, value)
+                        route.entity_words.update(phrase)
+                        if name == 'app':
+                            app_starts.append(index)
+
+        # Intents that depend on a combination of matches
+        if 'open' in route.intents and route.get('site'):
+            route.intents.add('open_website')
+        if any(self.follows_app_verb(words, start) for start in app_starts):
+            route.intents.add('open_app')
+
+        # The gazetteers share the router's tokens unless accents need folding
+        names = words if text.isascii() else normalize(text).split()
+        self.add_tickers(route, names)
+        if route.has('weather', 'time', 'ask_time', 'ask_date'):
+            self.add_cities(route, names)
+
+        if 'trend' in route.intents:
+            window = self.extract_window_seconds(text)
+            if window:
+                route.add_entity('window_seconds', window)
+
+        if 'create_folder' in route.intents:
+            folder_name = self.extract_folder_name(text)
+            if folder_name:
+                route.add_entity('folder_name', folder_name)
+
+        return route
+
+    @staticmethod
+    def follows_app_verb(words, start):
+        """Whether an app name at words[start] is what an open verb acts on ("open the notepad")"""
+        before = words[max(0, start - 2):start]
+        if before[-1:] == ['the']:
+            before = before[:-1]
+        return bool(before) and before[-1] in APP_VERBS
+
+    def add_tickers(self, route, words):
+        """Stock symbols for the companies and symbols the utterance names"""
+        tickers = get_ticker_index()
+        context = route.has(*TICKER_CONTEXT_INTENTS)
+        symbols = tickers.find(route.text, context, words)
+        if not symbols and not route.get('crypto') and route.has('stock', 'price'):
+            # Misheard company names ("microsfot stock"), only where a quote was asked for
+            for word in self.fuzzy_ticker_candidates(tickers, words):
+                symbol = tickers.fuzzy(word, cutoff=FUZZY_TICKER_CUTOFF)
+                if symbol:
+                    symbols.append(symbol)
+                    route.entity_words.add(word)
+                    break
+        for symbol in symbols:
+            route.add_entity('ticker', symbol)
+        if symbols:
+            self.mark_names(route, tickers, words, lambda symbol: symbol in symbols)
+            route.entity_words.update(word for word in words if word.upper() in symbols)
+
+    def add_cities(self, route, words):
+        """Cities from the gazetteer, with the one in the weather or time slot first"""
+        cities = get_city_index()
+        found = cities.find(route.text, words=words)
+        for city in found:
+            route.add_entity('city', city.name)
+        if found:
+            self.mark_names(route, cities, words, lambda city: city in found)
+
+        place = None
+        if 'weather' in route.intents:
+            place = self.extract_city(route.text)
+        if not place and route.has('time', 'ask_time', 'ask_date'):
+            place = self.extract_time_place(route.text)
+        if not place:
+            return
+
+        # Only gazetteer cities are emitted; weather without one uses Config.DEFAULT_CITY
+        city = cities.resolve(place, fuzzy=self.may_be_place(place))
+        if city:
+            route.add_entity('city', city.name, front=True)
+            route.entity_words.update(normalize(place).split())
+
+    def fuzzy_ticker_candidates(self, tickers, words):
+        """Words that may be a misheard company name: unknown words right beside a quote cue"""
+        for index, word in enumerate(words):
+            if word in self.intent_words or word in COMMON_WORDS or not self.beside_cue(words, index):
+                continue
+            # "the stock of apples": a plural of a name is an everyday noun
+            if word.endswith('s') and tickers.lookup(word[:-1]):
+                continue
+            yield word
+
+    @staticmethod
+    def beside_cue(words, index):
+        """Whether words[index] is next to a ticker cue ("nvda stock", "x's price", "price of x")"""
+        after = words[index + 1:index + 3]
+        if after[:1] == ['s']:
+            after = after[1:]
+        before = words[max(0, index - 2):index]
+        if before[-1:] == ['of']:
+            before = before[:-1]
+        return bool((after and after[0] in TICKER_CUES) or (before and before[-1] in TICKER_CUES))
+
+    def mark_names(self, route, index, words, wanted):
+        """Note the words that named the wanted values of a gazetteer"""
+        for start, end, value in index.trie.find(words):
+            if wanted(value):
+                route.entity_words.update(words[start:end])
+
+    def may_be_place(self, place):
+        """Whether free text after "in"/"at" could be a misspelled city rather than a time or "here" """
+        words = normalize(place).split()
+        if words[:1] == ['the']:
+            words = words[1:]
+        return bool(words) and words[0] not in NON_PLACE_WORDS
+
+    def is_known(self, entity, value):
+        """Whether value comes from the entity table or a gazetteer rather than free text"""
+        if entity == 'city':
+            return get_city_index().lookup(value) is not None
+        if entity == 'ticker':
+            return get_ticker_index().name_of(value) is not None
+        return value in self.entity_values.get(entity, ())
+
+    def extract_city(self, text):
+        """Place named after "weather in ...", "temperature at ..." etc."""
+        match = CITY_PATTERN.search(text)
+        if not match:
+            return None
+        return TRAILING_FILLER.sub('', match.group(1)).strip() or None
+
+    def extract_time_place(self, text):
+        """Place named after "time in ...", "date in ..." etc."""
+        match = TIME_PLACE_PATTERN.search(text)
+        if not match:
+            return None
+        return TRAILING_FILLER.sub('', match.group(1)).strip() or None
+
+    def extract_window_seconds(self, text):
+        """Length of a window like "the last 5 minutes" in seconds"""
+        match = TIME_WINDOW.search(text)
+        if not match:
+            return None
+        count = match.group(1)
+        count = int(count) if count and count.isdigit() else 1
+        return count * TIME_UNITS[match.group(2).lower()]
+
+    def extract_folder_name(self, text):
+        """Folder name given in quotes, after "called"/"named" or after "folder" """
+        for pattern in (QUOTED_NAME, CALLED_NAME, FOLDER_WORD_NAME):
+            match = pattern.search(text)
+            if match:
+                name = match.group(1).strip().strip('"\'')
+                if name:
+                    return name
+        return None
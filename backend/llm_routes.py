@@ -0,0 +1,64 @@
+from metrics import registry
+
+
+class CompletionRoute:
+    """Model, reply budget and instruction for one kind of request"""
+
+    def __init__(self, name, intents=(), model=None, max_tokens=150, temperature=0.7, instruction=None,
+                 entities=(), excluded_intents=()):
+        self.name = name
+        self.intents = frozenset(intents)
+        # When given, at least one of these entities must have been resolved
+        self.entities = tuple(entities)
+        self.excluded_intents = frozenset(excluded_intents)
+        self.model = model
+        self.max_tokens = max_tokens
+        self.temperature = temperature
+        self.instruction = instruction
+
+    def matches(self, route):
+        # A route without intents is the catch-all
+        if not self.intents:
+            return True
+        if route is None or self.intents.isdisjoint(route.intents):
+            return False
+        if not self.excluded_intents.isdisjoint(route.intents):
+            return False
+        return not self.entities or any(route.get(entity) for entity in self.entities)
+
+    def options(self, default_model):
+        """Keyword arguments for chat.completions.create"""
+        return {
+            "model": self.model or default_model,
+            "max_tokens": self.max_tokens,
+            "temperature": self.temperature
+        }
+
+
+class CompletionPolicy:
+    """Pick completion settings from the intents an utterance was routed to
+
+    Routes are tried in table order and the first one sharing an intent with
+    the utterance wins, so more specific routes (e.g. "detailed") go first.
+    A route may also require a resolved entity (a ticker, a city) or be ruled
+    out by an intent such as "explain".
+    Requests no route claims use the catch-all route, or the built-in default.
+    """
+
+    def __init__(self, table, default_model, enabled=True):
+        self.default_model = default_model
+        self.routes = [CompletionRoute(**entry) for entry in table] if enabled else []
+        self.fallback = next((r for r in self.routes if not r.intents), CompletionRoute('general'))
+
+    def select(self, route=None):
+        for completion in self.routes:
+            if completion.matches(route):
+                return completion
+        return self.fallback
+
+    def options(self, completion):
+        return completion.options(self.default_model)
+
+    def observe(self, completion, seconds):
+        """Completion latency per route (token usage is counted with the reply)"""
+        registry.observe('jarvis_llm_route_seconds', seconds, route=completion.name)
@@ -0,0 +1,241 @@
+import asyncio
+import contextlib
+import heapq
+import itertools
+import threading
+import time
+
+from metrics import registry
+
+# Lower rank is served first; voice turns go ahead of /chat/batch work
+PRIORITIES = {'interactive': 0, 'batch': 1}
+
+FALLBACK_RESPONSE = "I'm getting a lot of requests right now. Please ask me again in a moment."
+
+
+class QueueTimeout(Exception):
+    """An LLM call waited past its queue deadline without being admitted"""
+
+
+class TokenBucket:
+    """Allow per_minute units per minute, in bursts of up to burst_seconds' worth
+
+    A short burst keeps any rolling minute close to per_minute, where a full
+    minute's burst could let nearly twice that through.
+    """
+
+    def __init__(self, per_minute, burst_seconds=10):
+        self.rate = per_minute / 60
+        self.capacity = max(1, self.rate * burst_seconds)
+        self.level = self.capacity
+        self.updated = time.monotonic()
+
+    def refill(self, now):
+        self.level = min(self.capacity, self.level + (now - self.updated) * self.rate)
+        self.updated = now
+
+    def wait_time(self, amount, now):
+        """Seconds until amount is available (0 if it is now)"""
+        self.refill(now)
+        amount = min(amount, self.capacity)
+        return 0 if self.level >= amount else (amount - self.level) / self.rate
+
+    def take(self, amount):
+        self.level -= min(amount, self.capacity)
+
+    def give(self, amount):
+        self.level = min(self.capacity, self.level + amount)
+
+
+class _Waiter:
+    def __init__(self, priority, tokens, deadline, notify):
+        self.priority = priority
+        self.tokens = tokens
+        self.deadline = deadline
+        self.notify = notify
+        self.enqueued = time.monotonic()
+        self.granted = False
+        self.cancelled = False
+
+
+class LLMScheduler:
+    """Admission control in front of chat completion calls
+
+    At most max_concurrency calls run at once, and requests_per_minute and
+    tokens_per_minute (0 = unlimited) are enforced with token buckets before a
+    call is sent, instead of finding out from a 429. Waiting calls are admitted
+    by priority, then arrival; one that is still queued at its deadline raises
+    QueueTimeout so the caller can answer with a fallback right away.
+    """
+
+    def __init__(self, max_concurrency=8, requests_per_minute=0, tokens_per_minute=0, deadlines=None,
+                 burst_seconds=10):
+        self.max_concurrency = max_concurrency
+        self.requests = TokenBucket(requests_per_minute, burst_seconds) if requests_per_minute else None
+        self.tokens = TokenBucket(tokens_per_minute, burst_seconds) if tokens_per_minute else None
+        self.deadlines = deadlines or {}
+        self.lock = threading.Lock()
+        self.queue = []
+        self.sequence = itertools.count()
+        self.waiting = dict.fromkeys(PRIORITIES, 0)
+        self.running = 0
+        self.paused_until = 0
+        self.admitted = 0
+        self.rejected = 0
+
+    @contextlib.contextmanager
+    def slot(self, priority='interactive', tokens=0, metadata=None):
+        """Hold one admitted call for the duration of the with block"""
+        event = threading.Event()
+        waiter = self._enqueue(priority, tokens, event.set)
+        try:
+            while True:
+                with self.lock:
+                    wait = self._dispatch()
+                    remaining = self._check(waiter)
+                if remaining is None:
+                    break
+                event.wait(min(remaining, wait) if wait else remaining)
+        except BaseException:
+            self._abandon(waiter)
+            raise
+        self._admitted(waiter, metadata)
+        try:
+            yield
+        finally:
+            self._release()
+
+    @contextlib.asynccontextmanager
+    async def slot_async(self, priority='interactive', tokens=0, metadata=None):
+        """Async variant of slot, waiting without holding a thread"""
+        loop = asyncio.get_running_loop()
+        admitted = loop.create_future()
+
+        def notify():
+            loop.call_soon_threadsafe(lambda: admitted.done() or admitted.set_result(True))
+
+        waiter = self._enqueue(priority, tokens, notify)
+        try:
+            while True:
+                with self.lock:
+                    wait = self._dispatch()
+                    remaining = self._check(waiter)
+                if remaining is None:
+                    break
+                with contextlib.suppress(asyncio.TimeoutError):
+                    await asyncio.wait_for(asyncio.shield(admitted), min(remaining, wait) if wait else remaining)
+        except BaseException:
+            # Also reached when the client disconnects while the call is queued
+            self._abandon(waiter)
+            raise
+        self._admitted(waiter, metadata)
+        try:
+            yield
+        finally:
+            self._release()
+
+    def pause(self, seconds):
+        """Admit nothing for a while, e.g. after the API answered 429"""
+        with self.lock:
+            self.paused_until = max(self.paused_until, time.monotonic() + seconds)
+        registry.inc('jarvis_llm_rate_limited_total')
+
+    def settle(self, estimated, actual):
+        """Return unused estimated tokens to the bucket once real usage is known"""
+        if self.tokens is not None and actual is not None and actual < estimated:
+            with self.lock:
+                self.tokens.give(estimated - actual)
+
+    def stats(self):
+        with self.lock:
+            return {
+                "running": self.running,
+                "max_concurrency": self.max_concurrency,
+                "waiting": dict(self.waiting),
+                "admitted": self.admitted,
+                "rejected": self.rejected,
+                "paused": self.paused_until > time.monotonic()
+            }
+
+    def _enqueue(self, priority, tokens, notify):
+        if priority not in PRIORITIES:
+            raise ValueError(f"Unknown priority: {priority}")
+        deadline = self.deadlines.get(priority)
+        waiter = _Waiter(priority, tokens, time.monotonic() + deadline if deadline else None, notify)
+        with self.lock:
+            heapq.heappush(self.queue, (PRIORITIES[priority], next(self.sequence), waiter))
+            self.waiting[priority] += 1
+            self._publish_depth(priority)
+        return waiter
+
+    def _dispatch(self):
+        """Admit queued calls while there is room; seconds until a rate limit frees up, if that is what blocks"""
+        now = time.monotonic()
+        while self.queue and self.running < self.max_concurrency:
+            _, _, waiter = self.queue[0]
+            if waiter.cancelled:
+                heapq.heappop(self.queue)
+                continue
+            wait = max(
+                self.paused_until - now,
+                self.requests.wait_time(1, now) if self.requests else 0,
+                self.tokens.wait_time(waiter.tokens, now) if self.tokens else 0
+            )
+            if wait > 0:
+                return wait
+            heapq.heappop(self.queue)
+            if self.requests:
+                self.requests.take(1)
+            if self.tokens:
+                self.tokens.take(waiter.tokens)
+            self.running += 1
+            self.waiting[waiter.priority] -= 1
+            self._publish_depth(waiter.priority)
+            waiter.granted = True
+            waiter.notify()
+        return None
+
+    def _check(self, waiter):
+        """None once the waiter is admitted, else the seconds left until its deadline (raises past it)"""
+        if waiter.granted:
+            return None
+        if waiter.deadline is None:
+            return 1.0
+        remaining = waiter.deadline - time.monotonic()
+        if remaining > 0:
+            return remaining
+        waiter.cancelled = True
+        self.waiting[waiter.priority] -= 1
+        self.rejected += 1
+        self._publish_depth(waiter.priority)
+        registry.inc('jarvis_llm_rejected_total', priority=waiter.priority)
+        raise QueueTimeout(f"LLM queue deadline exceeded ({waiter.priority})")
+
+    def _abandon(self, waiter):
+        """Drop a waiter that stopped waiting, giving back its slot if it was just admitted"""
+        with self.lock:
+            if waiter.cancelled:
+                return
+            waiter.cancelled = True
+            if not waiter.granted:
+                self.waiting[waiter.priority] -= 1
+                self._publish_depth(waiter.priority)
+                return
+        self._release()
+
+    def _admitted(self, waiter, metadata):
+        waited = time.monotonic() - waiter.enqueued
+        with self.lock:
+            self.admitted += 1
+            registry.set('jarvis_llm_in_flight', self.running)
+        registry.observe('jarvis_llm_queue_wait_seconds', waited, priority=waiter.priority)
+        registry.record('llm_queue', waited, metadata)
+
+    def _release(self):
+        with self.lock:
+            self.running -= 1
+            registry.set('jarvis_llm_in_flight', self.running)
+            self._dispatch()
+
+    def _publish_depth(self, priority):
+        registry.set('jarvis_llm_queue_depth', self.waiting[priority], priority=priority)
@@ -0,0 +1,183 @@
+import datetime
+import re
+
+from gazetteer import get_city_index, normalize
+from plugins import lazy_import
+from system_monitor import describe_window
+
+pytz = lazy_import('pytz')
+
+# Words that signal the user wants more than a data readout
+COMPLEX_WORDS = {
+    'why', 'explain', 'compare', 'versus', 'vs', 'difference', 'history', 'should',
+    'would', 'could', 'predict', 'forecast', 'tomorrow', 'yesterday', 'ago', 'until',
+    'since', 'between', 'if', 'joke', 'story', 'poem', 'detailed', 'detail'
+}
+MAX_WORDS = 12
+
+WORD_PATTERN = re.compile(r"[a-z0-9]+")
+LOCATION_PATTERN = re.compile(r"\b(?:in|at)\s+[a-z]", re.IGNORECASE)
+
+# Intents that rule out a local answer
+BLOCKING_INTENTS = {'weather', 'create_folder', 'open_website', 'open_app'}
+
+# Words a readout question may consist of besides the entities it names; anything
+# else ("what time is the super bowl", "price of apple pie") goes to the LLM
+FILLER_WORDS = {
+    'what', 'whats', 's', 'is', 'it', 'the', 'a', 'an', 'me', 'tell', 'please', 'jarvis', 'hey',
+    'right', 'now', 'current', 'currently', 'today', 'can', 'you', 'give', 'show', 'check',
+    'how', 'much', 'my', 'of', 'for', 'in', 'at', 'on', 'and', 'again', 'quick', 'quickly'
+}
+TEMPLATE_WORDS = {
+    'time': {'time', 'date', 'day', 'clock', 'week', 'local'},
+    'price': {'price', 'prices', 'stock', 'stocks', 'share', 'shares', 'trading', 'quote', 'worth',
+              'value', 'cost', 'costs', 'crypto', 'coin', 'doing', 'per'},
+    'system': {'system', 'cpu', 'memory', 'ram', 'disk', 'storage', 'space', 'performance', 'usage',
+               'use', 'used', 'free', 'left', 'available', 'load', 'status', 'info', 'information',
+               'stats', 'computer', 'machine'}
+}
+# Extra words for "CPU usage over the last 5 minutes"
+TREND_WORDS = {'over', 'last', 'past', 'lately', 'recently', 'been', 'has', 'have', 'average',
+               'second', 'seconds', 'sec', 'minute', 'minutes', 'min', 'hour', 'hours', 'hr', 'one'}
+
+
+class LocalAnswerer:
+    """Answer simple data questions from templates instead of calling the LLM
+
+    Only utterances that are short, ask for a single well-understood readout
+    and have their data available are answered; everything else returns None
+    so the caller falls back to the LLM.
+    """
+
+    def __init__(self, get_system_info, get_stock_data, get_crypto_data, get_system_trend=None):
+        self.get_system_info = get_system_info
+        self.get_stock_data = get_stock_data
+        self.get_crypto_data = get_crypto_data
+        self.get_system_trend = get_system_trend
+
+    def answer(self, route):
+        """Return (intent, response) for a confident local answer, or None"""
+        if not self.is_confident(route):
+            return None
+
+        if route.has('ask_time', 'ask_date'):
+            response = self.answer_time(route)
+            return ('time', response) if response else None
+        if route.has('price'):
+            response = self.answer_price(route)
+            return ('price', response) if response else None
+        if route.has('system_info'):
+            response = self.answer_system(route)
+            return ('system', response) if response else None
+        return None
+
+    def is_confident(self, route):
+        words = WORD_PATTERN.findall(route.text.lower())
+        if not words or len(words) > MAX_WORDS:
+            return False
+        if COMPLEX_WORDS.intersection(words):
+            return False
+        if route.has(*BLOCKING_INTENTS):
+            return False
+
+        # Exactly one kind of readout per utterance (time and date go together)
+        kinds = set()
+        if route.has('ask_time', 'ask_date'):
+            kinds.add('time')
+        if route.has('price') and (route.get('ticker') or route.get('crypto')):
+            kinds.add('price')
+        if route.has('system_info'):
+            kinds.add('system')
+        return len(kinds) == 1 and not self.leftover_words(route, kinds.pop())
+
+    def leftover_words(self, route, kind):
+        """Words the readout template and the named entities don't account for"""
+        allowed = FILLER_WORDS | TEMPLATE_WORDS[kind] | route.entity_words
+        trend = kind == 'system' and route.has('trend')
+        if trend:
+            allowed = allowed | TREND_WORDS
+        return [word for word in normalize(route.text).split()
+                if word not in allowed and not (trend and word.isdigit())]
+
+    def answer_time(self, route):
+        cities = route.get('city')
+        if len(cities) > 1:
+            return None
+
+        if cities:
+            city = get_city_index().lookup(cities[0])
+            if not city:
+                return None
+            now = datetime.datetime.now(pytz.timezone(city.timezone))
+            place = f" in {city.name}"
+        elif LOCATION_PATTERN.search(route.text):
+            # Asked about a place we don't know the timezone of
+            return None
+        else:
+            now = datetime.datetime.now()
+            place = ""
+
+        clock = now.strftime('%I:%M %p').lstrip('0')
+        day = f"{now.strftime('%A, %B')} {now.day}, {now.year}"
+        if route.has('ask_time') and route.has('ask_date'):
+            return f"It's {clock} on {day}{place}."
+        if route.has('ask_time'):
+            return f"It's {clock}{place}."
+        return f"Today is {day}{place}."
+
+    def answer_price(self, route):
+        tickers = route.get('ticker')
+        cryptos = route.get('crypto')
+        if len(tickers) + len(cryptos) != 1:
+            return None
+
+        if tickers:
+            data = self.get_stock_data(tickers[0])
+            if not data:
+                return None
+            direction = 'up' if data['change'] >= 0 else 'down'
+            return (f"{data['name']} ({data['symbol']}) is trading at {data['price']:,.2f} {data['currency']}, "
+                    f"{direction} {abs(data['change_percent']):.2f}% today.{self.staleness(data)}")
+
+        data = self.get_crypto_data(cryptos[0])
+        if not data:
+            return None
+        direction = 'up' if data['change_24h'] >= 0 else 'down'
+        return (f"{data['symbol']} is at ${data['price']:,.2f}, "
+                f"{direction} {abs(data['change_24h']):.2f}% over the last 24 hours.{self.staleness(data)}")
+
+    def staleness(self, data):
+        if not data.get('stale'):
+            return ""
+        return f" That's the last known price from {describe_window(data['age_seconds'])} ago."
+
+    def answer_system(self, route):
+        if route.has('trend'):
+            return self.answer_system_trend(route)
+
+        info = self.get_system_info()
+        if not info:
+            return None
+
+        resources = route.get('resource') or ['cpu', 'memory', 'disk']
+        parts = []
+        if 'cpu' in resources:
+            parts.append(f"CPU usage is {info['cpu_usage']}.")
+        if 'memory' in resources:
+            parts.append(f"Memory: {info['memory_used']} of {info['memory_total']} used ({info['memory_percent']}).")
+        if 'disk' in resources:
+            parts.append(f"Disk: {info['disk_used']} of {info['disk_total']} used ({info['disk_percent']}), "
+                         f"{info['disk_free']} free.")
+        return " ".join(parts)
+
+    def answer_system_trend(self, route):
+        if self.get_system_trend is None:
+            return None
+        trend = self.get_system_trend(route.first('window_seconds'))
+        if not trend or trend['samples'] < 2:
+            return None
+
+        cpu = trend['cpu_percent']
+        memory = trend['memory_percent']
+        return (f"Over the last {describe_window(trend['window_seconds'])}, CPU usage averaged {cpu['avg']}% "
+                f"(peak {cpu['max']}%) and memory usage averaged {memory['avg']}% (peak {memory['max']}%).")
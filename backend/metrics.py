@@ -0,0 +1,146 @@
+import contextlib
+import math
+import threading
+import time
+
+# Latency buckets in seconds, from in-memory lookups up to slow LLM calls
+DEFAULT_BUCKETS = (0.001, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1, 2.5, 5, 10)
+
+METRIC_HELP = {
+    'jarvis_stage_seconds': 'Time spent in each request processing stage',
+    'jarvis_context_provider_seconds': 'Time spent in each context provider',
+    'jarvis_http_request_seconds': 'HTTP request latency until the response is handed to the server',
+    'jarvis_http_requests_total': 'HTTP requests by endpoint and status',
+    'jarvis_responses_total': 'Responses by where the answer came from',
+    'jarvis_llm_tokens_total': 'OpenAI tokens used',
+    'jarvis_llm_route_seconds': 'OpenAI completion latency by completion route',
+    'jarvis_cache_requests_total': 'Upstream data cache lookups by result',
+    'jarvis_cache_entries': 'Entries in each upstream data cache',
+    'jarvis_sessions': 'Active conversation sessions',
+    'jarvis_upstream_circuit_open': 'Whether a data provider circuit breaker is open or half-open',
+    'jarvis_upstream_events_total': 'Data provider failures, breaker rejections and hedged retries'
+}
+
+
+def escape_label(value):
+    return str(value).replace('\\', '\\\\').replace('"', '\\"').replace('\n', '\\n')
+
+
+def format_labels(labels):
+    if not labels:
+        return ''
+    return '{' + ','.join(f'{key}="{escape_label(value)}"' for key, value in labels) + '}'
+
+
+def format_value(value):
+    if value == math.inf:
+        return '+Inf'
+    if float(value).is_integer():
+        return str(int(value))
+    return repr(float(value))
+
+
+class _Histogram:
+    def __init__(self, buckets):
+        self.counts = [0] * len(buckets)
+        self.sum = 0.0
+        self.count = 0
+
+
+class MetricsRegistry:
+    """In-process counters, gauges and latency histograms in Prometheus text format"""
+
+    def __init__(self, buckets=DEFAULT_BUCKETS):
+        self.buckets = tuple(buckets)
+        self.histograms = {}  # name -> {label tuple: _Histogram}
+        self.counters = {}    # name -> {label tuple: value}
+        self.gauges = {}      # name -> {label tuple: value}
+        self.collectors = []
+        self.lock = threading.Lock()
+
+    def observe(self, name, seconds, **labels):
+        """Record a duration in the named histogram"""
+        key = tuple(sorted(labels.items()))
+        with self.lock:
+            histogram = self.histograms.setdefault(name, {}).get(key)
+            if histogram is None:
+                histogram = self.histograms[name][key] = _Histogram(self.buckets)
+            for index, bound in enumerate(self.buckets):
+                if seconds <= bound:
+                    histogram.counts[index] += 1
+            histogram.sum += seconds
+            histogram.count += 1
+
+    def inc(self, name, amount=1, **labels):
+        key = tuple(sorted(labels.items()))
+        with self.lock:
+            series = self.counters.setdefault(name, {})
+            series[key] = series.get(key, 0) + amount
+
+    def set_counter(self, name, value, **labels):
+        """Overwrite a counter tracked elsewhere (e.g. cache hit totals)"""
+        key = tuple(sorted(labels.items()))
+        with self.lock:
+            self.counters.setdefault(name, {})[key] = value
+
+    def set(self, name, value, **labels):
+        key = tuple(sorted(labels.items()))
+        with self.lock:
+            self.gauges.setdefault(name, {})[key] = value
+
+    def add_collector(self, collector):
+        """Register collector(registry), called before every render to refresh gauges"""
+        self.collectors.append(collector)
+
+    def record(self, stage, seconds, metadata=None):
+        """Add a stage duration to its histogram and, if given, metadata['timings'] (ms)"""
+        self.observe('jarvis_stage_seconds', seconds, stage=stage)
+        if metadata is not None:
+            metadata.setdefault('timings', {})[stage] = round(seconds * 1000, 1)
+
+    @contextlib.contextmanager
+    def span(self, stage, metadata=None):
+        """Time a block as a request stage"""
+        start = time.perf_counter()
+        try:
+            yield
+        finally:
+            self.record(stage, time.perf_counter() - start, metadata)
+
+    def render(self):
+        """All metrics in the Prometheus text exposition format"""
+        for collector in self.collectors:
+            try:
+                collector(self)
+            except Exception as e:
+                print(f"Metrics collector error: {e}")
+
+        lines = []
+        with self.lock:
+            for name, series in sorted(self.counters.items()):
+                self._header(lines, name, 'counter')
+                for key, value in sorted(series.items()):
+                    lines.append(f"{name}{format_labels(key)} {format_value(value)}")
+
+            for name, series in sorted(self.gauges.items()):
+                self._header(lines, name, 'gauge')
+                for key, value in sorted(series.items()):
+                    lines.append(f"{name}{format_labels(key)} {format_value(value)}")
+
+            for name, series in sorted(self.histograms.items()):
+                self._header(lines, name, 'histogram')
+                for key, histogram in sorted(series.items()):
+                    for bound, count in zip(self.buckets + (math.inf,), histogram.counts + [histogram.count]):
+                        labels = key + (('le', format_value(bound)),)
+                        lines.append(f"{name}_bucket{format_labels(labels)} {count}")
+                    lines.append(f"{name}_sum{format_labels(key)} {format_value(histogram.sum)}")
+                    lines.append(f"{name}_count{format_labels(key)} {histogram.count}")
+        return '\n'.join(lines) + '\n'
+
+    def _header(self, lines, name, kind):
+        if name in METRIC_HELP:
+            lines.append(f"# HELP {name} {METRIC_HELP[name]}")
+        lines.append(f"# TYPE {name} {kind}")
+
+
+registry = MetricsRegistry()
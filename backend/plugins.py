@@ -0,0 +1,87 @@
+import importlib
+import threading
+import time
+
+from metrics import registry
+
+# Every lazily loaded dependency, by name, in registration order
+PLUGINS = {}
+
+
+class Plugin:
+    """A dependency built by loader() the first time it is used"""
+
+    def __init__(self, name, loader):
+        self.name = name
+        self.loader = loader
+        self.value = None
+        self.loaded = False
+        self.load_seconds = None
+        self.lock = threading.Lock()
+
+    def get(self):
+        if self.loaded:
+            return self.value
+        with self.lock:
+            if not self.loaded:
+                start = time.perf_counter()
+                self.value = self.loader()
+                self.load_seconds = time.perf_counter() - start
+                self.loaded = True
+                registry.observe('jarvis_plugin_load_seconds', self.load_seconds, plugin=self.name)
+        return self.value
+
+    def stats(self):
+        return {
+            "loaded": self.loaded,
+            "load_ms": round(self.load_seconds * 1000, 1) if self.load_seconds is not None else None
+        }
+
+
+class LazyProxy:
+    """Stands in for a plugin's value, loading it on first attribute access"""
+
+    def __init__(self, plugin):
+        self._plugin = plugin
+
+    def __getattr__(self, attr):
+        return getattr(self._plugin.get(), attr)
+
+    def __repr__(self):
+        return f"<lazy {self._plugin.name}{'' if self._plugin.loaded else ' (not loaded)'}>"
+
+
+def register(name, loader):
+    """The plugin called name, registering loader for it on first use"""
+    plugin = PLUGINS.get(name)
+    if plugin is None:
+        plugin = PLUGINS.setdefault(name, Plugin(name, loader))
+    return plugin
+
+
+def lazy_import(module_name):
+    """A stand-in for `import module_name` that imports it on first use"""
+    return LazyProxy(register(module_name, lambda: importlib.import_module(module_name)))
+
+
+def lazy_object(name, factory):
+    """A stand-in for factory() (e.g. an API client) that builds it on first use"""
+    return LazyProxy(register(name, factory))
+
+
+def is_loaded(name):
+    plugin = PLUGINS.get(name)
+    return plugin is not None and plugin.loaded
+
+
+def warm(names=None):
+    """Load the named plugins (all registered ones by default) now rather than on first use"""
+    for name in names or list(PLUGINS):
+        try:
+            PLUGINS[name].get()
+        except Exception as e:
+            print(f"Plugin warm-up error ({name}): {e}")
+
+
+def plugin_stats():
+    return {name: plugin.stats() for name, plugin in PLUGINS.items()}
@@ -0,0 +1,130 @@
+import functools
+
+try:
+    import tiktoken
+except ImportError:  # Optional: fall back to an approximate count
+    tiktoken = None
+
+from plugins import register
+
+# Chat format overhead per message and for priming the reply (OpenAI cookbook)
+TOKENS_PER_MESSAGE = 3
+TOKENS_PER_REPLY = 3
+
+
+class TokenCounter:
+    """Count tokens with tiktoken, or estimate them when it is unavailable"""
+
+    def __init__(self, model):
+        self.model = model
+        # The encoding (a large BPE table, downloaded on first use) loads with the first count
+        self.tokenizer = register(f"tiktoken:{model}", self._load_encoding)
+        # History messages are re-counted on every request, so remember them
+        self.count = functools.lru_cache(maxsize=4096)(self._count)
+
+    @property
+    def encoding(self):
+        return self.tokenizer.get()
+
+    def _load_encoding(self):
+        if tiktoken is None:
+            return None
+        try:
+            return tiktoken.encoding_for_model(self.model)
+        except Exception as e:
+            print(f"Tokenizer unavailable, estimating token counts: {e}")
+            return None
+
+    def _count(self, text):
+        if self.encoding is not None:
+            return len(self.encoding.encode(text))
+        # Roughly four characters per token for English text
+        return (len(text) + 3) // 4
+
+    def truncate(self, text, max_tokens):
+        """Cut text down to at most max_tokens tokens"""
+        if self.count(text) <= max_tokens:
+            return text
+        if self.encoding is not None:
+            return self.encoding.decode(self.encoding.encode(text)[:max_tokens])
+        return text[:max_tokens * 4]
+
+    def count_messages(self, messages):
+        return sum(TOKENS_PER_MESSAGE + self.count(m["content"]) for m in messages) + TOKENS_PER_REPLY
+
+
+class PromptBuilder:
+    """Assemble chat prompts within a token budget
+
+    The personality prompt is always the first message and never changes, so
+    the prompt prefix stays identical across requests for provider-side caching.
+    Per-request context goes into a second system message after it.
+    """
+
+    def __init__(self, personality, model, history_budget=1200, max_input_tokens=500,
+                 summary_budget=150):
+        self.counter = TokenCounter(model)
+        self.history_budget = history_budget
+        self.max_input_tokens = max_input_tokens
+        self.summary_budget = summary_budget
+        self.personality_message = {"role": "system", "content": personality}
+
+    @functools.cached_property
+    def personality_tokens(self):
+        return self.counter.count_messages([self.personality_message])
+
+    def trim_history(self, history):
+        """Keep the newest messages that fit in the history budget
+
+        Returns (kept_messages, dropped_messages). The latest message is always
+        kept, truncated if it alone exceeds the input limit.
+        """
+        if not history:
+            return [], []
+
+        latest = dict(history[-1])
+        latest["content"] = self.counter.truncate(latest["content"], self.max_input_tokens)
+        kept = [latest]
+        used = TOKENS_PER_MESSAGE + self.counter.count(latest["content"])
+
+        index = len(history) - 1
+        while index > 0:
+            message = history[index - 1]
+            cost = TOKENS_PER_MESSAGE + self.counter.count(message["content"])
+            if used + cost > self.history_budget:
+                break
+            kept.insert(0, message)
+            used += cost
+            index -= 1
+
+        return kept, history[:index]
+
+    def warm(self, history):
+        """Count tokens for history ahead of time so the next build is cheaper"""
+        for message in history:
+            self.counter.count(message["content"])
+
+    def summarize(self, dropped):
+        """Short extractive note of what the user asked in trimmed messages"""
+        questions = [m["content"].strip() for m in dropped if m["role"] == "user"]
+        if not questions:
+            return None
+        summary = "Earlier in this conversation the user asked about: " + "; ".join(questions)
+        return self.counter.truncate(summary, self.summary_budget)
+
+    def build(self, history, contexts=()):
+        """Return (messages, prompt_token_count) for a chat completion"""
+        kept, dropped = self.trim_history(history)
+
+        dynamic = [context.strip() for context in contexts if context]
+        summary = self.summarize(dropped)
+        if summary:
+            dynamic.append(summary)
+
+        messages = [self.personality_message]
+        if dynamic:
+            messages.append({"role": "system", "content": "\n\n".join(dynamic)})
+        messages += kept
+
+        prompt_tokens = self.personality_tokens + self.counter.count_messages(messages[1:]) - TOKENS_PER_REPLY
+        return messages, prompt_tokens
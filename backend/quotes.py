@@ -0,0 +1,138 @@
+import json
+import os
+import time
+
+from plugins import lazy_import
+
+# yfinance pulls in pandas and numpy, so it is only imported for the first live quote
+yf = lazy_import('yfinance')
+
+DEFAULT_STATIC_QUOTES_PATH = os.path.join(os.path.dirname(os.path.abspath(__file__)), 'data', 'sample_quotes.json')
+
+
+def build_quote(symbol, price, previous_close, currency='USD', volume=None):
+    """Quote dict shared by every provider"""
+    return {
+        'symbol': symbol,
+        'price': float(price),
+        'previous_close': float(previous_close) if previous_close else float(price),
+        'currency': currency or 'USD',
+        'volume': as_volume(volume)
+    }
+
+
+def as_volume(volume):
+    """Volume as an int, or None when missing (yfinance leaves NaN in partial rows)"""
+    try:
+        return int(volume) if volume else None
+    except (TypeError, ValueError):
+        return None
+
+
+class YahooQuoteProvider:
+    """Stock quotes from Yahoo Finance without touching Ticker.info
+
+    quote() reads price, previous close and currency from one small chart
+    request; the large .info payload is only fetched by details(). The batch
+    download has no currency, so each listing's is remembered once known.
+    """
+
+    def __init__(self, timeout=10):
+        self.timeout = timeout
+        self.currencies = {}
+
+    def quote(self, symbol):
+        ticker = yf.Ticker(symbol)
+        history = ticker.history(period="5d", auto_adjust=False, timeout=self.timeout, raise_errors=True)
+        if history.empty:
+            return None
+
+        # Filled in by the history() call above, no extra request
+        meta = ticker.history_metadata or {}
+        closes = history['Close'].dropna()
+        price = meta.get('regularMarketPrice') or closes.iloc[-1]
+        previous_close = closes.iloc[-2] if len(closes) > 1 else meta.get('chartPreviousClose')
+        if meta.get('currency'):
+            self.currencies[symbol] = meta['currency']
+        return build_quote(symbol, price, previous_close, meta.get('currency'), history['Volume'].iloc[-1])
+
+    def quotes(self, symbols):
+        """Quotes for several symbols with a single download"""
+        if len(symbols) == 1:
+            quote = self.quote(symbols[0])
+            return {symbols[0]: quote} if quote else {}
+
+        history = yf.download(symbols, period="5d", group_by='ticker',
+                              auto_adjust=False, progress=False, timeout=self.timeout)
+        quotes = {}
+        for symbol in symbols:
+            try:
+                closes = history[symbol]['Close'].dropna()
+                volumes = history[symbol]['Volume']
+            except KeyError:
+                continue
+            if closes.empty:
+                continue
+            previous_close = closes.iloc[-2] if len(closes) > 1 else None
+            # The volume of the same day as the price, which may be NaN
+            volume = volumes.get(closes.index[-1])
+            quotes[symbol] = build_quote(symbol, closes.iloc[-1], previous_close, self.currency(symbol), volume)
+        return quotes
+
+    def currency(self, symbol):
+        """Trading currency of a listing, looked up once from its chart metadata"""
+        if symbol not in self.currencies:
+            try:
+                self.currencies[symbol] = yf.Ticker(symbol).fast_info['currency']
+            except Exception as e:
+                print(f"Currency lookup error ({symbol}): {e}")
+                return None
+        return self.currencies[symbol]
+
+    def details(self, symbol):
+        """Slow-changing fields that only Ticker.info has"""
+        info = yf.Ticker(symbol).info
+        return {'name': info.get('longName'), 'market_cap': info.get('marketCap')}
+
+
+class StaticQuoteProvider:
+    """Fixed quotes from a JSON file, for tests, benchmarks and offline demos
+
+    latency (seconds) is added to every call to mimic an upstream round trip.
+    """
+
+    def __init__(self, path=DEFAULT_STATIC_QUOTES_PATH, latency=0):
+        with open(path, encoding='utf-8') as f:
+            self.data = {symbol.upper(): fields for symbol, fields in json.load(f).items()}
+        self.latency = latency
+
+    def quote(self, symbol):
+        time.sleep(self.latency)
+        return self._quote(symbol)
+
+    def _quote(self, symbol):
+        fields = self.data.get(symbol.upper())
+        if not fields:
+            return None
+        return build_quote(symbol.upper(), fields['price'], fields.get('previous_close'),
+                           fields.get('currency'), fields.get('volume'))
+
+    def quotes(self, symbols):
+        time.sleep(self.latency)
+        quotes = {symbol: self._quote(symbol) for symbol in symbols}
+        return {symbol: quote for symbol, quote in quotes.items() if quote}
+
+    def details(self, symbol):
+        time.sleep(self.latency)
+        fields = self.data.get(symbol.upper(), {})
+        return {'name': fields.get('name'), 'market_cap': fields.get('market_cap')}
+
+
+def create_quote_provider(provider, **options):
+    """Build the stock quote provider named by provider ("yahoo" or "static")"""
+    if provider == "yahoo":
+        return YahooQuoteProvider(timeout=options.get("timeout", 10))
+    if provider == "static":
+        return StaticQuoteProvider(options.get("path") or DEFAULT_STATIC_QUOTES_PATH,
+                                   latency=options.get("latency", 0))
+    raise ValueError(f"Unknown quote provider: {provider}")
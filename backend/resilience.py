@@ -0,0 +1,218 @@
+import asyncio
+import threading
+import time
+from collections import deque
+from concurrent.futures import FIRST_COMPLETED, ThreadPoolExecutor, wait
+from concurrent.futures import TimeoutError as FutureTimeoutError
+
+
+class UpstreamError(Exception):
+    """An upstream provider failed (transport error, 5xx or rate limit)"""
+
+
+class CircuitOpenError(UpstreamError):
+    """The provider's circuit breaker is open, so the call was not attempted"""
+
+
+class CircuitBreaker:
+    """Stop calling a failing provider for a while, then probe it again
+
+    Opens after failure_threshold consecutive failures. After reset_timeout
+    seconds a single probe call is let through (half-open): success closes
+    the breaker, failure opens it again.
+    """
+
+    def __init__(self, failure_threshold=3, reset_timeout=30):
+        self.failure_threshold = failure_threshold
+        self.reset_timeout = reset_timeout
+        self.state = 'closed'
+        self.failures = 0
+        self.opened_at = 0.0
+        self.probing = False
+        self.lock = threading.Lock()
+
+    def allow(self):
+        """Whether a call may go ahead right now"""
+        with self.lock:
+            if self.state == 'closed':
+                return True
+            if self.state == 'open' and time.monotonic() - self.opened_at >= self.reset_timeout:
+                self.state = 'half_open'
+                self.probing = False
+            if self.state == 'half_open' and not self.probing:
+                self.probing = True
+                return True
+            return False
+
+    def record_success(self):
+        with self.lock:
+            self.state = 'closed'
+            self.failures = 0
+            self.probing = False
+
+    def record_failure(self):
+        with self.lock:
+            self.failures += 1
+            if self.state == 'half_open' or self.failures >= self.failure_threshold:
+                self.state = 'open'
+                self.opened_at = time.monotonic()
+                self.probing = False
+
+
+class Upstream:
+    """Timeouts, circuit breaking and optional hedging for one data provider
+
+    With hedge_percentile set (e.g. 0.95), a call still running after that
+    percentile of recent latencies gets a second, parallel attempt and the
+    first successful result wins.
+    """
+
+    executor = ThreadPoolExecutor(max_workers=16, thread_name_prefix="upstream")
+
+    def __init__(self, name, connect_timeout=1.5, read_timeout=3, failure_threshold=3,
+                 reset_timeout=30, hedge_percentile=0, hedge_min_samples=20):
+        self.name = name
+        self.connect_timeout = connect_timeout
+        self.read_timeout = read_timeout
+        self.breaker = CircuitBreaker(failure_threshold, reset_timeout)
+        self.hedge_percentile = hedge_percentile
+        self.hedge_min_samples = hedge_min_samples
+        self.latencies = deque(maxlen=200)
+        self.lock = threading.Lock()
+        self.calls = 0
+        self.failures = 0
+        self.rejected = 0
+        self.hedges = 0
+
+    @property
+    def timeout(self):
+        """(connect, read) timeout tuple for requests"""
+        return (self.connect_timeout, self.read_timeout)
+
+    def hedge_delay(self):
+        """Seconds to wait before hedging, or None when hedging is off"""
+        if not self.hedge_percentile:
+            return None
+        with self.lock:
+            if len(self.latencies) < self.hedge_min_samples:
+                return None
+            ordered = sorted(self.latencies)
+        return ordered[min(len(ordered) - 1, int(self.hedge_percentile * len(ordered)))]
+
+    def call(self, fetch):
+        """Run fetch() through the breaker; fetch raises on provider failure"""
+        self._before_call()
+        start = time.perf_counter()
+        try:
+            delay = self.hedge_delay()
+            result = fetch() if delay is None else self._hedged(fetch, delay)
+        except Exception:
+            self._after_call(None)
+            raise
+        self._after_call(time.perf_counter() - start)
+        return result
+
+    async def call_async(self, fetch):
+        """Async variant of call where fetch() returns an awaitable"""
+        self._before_call()
+        start = time.perf_counter()
+        try:
+            delay = self.hedge_delay()
+            result = await fetch() if delay is None else await self._hedged_async(fetch, delay)
+        except Exception:
+            self._after_call(None)
+            raise
+        self._after_call(time.perf_counter() - start)
+        return result
+
+    def get(self, session, url, params=None):
+        """GET through a requests session, raising UpstreamError on failure"""
+        def fetch():
+            response = session.get(url, params=params, timeout=self.timeout)
+            self.check_status(response.status_code)
+            return response
+        return self.call(fetch)
+
+    async def get_async(self, client, url, params=None):
+        """GET through an httpx.AsyncClient, raising UpstreamError on failure"""
+        async def fetch():
+            response = await client.get(url, params=params,
+                                        timeout=(self.connect_timeout, self.read_timeout,
+                                                 self.read_timeout, self.connect_timeout))
+            self.check_status(response.status_code)
+            return response
+        return await self.call_async(fetch)
+
+    def check_status(self, status_code):
+        # Client errors like an unknown city are answers, not provider failures
+        if status_code >= 500 or status_code == 429:
+            raise UpstreamError(f"{self.name} returned HTTP {status_code}")
+
+    def _before_call(self):
+        if not self.breaker.allow():
+            with self.lock:
+                self.rejected += 1
+            raise CircuitOpenError(f"{self.name} circuit is open")
+        with self.lock:
+            self.calls += 1
+
+    def _after_call(self, elapsed):
+        if elapsed is None:
+            self.breaker.record_failure()
+            with self.lock:
+                self.failures += 1
+            return
+        self.breaker.record_success()
+        with self.lock:
+            self.latencies.append(elapsed)
+
+    def _hedged(self, fetch, delay):
+        first = self.executor.submit(fetch)
+        try:
+            return first.result(timeout=delay)
+        except FutureTimeoutError:
+            pass
+
+        with self.lock:
+            self.hedges += 1
+        pending = {first, self.executor.submit(fetch)}
+        error = None
+        while pending:
+            done, pending = wait(pending, return_when=FIRST_COMPLETED)
+            for future in done:
+                if future.exception() is None:
+                    return future.result()
+                error = future.exception()
+        raise error
+
+    async def _hedged_async(self, fetch, delay):
+        first = asyncio.ensure_future(fetch())
+        done, _ = await asyncio.wait({first}, timeout=delay)
+        if done:
+            return first.result()
+
+        with self.lock:
+            self.hedges += 1
+        pending = {first, asyncio.ensure_future(fetch())}
+        error = None
+        try:
+            while pending:
+                done, pending = await asyncio.wait(pending, return_when=asyncio.FIRST_COMPLETED)
+                for task in done:
+                    if task.exception() is None:
+                        return task.result()
+                    error = task.exception()
+            raise error
+        finally:
+            for task in pending:
+                task.cancel()
+
+    def stats(self):
+        with self.lock:
+            return {
+                'state': self.breaker.state,
+                'calls': self.calls,
+                'failures': self.failures,
+                'rejected': self.rejected,
+                'hedges': self.hedges
+            }
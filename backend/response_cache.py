@@ -0,0 +1,181 @@
+import math
+import re
+import threading
+import time
+from collections import Counter, OrderedDict
+
+# Answers to these depend on live data or trigger actions, so they are never cached
+TIME_SENSITIVE_INTENTS = {
+    'time', 'ask_time', 'ask_date', 'weather', 'stock', 'crypto', 'price',
+    'system_info', 'trend', 'open', 'open_website', 'open_app', 'create_folder'
+}
+
+# Follow-ups like "tell me more about that" depend on the conversation so far
+REFERENTIAL_WORDS = {
+    'it', 'that', 'this', 'those', 'these', 'them', 'more', 'again', 'he', 'she',
+    'they', 'his', 'her', 'their', 'previous', 'above', 'else', 'remember', 'earlier', 'forget', 'forgot'
+}
+
+# The cache is shared by every session, so questions about the user ("what's my
+# name") are never cached; "me" after a request verb ("tell me a joke") is fine
+FIRST_PERSON_WORDS = {'i', 'im', 'ive', 'me', 'my', 'mine', 'myself', 'we', 'us', 'our', 'ours', 'ourselves'}
+REQUEST_VERBS = {'tell', 'give', 'show', 'teach', 'help'}
+
+# Words that may differ between two phrasings of the same question; every other
+# word and number must match for a fuzzy hit ("capital of austria" vs "australia")
+FUNCTION_WORDS = {
+    'a', 'an', 'the', 'is', 'are', 'was', 'were', 'what', 'whats', 's', 'me', 'i', 'you', 'your', 'my',
+    'tell', 'give', 'do', 'does', 'of', 'to', 'for', 'in', 'on', 'about', 'some', 'any', 'so'
+}
+
+NON_WORD = re.compile(r"[^a-z0-9 ]+")
+POLITE_PREFIX = re.compile(r"^(?:(?:hey|hi|ok|okay|jarvis)\s+)*(?:(?:can|could|would|will)\s+you\s+)?(?:please\s+)?")
+POLITE_SUFFIX = re.compile(r"(?:\s+(?:please|jarvis|thanks|thank you))+$")
+
+
+def normalize(text):
+    """Lowercase, drop punctuation, politeness words and extra whitespace"""
+    text = ' '.join(NON_WORD.sub(' ', text.lower()).split())
+    text = POLITE_SUFFIX.sub('', POLITE_PREFIX.sub('', text))
+    return text
+
+
+def is_personal(words):
+    """Whether normalized words ask about the user rather than the world"""
+    for index, word in enumerate(words):
+        if word not in FIRST_PERSON_WORDS:
+            continue
+        if word == 'me' and index > 0 and words[index - 1] in REQUEST_VERBS:
+            continue
+        return True
+    return False
+
+
+def content_words(key):
+    """The words and numbers of a normalized input that carry its meaning"""
+    return frozenset(word for word in key.split() if word not in FUNCTION_WORDS)
+
+
+def signature(route, key):
+    """What two inputs must share to reuse an answer: intents, entities and content words"""
+    entities = tuple(sorted((name, tuple(values)) for name, values in route.entities.items()))
+    return frozenset(route.intents), entities, content_words(key)
+
+
+class _Entry:
+    def __init__(self, response, vector, signature, expires_at):
+        self.response = response
+        self.vector = vector
+        self.signature = signature
+        self.norm = math.sqrt(sum(count * count for count in vector.values()))
+        self.expires_at = expires_at
+
+
+class ResponseCache:
+    """LLM responses keyed on normalized input, with fuzzy lookup
+
+    Inputs are compared as character n-gram vectors (cosine similarity)
+    through an inverted index, so "tell me a joke!" and "tell me a joke
+    please" can share an answer without any embedding model. A similar input
+    only counts when its intents, entities and content words are the same, as
+    one changed word or number ("12 times 13" vs "12 times 14") barely moves
+    the similarity.
+    """
+
+    def __init__(self, ttl=3600, max_size=500, threshold=0.9, ngram=3):
+        self.ttl = ttl
+        self.max_size = max_size
+        self.threshold = threshold
+        self.ngram = ngram
+        self.entries = OrderedDict()
+        self.index = {}  # n-gram -> set of normalized keys
+        self.lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+
+    def is_cacheable(self, route):
+        if route.has(*TIME_SENSITIVE_INTENTS) or route.get('ticker') or route.get('crypto'):
+            return False
+        words = normalize(route.text).split()
+        return not REFERENTIAL_WORDS.intersection(words) and not is_personal(words)
+
+    def vectorize(self, key):
+        padded = f" {key} "
+        return Counter(padded[i:i + self.ngram] for i in range(len(padded) - self.ngram + 1))
+
+    def lookup(self, route):
+        """Return (response, similarity) for a cached answer, or None"""
+        if not self.is_cacheable(route):
+            return None
+
+        key = normalize(route.text)
+        with self.lock:
+            self._evict_expired()
+
+            entry = self.entries.get(key)
+            if entry is not None:
+                self.entries.move_to_end(key)
+                self.hits += 1
+                return entry.response, 1.0
+
+            best_key, similarity = self._most_similar(key, signature(route, key))
+            if best_key is not None and similarity >= self.threshold:
+                self.entries.move_to_end(best_key)
+                self.hits += 1
+                return self.entries[best_key].response, round(similarity, 3)
+
+            self.misses += 1
+            return None
+
+    def store(self, route, response):
+        if not response or not self.is_cacheable(route):
+            return
+
+        key = normalize(route.text)
+        with self.lock:
+            if key in self.entries:
+                self._remove(key)
+            entry = _Entry(response, self.vectorize(key), signature(route, key), time.monotonic() + self.ttl)
+            self.entries[key] = entry
+            for gram in entry.vector:
+                self.index.setdefault(gram, set()).add(key)
+            while len(self.entries) > self.max_size:
+                self._remove(next(iter(self.entries)))
+
+    def _most_similar(self, key, required):
+        vector = self.vectorize(key)
+        norm = math.sqrt(sum(count * count for count in vector.values()))
+        dots = {}
+        for gram, count in vector.items():
+            for candidate in self.index.get(gram, ()):
+                dots[candidate] = dots.get(candidate, 0) + count * self.entries[candidate].vector[gram]
+        dots = {candidate: dot for candidate, dot in dots.items() if self.entries[candidate].signature == required}
+        if not dots:
+            return None, 0.0
+
+        best_key = max(dots, key=lambda candidate: dots[candidate] / self.entries[candidate].norm)
+        return best_key, dots[best_key] / (norm * self.entries[best_key].norm)
+
+    def _remove(self, key):
+        entry = self.entries.pop(key)
+        for gram in entry.vector:
+            keys = self.index.get(gram)
+            if keys is not None:
+                keys.discard(key)
+                if not keys:
+                    del self.index[gram]
+
+    def _evict_expired(self):
+        now = time.monotonic()
+        expired = [key for key, entry in self.entries.items() if entry.expires_at <= now]
+        for key in expired:
+            self._remove(key)
+
+    def stats(self):
+        with self.lock:
+            return {
+                'size': len(self.entries),
+                'max_size': self.max_size,
+                'hits': self.hits,
+                'misses': self.misses
+            }
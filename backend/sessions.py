@@ -0,0 +1,154 @@
+import sqlite3
+import threading
+import time
+from collections import OrderedDict
+
+DEFAULT_SESSION_ID = "default"
+
+
+class InMemorySessionStore:
+    """Per-session conversation history kept in process memory"""
+
+    def __init__(self, max_messages=10, idle_timeout=1800, max_sessions=1000):
+        self.max_messages = max_messages
+        self.idle_timeout = idle_timeout
+        self.max_sessions = max_sessions
+        self.sessions = OrderedDict()  # session_id -> (last_seen, messages)
+        self.lock = threading.Lock()
+
+    def get_history(self, session_id):
+        """Return a copy of the session's messages, oldest first"""
+        with self.lock:
+            self._evict_idle()
+            entry = self.sessions.get(session_id)
+            if entry is None:
+                return []
+            self.sessions[session_id] = (time.monotonic(), entry[1])
+            self.sessions.move_to_end(session_id)
+            return list(entry[1])
+
+    def append(self, session_id, *messages):
+        """Add messages to a session, keeping only the most recent ones"""
+        with self.lock:
+            self._evict_idle()
+            history = self.sessions.get(session_id, (None, []))[1]
+            history = (history + list(messages))[-self.max_messages:]
+            self.sessions[session_id] = (time.monotonic(), history)
+            self.sessions.move_to_end(session_id)
+            while len(self.sessions) > self.max_sessions:
+                self.sessions.popitem(last=False)
+
+    def clear(self, session_id):
+        with self.lock:
+            self.sessions.pop(session_id, None)
+
+    def count(self):
+        with self.lock:
+            self._evict_idle()
+            return len(self.sessions)
+
+    def _evict_idle(self):
+        # Sessions are ordered by last access, so stale ones are at the front
+        cutoff = time.monotonic() - self.idle_timeout
+        while self.sessions:
+            session_id, (last_seen, _) = next(iter(self.sessions.items()))
+            if last_seen > cutoff:
+                break
+            del self.sessions[session_id]
+
+
+class SQLiteSessionStore:
+    """Per-session conversation history in a SQLite file shared by worker processes"""
+
+    def __init__(self, path, max_messages=10, idle_timeout=1800):
+        self.max_messages = max_messages
+        self.idle_timeout = idle_timeout
+        self.lock = threading.Lock()
+        self.conn = sqlite3.connect(path, timeout=5, check_same_thread=False)
+        with self.lock, self.conn:
+            self.conn.execute("PRAGMA journal_mode=WAL")
+            self.conn.execute(
+                "CREATE TABLE IF NOT EXISTS sessions ("
+                "session_id TEXT PRIMARY KEY, last_seen REAL NOT NULL)"
+            )
+            self.conn.execute(
+                "CREATE TABLE IF NOT EXISTS messages ("
+                "id INTEGER PRIMARY KEY AUTOINCREMENT, session_id TEXT NOT NULL, "
+                "role TEXT NOT NULL, content TEXT NOT NULL)"
+            )
+            self.conn.execute(
+                "CREATE INDEX IF NOT EXISTS messages_session ON messages (session_id, id)"
+            )
+            self.conn.execute(
+                "CREATE INDEX IF NOT EXISTS sessions_last_seen ON sessions (last_seen)"
+            )
+
+    def get_history(self, session_id):
+        """Return a copy of the session's messages, oldest first"""
+        with self.lock, self.conn:
+            self._evict_idle()
+            rows = self.conn.execute(
+                "SELECT role, content FROM messages WHERE session_id = ? ORDER BY id",
+                (session_id,)
+            ).fetchall()
+            if rows:
+                self._touch(session_id)
+        return [{"role": role, "content": content} for role, content in rows]
+
+    def append(self, session_id, *messages):
+        """Add messages to a session, keeping only the most recent ones"""
+        with self.lock, self.conn:
+            self._evict_idle()
+            self._touch(session_id)
+            self.conn.executemany(
+                "INSERT INTO messages (session_id, role, content) VALUES (?, ?, ?)",
+                [(session_id, m["role"], m["content"]) for m in messages]
+            )
+            self.conn.execute(
+                "DELETE FROM messages WHERE session_id = ? AND id NOT IN ("
+                "SELECT id FROM messages WHERE session_id = ? ORDER BY id DESC LIMIT ?)",
+                (session_id, session_id, self.max_messages)
+            )
+
+    def clear(self, session_id):
+        with self.lock, self.conn:
+            self.conn.execute("DELETE FROM messages WHERE session_id = ?", (session_id,))
+            self.conn.execute("DELETE FROM sessions WHERE session_id = ?", (session_id,))
+
+    def count(self):
+        with self.lock, self.conn:
+            self._evict_idle()
+            return self.conn.execute("SELECT COUNT(*) FROM sessions").fetchone()[0]
+
+    def _touch(self, session_id):
+        self.conn.execute(
+            "INSERT INTO sessions (session_id, last_seen) VALUES (?, ?) "
+            "ON CONFLICT(session_id) DO UPDATE SET last_seen = excluded.last_seen",
+            (session_id, time.time())
+        )
+
+    def _evict_idle(self):
+        cutoff = time.time() - self.idle_timeout
+        self.conn.execute(
+            "DELETE FROM messages WHERE session_id IN ("
+            "SELECT session_id FROM sessions WHERE last_seen < ?)",
+            (cutoff,)
+        )
+        self.conn.execute("DELETE FROM sessions WHERE last_seen < ?", (cutoff,))
+
+
+def create_session_store(backend, **options):
+    """Build the session store named by backend ("memory" or "sqlite")"""
+    if backend == "memory":
+        return InMemorySessionStore(
+            max_messages=options.get("max_messages", 10),
+            idle_timeout=options.get("idle_timeout", 1800),
+            max_sessions=options.get("max_sessions", 1000)
+        )
+    if backend == "sqlite":
+        return SQLiteSessionStore(
+            options.get("path", "sessions.db"),
+            max_messages=options.get("max_messages", 10),
+            idle_timeout=options.get("idle_timeout", 1800)
+        )
+    raise ValueError(f"Unknown session backend: {backend}")
@@ -0,0 +1,190 @@
+import array
+import json
+import math
+import sys
+from collections import deque
+
+try:
+    import vosk
+except ImportError:  # Optional: only needed for STT_ENGINE=vosk
+    vosk = None
+
+from metrics import registry
+
+SAMPLE_WIDTH = 2  # 16-bit PCM
+
+
+def pcm_rms(frame):
+    """Root mean square level of a little-endian 16-bit PCM frame"""
+    samples = array.array('h', frame)
+    if sys.byteorder == 'big':
+        samples.byteswap()
+    if not samples:
+        return 0.0
+    return math.sqrt(sum(sample * sample for sample in samples) / len(samples))
+
+
+class EnergyVAD:
+    """Voice activity detection from the energy of fixed-size frames"""
+
+    def __init__(self, threshold=500, frame_ms=30, sample_rate=16000):
+        self.threshold = threshold
+        self.frame_ms = frame_ms
+        self.frame_bytes = int(sample_rate * frame_ms / 1000) * SAMPLE_WIDTH
+
+    def is_speech(self, frame):
+        return pcm_rms(frame) >= self.threshold
+
+
+class StubSTTEngine:
+    """Reveals a fixed transcript as speech arrives, for tests and benchmarks"""
+
+    def __init__(self, transcript="what time is it", word_seconds=0.3):
+        self.transcript = transcript
+        self.word_seconds = word_seconds
+
+    def recognizer(self, sample_rate):
+        return _StubRecognizer(self.transcript.split(), sample_rate * SAMPLE_WIDTH * self.word_seconds)
+
+
+class _StubRecognizer:
+    def __init__(self, words, bytes_per_word):
+        self.words = words
+        self.bytes_per_word = bytes_per_word
+        self.received = 0
+
+    def accept(self, pcm):
+        self.received += len(pcm)
+
+    def partial(self):
+        return ' '.join(self.words[:int(self.received // self.bytes_per_word)])
+
+    def final(self):
+        return ' '.join(self.words)
+
+
+class VoskEngine:
+    """Offline recognition with a Vosk (Kaldi) model directory"""
+
+    def __init__(self, model_path):
+        if vosk is None:
+            raise RuntimeError("vosk is not installed")
+        if not model_path:
+            raise ValueError("STT_MODEL_PATH must point to a Vosk model directory")
+        vosk.SetLogLevel(-1)
+        self.model = vosk.Model(model_path)
+
+    def recognizer(self, sample_rate):
+        return _VoskRecognizer(vosk.KaldiRecognizer(self.model, sample_rate))
+
+
+class _VoskRecognizer:
+    def __init__(self, recognizer):
+        self.recognizer = recognizer
+        self.segments = []
+
+    def accept(self, pcm):
+        # Vosk closes a segment on its own at internal pauses
+        if self.recognizer.AcceptWaveform(pcm):
+            self.segments.append(json.loads(self.recognizer.Result()).get('text', ''))
+
+    def partial(self):
+        partial = json.loads(self.recognizer.PartialResult()).get('partial', '')
+        return ' '.join(text for text in self.segments + [partial] if text)
+
+    def final(self):
+        self.segments.append(json.loads(self.recognizer.FinalResult()).get('text', ''))
+        return ' '.join(text for text in self.segments if text)
+
+
+def create_stt_engine(engine, **options):
+    """Build the STT engine named by engine ("stub" or "vosk"), or None for "none" """
+    if engine == "none":
+        return None
+    if engine == "stub":
+        return StubSTTEngine(options.get("transcript") or "what time is it")
+    if engine == "vosk":
+        return VoskEngine(options.get("model_path"))
+    raise ValueError(f"Unknown STT engine: {engine}")
+
+
+class StreamingTranscriber:
+    """Turn a stream of raw PCM chunks into partial and final transcripts
+
+    Audio is 16-bit little-endian mono at sample_rate. Frames are handed to
+    the engine as they arrive; only a partial frame, a short pre-roll and the
+    engine's incremental state are held, never the whole recording. An
+    utterance ends after silence_ms of silence or max_utterance_seconds.
+    """
+
+    def __init__(self, engine, vad, sample_rate=16000, silence_ms=700,
+                 max_utterance_seconds=15, partial_interval_ms=300, preroll_ms=300):
+        self.engine = engine
+        self.vad = vad
+        self.sample_rate = sample_rate
+        self.silence_ms = silence_ms
+        self.max_utterance_ms = max_utterance_seconds * 1000
+        self.partial_interval_ms = partial_interval_ms
+        # Frames just before speech starts, so the first syllable isn't clipped
+        self.preroll = deque(maxlen=max(1, preroll_ms // vad.frame_ms))
+        self.remainder = b""
+        self.recognizer = None
+        self.speech_ms = 0
+        self.silent_ms = 0
+        self.since_partial_ms = 0
+        self.last_partial = ""
+
+    def feed(self, chunk):
+        """Add a chunk of PCM and return the transcript events it produced"""
+        data = self.remainder + chunk
+        frame_bytes = self.vad.frame_bytes
+        whole = len(data) - len(data) % frame_bytes
+        self.remainder = data[whole:]
+
+        events = []
+        for offset in range(0, whole, frame_bytes):
+            event = self._feed_frame(data[offset:offset + frame_bytes])
+            if event:
+                events.append(event)
+        return events
+
+    def flush(self):
+        """End of stream: finish the utterance in progress"""
+        self.remainder = b""
+        self.preroll.clear()
+        event = self._finish() if self.recognizer else None
+        return [event] if event else []
+
+    def _feed_frame(self, frame):
+        speech = self.vad.is_speech(frame)
+        if self.recognizer is None:
+            if not speech:
+                self.preroll.append(frame)
+                return None
+            self.recognizer = self.engine.recognizer(self.sample_rate)
+            self.recognizer.accept(b"".join(self.preroll))
+            self.preroll.clear()
+            self.speech_ms = self.silent_ms = self.since_partial_ms = 0
+            self.last_partial = ""
+
+        self.recognizer.accept(frame)
+        self.speech_ms += self.vad.frame_ms
+        self.since_partial_ms += self.vad.frame_ms
+        self.silent_ms = 0 if speech else self.silent_ms + self.vad.frame_ms
+
+        if self.silent_ms >= self.silence_ms or self.speech_ms >= self.max_utterance_ms:
+            return self._finish()
+
+        if self.since_partial_ms >= self.partial_interval_ms:
+            self.since_partial_ms = 0
+            text = self.recognizer.partial()
+            if text and text != self.last_partial:
+                self.last_partial = text
+                return {"type": "partial", "text": text}
+        return None
+
+    def _finish(self):
+        with registry.span('stt_final'):
+            text = self.recognizer.final().strip()
+        self.recognizer = None
+        return {"type": "final", "text": text} if text else None
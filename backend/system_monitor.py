@@ -0,0 +1,153 @@
+import platform
+import threading
+import time
+from collections import deque
+
+from plugins import lazy_import
+
+psutil = lazy_import('psutil')
+
+
+class SystemSampler:
+    """Sample CPU, memory, disk and process stats on a background thread
+
+    Snapshots go into a fixed-size ring buffer, so readers get the latest
+    numbers instantly and can look back over recent history for trends.
+    """
+
+    def __init__(self, interval=5, history=120, top_processes=3, disk_path='/'):
+        self.interval = interval
+        self.top_processes = top_processes
+        self.disk_path = disk_path
+        self.samples = deque(maxlen=history)
+        self.lock = threading.Lock()
+        self.stop_event = threading.Event()
+        self.thread = None
+        self.process = None
+
+    def start(self):
+        """Take a first sample and start the sampling thread (idempotent)"""
+        with self.lock:
+            if self.thread is not None:
+                return
+            self.thread = threading.Thread(target=self._run, name="system-sampler", daemon=True)
+
+        # Prime psutil's CPU counters so the first reading covers a real interval
+        psutil.cpu_percent(interval=None)
+        self.get_process().cpu_percent(interval=None)
+        time.sleep(0.1)
+        self._record()
+        self.thread.start()
+
+    def stop(self):
+        self.stop_event.set()
+
+    def get_process(self):
+        if self.process is None:
+            self.process = psutil.Process()
+        return self.process
+
+    def _run(self):
+        while not self.stop_event.wait(self.interval):
+            self._record()
+
+    def _record(self):
+        try:
+            sample = self.collect()
+        except Exception as e:
+            print(f"System sampler error: {e}")
+            return
+        with self.lock:
+            self.samples.append(sample)
+
+    def collect(self):
+        """Read one snapshot without blocking (CPU is measured since the last call)"""
+        memory = psutil.virtual_memory()
+        disk = psutil.disk_usage(self.disk_path)
+
+        processes = []
+        for proc in psutil.process_iter(['pid', 'name', 'cpu_percent', 'memory_percent']):
+            info = proc.info
+            if info['cpu_percent'] is None:
+                continue
+            processes.append({
+                'pid': info['pid'],
+                'name': info['name'],
+                'cpu_percent': round(info['cpu_percent'], 1),
+                'memory_percent': round(info['memory_percent'] or 0, 1)
+            })
+        processes.sort(key=lambda p: (p['cpu_percent'], p['memory_percent']), reverse=True)
+
+        return {
+            'timestamp': time.time(),
+            'cpu_percent': psutil.cpu_percent(interval=None),
+            'memory_total': memory.total,
+            'memory_used': memory.used,
+            'memory_percent': memory.percent,
+            'disk_total': disk.total,
+            'disk_used': disk.used,
+            'disk_free': disk.free,
+            'process_cpu_percent': self.get_process().cpu_percent(interval=None),
+            'process_memory_rss': self.get_process().memory_info().rss,
+            'top_processes': processes[:self.top_processes]
+        }
+
+    def latest(self):
+        """Most recent snapshot, or None before the first sample"""
+        with self.lock:
+            return self.samples[-1] if self.samples else None
+
+    def history(self, seconds=None):
+        """Snapshots from the last `seconds` (all buffered snapshots if None)"""
+        with self.lock:
+            samples = list(self.samples)
+        if seconds is None:
+            return samples
+        cutoff = time.time() - seconds
+        return [s for s in samples if s['timestamp'] >= cutoff]
+
+    def trend(self, seconds=None):
+        """Min/average/max CPU and memory usage over a window"""
+        samples = self.history(seconds)
+        if not samples:
+            return None
+
+        def summarize(key):
+            values = [s[key] for s in samples]
+            return {
+                'min': round(min(values), 1),
+                'avg': round(sum(values) / len(values), 1),
+                'max': round(max(values), 1)
+            }
+
+        return {
+            'samples': len(samples),
+            'window_seconds': round(samples[-1]['timestamp'] - samples[0]['timestamp']),
+            'cpu_percent': summarize('cpu_percent'),
+            'memory_percent': summarize('memory_percent')
+        }
+
+
+def describe_window(seconds):
+    """Spoken length of a trend window, e.g. "5 minutes" """
+    if seconds < 60:
+        return f"{seconds} second{'s' if seconds != 1 else ''}"
+    minutes = round(seconds / 60)
+    return f"{minutes} minute{'s' if minutes != 1 else ''}"
+
+
+def format_system_info(sample):
+    """Render a snapshot in the shape get_system_info has always returned"""
+    return {
+        'cpu_usage': f"{sample['cpu_percent']}%",
+        'memory_total': f"{sample['memory_total'] // (1024**3)} GB",
+        'memory_used': f"{sample['memory_used'] // (1024**3)} GB",
+        'memory_percent': f"{sample['memory_percent']}%",
+        'disk_total': f"{sample['disk_total'] // (1024**3)} GB",
+        'disk_used': f"{sample['disk_used'] // (1024**3)} GB",
+        'disk_free': f"{sample['disk_free'] // (1024**3)} GB",
+        'disk_percent': f"{(sample['disk_used']/sample['disk_total'])*100:.1f}%",
+        'platform': platform.system(),
+        'platform_version': platform.version(),
+        'top_processes': sample['top_processes']
+    }
@@ -0,0 +1,14 @@
+import os
+import sys
+
+import pytest
+
+# Backend modules import each other as top-level modules
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from intent_router import IntentRouter  # noqa: E402
+
+
+@pytest.fixture(scope='session')
+def router():
+    return IntentRouter.from_file()
@@ -0,0 +1,114 @@
+import asyncio
+import threading
+import time
+
+from cache import TTLCache
+
+
+def test_concurrent_misses_share_one_fetch():
+    cache = TTLCache(ttl=60)
+    calls = []
+
+    def fetch():
+        calls.append(1)
+        time.sleep(0.05)
+        return 'value'
+
+    threads = [threading.Thread(target=cache.get_or_fetch, args=('key', fetch)) for _ in range(10)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+    assert len(calls) == 1
+    assert cache.stats()['coalesced'] == 9
+
+
+def test_concurrent_batched_misses_share_one_fetch():
+    cache = TTLCache(ttl=60)
+    calls = []
+    results = []
+
+    def fetch_many(keys):
+        calls.append(list(keys))
+        time.sleep(0.05)
+        return {key: key.lower() for key in keys}
+
+    def lookup():
+        results.append(cache.get_many_or_fetch(['BTC'], fetch_many))
+
+    threads = [threading.Thread(target=lookup) for _ in range(10)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+    assert calls == [['BTC']]
+    assert results == [{'BTC': 'btc'}] * 10
+    assert cache.stats()['coalesced'] == 9
+
+
+def test_batched_lookup_waits_on_a_single_fetch_in_flight():
+    cache = TTLCache(ttl=60)
+    started = threading.Event()
+    calls = []
+
+    def slow_fetch():
+        started.set()
+        time.sleep(0.05)
+        return 'btc'
+
+    thread = threading.Thread(target=cache.get_or_fetch, args=('BTC', slow_fetch))
+    thread.start()
+    started.wait(1)
+    result = cache.get_many_or_fetch(['BTC', 'ETH'], lambda keys: calls.append(keys) or {'ETH': 'eth'})
+    thread.join()
+    assert calls == [['ETH']]
+    assert result == {'BTC': 'btc', 'ETH': 'eth'}
+
+
+def test_async_batched_misses_share_one_fetch():
+    cache = TTLCache(ttl=60)
+    calls = []
+
+    async def fetch_many(keys):
+        calls.append(list(keys))
+        await asyncio.sleep(0.01)
+        return {key: key.lower() for key in keys}
+
+    async def main():
+        return await asyncio.gather(*(cache.get_many_or_fetch_async(['BTC', 'ETH'], fetch_many)
+                                      for _ in range(5)))
+
+    assert asyncio.run(main()) == [{'BTC': 'btc', 'ETH': 'eth'}] * 5
+    assert calls == [['BTC', 'ETH']]
+
+
+def test_failed_keys_are_not_cached_and_release_waiters():
+    cache = TTLCache(ttl=60)
+    assert cache.get_many_or_fetch(['BTC'], lambda keys: {}) == {}
+    assert cache.inflight == {}
+    assert cache.get('BTC') is None
+
+
+def test_expired_values_are_served_stale_until_stale_ttl():
+    cache = TTLCache(ttl=0.01, stale_ttl=60)
+    cache.set('key', 'value')
+    time.sleep(0.02)
+    assert cache.get('key') is None
+    value, age = cache.get_stale('key')
+    assert value == 'value' and age >= 0.01
+
+    cache = TTLCache(ttl=0.01, stale_ttl=0)
+    cache.set('key', 'value')
+    time.sleep(0.02)
+    assert cache.get_stale('key') is None
+
+
+def test_least_recently_used_entry_is_evicted():
+    cache = TTLCache(ttl=60, max_size=2)
+    cache.set('a', 1)
+    cache.set('b', 2)
+    cache.get('a')
+    cache.set('c', 3)
+    assert cache.get('b') is None
+    assert cache.get('a') == 1
+    assert cache.stats()['evictions'] == 1
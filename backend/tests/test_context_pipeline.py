@@ -0,0 +1,73 @@
+import threading
+
+from context_pipeline import ContextPipeline
+
+
+def hung_provider(release):
+    def provider(query):
+        release.wait(5)
+        return 'late'
+    return provider
+
+
+def test_one_slow_call_does_not_skip_the_provider():
+    pipeline = ContextPipeline(max_workers=8, budget=0.05)
+    release = threading.Event()
+    calls = []
+
+    def weather(query):
+        calls.append(query)
+        if query == 'slowville':
+            release.wait(5)
+        return f"weather in {query}"
+
+    contexts, timings = pipeline.run([('weather', weather)], 'slowville')
+    assert timings['weather']['status'] == 'timeout'
+    assert pipeline.stats() == {'weather': 1}
+
+    contexts, timings = pipeline.run([('weather', weather)], 'london')
+    assert contexts == ['weather in london']
+    assert timings['weather']['status'] == 'ok'
+
+    release.set()
+    pipeline.executor.shutdown(wait=True)
+    assert pipeline.stats() == {}
+
+
+def test_stragglers_are_skipped_before_they_starve_other_providers():
+    pipeline = ContextPipeline(max_workers=3, budget=0.05)
+    release = threading.Event()
+    providers = [('slow', hung_provider(release)), ('fast', lambda query: 'fast context')]
+
+    # One hung call leaves a thread for each provider; with two, the slow one is skipped
+    for _ in range(2):
+        contexts, timings = pipeline.run(providers, None)
+        assert timings['slow']['status'] == 'timeout'
+    assert pipeline.stats() == {'slow': 2}
+
+    contexts, timings = pipeline.run(providers, None)
+    assert contexts == ['fast context']
+    assert timings['slow']['status'] == 'busy'
+    assert pipeline.stats() == {'slow': 2}
+
+    release.set()
+    pipeline.executor.shutdown(wait=True)
+    assert pipeline.stats() == {}
+
+
+def test_concurrent_calls_within_budget_are_not_skipped():
+    pipeline = ContextPipeline(max_workers=4, budget=1)
+    started = threading.Barrier(2)
+
+    def provider(query):
+        started.wait(1)
+        return query
+
+    results = []
+    threads = [threading.Thread(target=lambda q=q: results.append(pipeline.run([('p', provider)], q)))
+               for q in ('a', 'b')]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+    assert sorted(contexts[0] for contexts, _ in results) == ['a', 'b']
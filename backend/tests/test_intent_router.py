@@ -0,0 +1,78 @@
+import pytest
+
+
+@pytest.mark.parametrize('text', [
+    "what is the cost of living in tokyo",
+    "how much does a house cost",
+    "the stock of apples at the store",
+    "value of shell",
+])
+def test_everyday_words_are_not_tickers(router, text):
+    assert router.route(text).get('ticker') == []
+
+
+@pytest.mark.parametrize('text, symbol', [
+    ("nvidea stock price", 'NVDA'),
+    ("amazn share price", 'AMZN'),
+    ("Target stock price", 'TGT'),
+])
+def test_company_names_next_to_a_quote_cue(router, text, symbol):
+    assert router.route(text).get('ticker') == [symbol]
+
+
+@pytest.mark.parametrize('text', [
+    "weather in the morning",
+    "weather for tomorrow",
+    "weather in my area",
+    "temperature in here",
+    "temperature at noon",
+])
+def test_times_and_relative_places_are_not_cities(router, text):
+    assert router.route(text).get('city') == []
+
+
+@pytest.mark.parametrize('text, city', [
+    ("weather in Lndon", 'London'),
+    ("what's the weather in the hague", 'The Hague'),
+    ("weather in Paris tomorrow", 'Paris'),
+])
+def test_weather_cities_come_from_the_gazetteer(router, text, city):
+    assert router.route(text).first('city') == city
+
+
+@pytest.mark.parametrize('text', [
+    "what day is christmas this year",
+    "what date is easter",
+    "how long do I cook a turkey, what time should it go in",
+])
+def test_holidays_and_everyday_words_are_not_places(router, text):
+    assert router.route(text).get('city') == []
+
+
+@pytest.mark.parametrize('text, city', [
+    ("what time is it in turkey", 'Istanbul'),
+    ("what time is it on christmas island", 'Christmas Island'),
+])
+def test_places_named_like_everyday_words(router, text, city):
+    assert router.route(text).first('city') == city
+
+
+@pytest.mark.parametrize('text, app', [
+    ('open calculator', 'calculator'),
+    ('please launch the notepad', 'notepad'),
+    ('start file manager', 'file manager'),
+])
+def test_open_verb_before_an_app_name_opens_it(router, text, app):
+    route = router.route(text)
+    assert route.has('open_app')
+    assert route.first('app') == app
+
+
+@pytest.mark.parametrize('text', [
+    'What is the best app to open PDF files?',
+    'How do I start a new application in Django?',
+    'open the file and check the calculator output',
+    'launch a rocket',
+])
+def test_open_verbs_elsewhere_are_not_app_commands(router, text):
+    assert not router.route(text).has('open_app')
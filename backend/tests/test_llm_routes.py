@@ -0,0 +1,37 @@
+import pytest
+
+from config import Config
+from llm_routes import CompletionPolicy
+
+
+@pytest.fixture(scope='module')
+def policy():
+    return CompletionPolicy(Config.LLM_ROUTES, 'default-model')
+
+
+@pytest.mark.parametrize('text', [
+    'what is the weather in paris',
+    'tesla stock',
+    'bitcoin price',
+    'what is my cpu usage',
+    'how much memory am I using',
+])
+def test_readouts_use_the_data_route(router, policy, text):
+    assert policy.select(router.route(text)).name == 'data'
+
+
+@pytest.mark.parametrize('text', [
+    'explain how virtual memory works',
+    'why is the stock market going down',
+    'what is a stock split',
+    'share your thoughts on testing',
+    'how is the system design interview structured',
+    'compare python versus java',
+    'how does bitcoin work',
+])
+def test_coarse_keywords_without_a_readout_use_the_general_route(router, policy, text):
+    assert policy.select(router.route(text)).name == 'general'
+
+
+def test_detail_requests_still_win(router, policy):
+    assert policy.select(router.route('explain the tesla stock price in detail')).name == 'detailed'
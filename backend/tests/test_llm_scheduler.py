@@ -0,0 +1,138 @@
+import asyncio
+import threading
+import time
+
+import pytest
+
+from llm_scheduler import LLMScheduler, QueueTimeout, TokenBucket
+
+
+def wait_until(condition, timeout=2):
+    deadline = time.monotonic() + timeout
+    while not condition():
+        assert time.monotonic() < deadline, "condition not reached"
+        time.sleep(0.005)
+
+
+def hold_slot(scheduler, release, **options):
+    """Start a thread that holds one slot until release is set"""
+    admitted = threading.Event()
+
+    def run():
+        with scheduler.slot(**options):
+            admitted.set()
+            release.wait(5)
+
+    thread = threading.Thread(target=run)
+    thread.start()
+    assert admitted.wait(2)
+    return thread
+
+
+def test_token_bucket_bursts_then_refills_at_its_rate():
+    bucket = TokenBucket(per_minute=60, burst_seconds=2)
+    now = time.monotonic()
+    assert bucket.wait_time(2, now) == 0
+    bucket.take(2)
+    assert bucket.wait_time(1, now) == pytest.approx(1.0, abs=0.05)
+    assert bucket.wait_time(1, now + 1) == 0
+
+
+def test_interactive_calls_are_admitted_before_batch_calls():
+    scheduler = LLMScheduler(max_concurrency=1)
+    release = threading.Event()
+    holder = hold_slot(scheduler, release)
+    order = []
+
+    def call(priority):
+        with scheduler.slot(priority):
+            order.append(priority)
+
+    batch = threading.Thread(target=call, args=('batch',))
+    batch.start()
+    wait_until(lambda: scheduler.stats()['waiting']['batch'] == 1)
+    interactive = threading.Thread(target=call, args=('interactive',))
+    interactive.start()
+    wait_until(lambda: scheduler.stats()['waiting']['interactive'] == 1)
+
+    release.set()
+    for thread in (holder, batch, interactive):
+        thread.join(2)
+    assert order == ['interactive', 'batch']
+    assert scheduler.stats()['running'] == 0
+
+
+def test_queued_call_past_its_deadline_is_rejected():
+    scheduler = LLMScheduler(max_concurrency=1, deadlines={'interactive': 0.05})
+    release = threading.Event()
+    holder = hold_slot(scheduler, release)
+
+    with pytest.raises(QueueTimeout):
+        with scheduler.slot('interactive'):
+            pass
+    release.set()
+    holder.join(2)
+
+    stats = scheduler.stats()
+    assert stats['rejected'] == 1
+    assert stats['waiting'] == {'interactive': 0, 'batch': 0}
+    with scheduler.slot('interactive'):
+        assert scheduler.stats()['running'] == 1
+
+
+def test_request_rate_limit_holds_calls_before_they_are_sent():
+    scheduler = LLMScheduler(requests_per_minute=60, burst_seconds=1, deadlines={'interactive': 0.1})
+    with scheduler.slot('interactive'):
+        pass
+    # The one-request burst is spent and the next token is a second away
+    with pytest.raises(QueueTimeout):
+        with scheduler.slot('interactive'):
+            pass
+
+
+def test_unused_tokens_are_returned_after_the_call():
+    scheduler = LLMScheduler(tokens_per_minute=600, burst_seconds=10, deadlines={'interactive': 0.1})
+    with scheduler.slot('interactive', tokens=100):
+        pass
+    with pytest.raises(QueueTimeout):
+        with scheduler.slot('interactive', tokens=100):
+            pass
+
+    scheduler.settle(100, 20)
+    with scheduler.slot('interactive', tokens=80):
+        pass
+
+
+def test_pause_admits_nothing_until_it_ends():
+    scheduler = LLMScheduler(deadlines={'interactive': 0.05})
+    scheduler.pause(0.2)
+    assert scheduler.stats()['paused']
+    with pytest.raises(QueueTimeout):
+        with scheduler.slot('interactive'):
+            pass
+    time.sleep(0.2)
+    with scheduler.slot('interactive'):
+        pass
+
+
+def test_async_slot_waits_for_a_free_slot():
+    scheduler = LLMScheduler(max_concurrency=1)
+    order = []
+
+    async def call(name, hold):
+        async with scheduler.slot_async('interactive'):
+            order.append(name)
+            await asyncio.sleep(hold)
+
+    async def main():
+        await asyncio.gather(call('first', 0.05), call('second', 0))
+
+    asyncio.run(main())
+    assert order == ['first', 'second']
+    assert scheduler.stats()['admitted'] == 2
+
+
+def test_unknown_priority_is_an_error():
+    with pytest.raises(ValueError):
+        with LLMScheduler().slot('urgent'):
+            pass
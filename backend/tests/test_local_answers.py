@@ -0,0 +1,49 @@
+import pytest
+
+from local_answers import LocalAnswerer
+
+SYSTEM_INFO = {
+    'cpu_usage': '12%', 'memory_used': '4.0 GB', 'memory_total': '16.0 GB', 'memory_percent': '25%',
+    'disk_used': '100 GB', 'disk_total': '500 GB', 'disk_percent': '20%', 'disk_free': '400 GB'
+}
+
+
+def stock_data(symbol):
+    return {'name': 'Apple', 'symbol': symbol, 'price': 190.5, 'currency': 'USD',
+            'change': 1.2, 'change_percent': 0.63}
+
+
+def crypto_data(coin):
+    return {'symbol': coin, 'price': 65000.0, 'change_24h': -1.5}
+
+
+@pytest.fixture
+def answerer():
+    return LocalAnswerer(lambda: SYSTEM_INFO, stock_data, crypto_data)
+
+
+@pytest.mark.parametrize('text', [
+    "what time is the super bowl",
+    "what time does the market open",
+    "what time is sunset",
+    "what day of the week was july 4 1776",
+    "how much memory does chrome use",
+    "what's the price of apple pie",
+])
+def test_questions_with_more_than_a_readout_go_to_the_llm(router, answerer, text):
+    assert answerer.answer(router.route(text)) is None
+
+
+@pytest.mark.parametrize('text, intent', [
+    ("what time is it", 'time'),
+    ("What's the time?", 'time'),
+    ("what's today's date", 'time'),
+    ("what time is it in Tokyo", 'time'),
+    ("price of AAPL", 'price'),
+    ("what's the price of apple", 'price'),
+    ("what's the bitcoin price", 'price'),
+    ("what's my CPU usage", 'system'),
+])
+def test_plain_readouts_are_answered_locally(router, answerer, text, intent):
+    result = answerer.answer(router.route(text))
+    assert result is not None and result[0] == intent
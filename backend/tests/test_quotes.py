@@ -0,0 +1,83 @@
+import math
+
+import pandas as pd
+import pytest
+
+import quotes
+from quotes import YahooQuoteProvider, build_quote
+
+
+class FakeTicker:
+    def __init__(self, symbol, currencies, history=None):
+        self.symbol = symbol
+        self.fast_info = {'currency': currencies[symbol]}
+        self.history_metadata = {'currency': currencies[symbol]}
+        self._history = history
+
+    def history(self, **options):
+        return self._history
+
+
+class FakeYahoo:
+    """The parts of yfinance the provider uses, with canned data"""
+
+    def __init__(self, frames, currencies):
+        self.frames = frames
+        self.currencies = currencies
+        self.ticker_lookups = []
+
+    def download(self, symbols, **options):
+        return pd.concat({symbol: self.frames[symbol] for symbol in symbols}, axis=1)
+
+    def Ticker(self, symbol):
+        self.ticker_lookups.append(symbol)
+        return FakeTicker(symbol, self.currencies, self.frames.get(symbol))
+
+
+def frame(closes, volumes):
+    index = pd.date_range('2026-10-12', periods=len(closes), freq='D')
+    return pd.DataFrame({'Close': closes, 'Volume': volumes}, index=index)
+
+
+@pytest.fixture
+def yahoo(monkeypatch):
+    fake = FakeYahoo(
+        {
+            'AAPL': frame([100.0, 101.0], [1000.0, 1100.0]),
+            'SHOP.TO': frame([90.0, 95.0], [500.0, math.nan]),
+        },
+        {'AAPL': 'USD', 'SHOP.TO': 'CAD'},
+    )
+    monkeypatch.setattr(quotes, 'yf', fake)
+    return fake
+
+
+def test_batched_quotes_carry_each_listing_currency(yahoo):
+    provider = YahooQuoteProvider()
+    result = provider.quotes(['AAPL', 'SHOP.TO'])
+    assert result['AAPL']['currency'] == 'USD'
+    assert result['SHOP.TO']['currency'] == 'CAD'
+
+    # Currencies are looked up once per listing
+    provider.quotes(['AAPL', 'SHOP.TO'])
+    assert sorted(yahoo.ticker_lookups) == ['AAPL', 'SHOP.TO']
+
+
+def test_partial_row_volume_is_missing_not_an_error(yahoo):
+    result = YahooQuoteProvider().quotes(['AAPL', 'SHOP.TO'])
+    assert result['AAPL']['volume'] == 1100
+    assert result['SHOP.TO']['volume'] is None
+    assert result['SHOP.TO']['price'] == 95.0
+
+
+def test_single_quote_remembers_its_currency(yahoo):
+    provider = YahooQuoteProvider()
+    quote = provider.quote('SHOP.TO')
+    assert quote['currency'] == 'CAD'
+    assert quote['volume'] is None
+    assert provider.currencies == {'SHOP.TO': 'CAD'}
+
+
+@pytest.mark.parametrize('volume, expected', [(None, None), (0, None), (math.nan, None), (12.0, 12)])
+def test_build_quote_volume(volume, expected):
+    assert build_quote('AAPL', 1, 1, volume=volume)['volume'] == expected
@@ -0,0 +1,124 @@
+import asyncio
+import threading
+import time
+
+import pytest
+
+from resilience import CircuitBreaker, CircuitOpenError, Upstream, UpstreamError
+
+
+def failing():
+    raise UpstreamError("down")
+
+
+def test_breaker_opens_after_consecutive_failures_and_probes_once():
+    breaker = CircuitBreaker(failure_threshold=2, reset_timeout=0.05)
+    breaker.record_failure()
+    assert breaker.allow()
+    breaker.record_failure()
+    assert breaker.state == 'open'
+    assert not breaker.allow()
+
+    time.sleep(0.06)
+    assert breaker.allow()
+    assert breaker.state == 'half_open'
+    # Only one probe at a time while half-open
+    assert not breaker.allow()
+
+    breaker.record_success()
+    assert breaker.state == 'closed'
+    assert breaker.allow()
+
+
+def test_failed_probe_opens_the_breaker_again():
+    breaker = CircuitBreaker(failure_threshold=1, reset_timeout=0.05)
+    breaker.record_failure()
+    time.sleep(0.06)
+    assert breaker.allow()
+    breaker.record_failure()
+    assert breaker.state == 'open'
+    assert not breaker.allow()
+
+
+def test_success_resets_the_failure_count():
+    breaker = CircuitBreaker(failure_threshold=2)
+    breaker.record_failure()
+    breaker.record_success()
+    breaker.record_failure()
+    assert breaker.state == 'closed'
+
+
+def test_open_circuit_rejects_calls_without_running_them():
+    upstream = Upstream('weather', failure_threshold=2, reset_timeout=60)
+    for _ in range(2):
+        with pytest.raises(UpstreamError):
+            upstream.call(failing)
+
+    calls = []
+    with pytest.raises(CircuitOpenError):
+        upstream.call(lambda: calls.append(1))
+    assert calls == []
+    assert upstream.stats() == {'state': 'open', 'calls': 2, 'failures': 2, 'rejected': 1, 'hedges': 0}
+
+
+@pytest.mark.parametrize('status, fails', [(200, False), (404, False), (429, True), (503, True)])
+def test_only_server_errors_and_rate_limits_count_as_failures(status, fails):
+    upstream = Upstream('weather')
+    if fails:
+        with pytest.raises(UpstreamError):
+            upstream.check_status(status)
+    else:
+        upstream.check_status(status)
+
+
+def primed(latency=0.01, samples=20):
+    """An upstream with hedging on and enough latency samples to use it"""
+    upstream = Upstream('stock', hedge_percentile=0.95, hedge_min_samples=samples)
+    upstream.latencies.extend([latency] * samples)
+    return upstream
+
+
+def test_no_hedging_until_enough_latencies_are_known():
+    upstream = Upstream('stock', hedge_percentile=0.95, hedge_min_samples=20)
+    upstream.latencies.extend([0.01] * 19)
+    assert upstream.hedge_delay() is None
+    upstream.latencies.append(0.01)
+    assert upstream.hedge_delay() == 0.01
+
+
+def test_slow_call_is_hedged_and_the_fast_attempt_wins():
+    upstream = primed()
+    attempts = []
+    release = threading.Event()
+
+    def fetch():
+        attempts.append(1)
+        if len(attempts) == 1:
+            release.wait(2)
+            return 'slow'
+        return 'fast'
+
+    assert upstream.call(fetch) == 'fast'
+    release.set()
+    assert upstream.stats()['hedges'] == 1
+
+
+def test_fast_call_is_not_hedged():
+    upstream = primed(latency=1)
+    assert upstream.call(lambda: 'value') == 'value'
+    assert upstream.stats()['hedges'] == 0
+
+
+def test_async_slow_call_is_hedged():
+    upstream = primed()
+    attempts = []
+
+    async def fetch():
+        attempts.append(1)
+        if len(attempts) == 1:
+            await asyncio.sleep(1)
+            return 'slow'
+        return 'fast'
+
+    assert asyncio.run(upstream.call_async(fetch)) == 'fast'
+    assert upstream.stats()['hedges'] == 1
@@ -0,0 +1,48 @@
+import pytest
+
+from response_cache import ResponseCache
+
+
+@pytest.fixture
+def cache():
+    return ResponseCache(threshold=0.9)
+
+
+@pytest.mark.parametrize('cached, asked', [
+    ("what is the capital of austria", "what is the capital of australia"),
+    ("what is 12 times 13", "what is 12 times 14"),
+    ("who wrote the first harry potter book", "who wrote the fifth harry potter book"),
+])
+def test_near_miss_questions_are_not_served_from_cache(router, cache, cached, asked):
+    cache.store(router.route(cached), "cached answer")
+    assert cache.lookup(router.route(asked)) is None
+
+
+@pytest.mark.parametrize('cached, asked', [
+    ("what is the capital of france", "What's the capital of France?"),
+    ("tell me a joke", "Jarvis, tell me a joke please"),
+])
+def test_rephrased_questions_share_an_answer(router, cache, cached, asked):
+    cache.store(router.route(cached), "cached answer")
+    result = cache.lookup(router.route(asked))
+    assert result is not None and result[0] == "cached answer"
+
+
+@pytest.mark.parametrize('text', [
+    "what's my name",
+    "what did I ask you earlier",
+    "where do we live",
+    "do you remember the capital I mentioned",
+    "recommend me a book",
+])
+def test_personal_questions_are_not_shared_across_sessions(router, text):
+    # The cache has no session key, so one user's answer must never reach another
+    cache = ResponseCache()
+    cache.store(router.route(text), "Your name is Alice.")
+    assert cache.lookup(router.route(text)) is None
+    assert cache.stats()['size'] == 0
+
+
+def test_request_verbs_before_me_stay_cacheable(router, cache):
+    cache.store(router.route("give me a fun fact about octopuses"), "cached answer")
+    assert cache.lookup(router.route("give me a fun fact about octopuses")) is not None
@@ -0,0 +1,86 @@
+import threading
+import time
+
+import pytest
+
+from sessions import InMemorySessionStore, SQLiteSessionStore, create_session_store
+
+
+def user(text):
+    return {"role": "user", "content": text}
+
+
+@pytest.fixture(params=['memory', 'sqlite'])
+def make_store(request, tmp_path):
+    def make(**options):
+        if request.param == 'sqlite':
+            options['path'] = str(tmp_path / 'sessions.db')
+        return create_session_store(request.param, **options)
+    return make
+
+
+def test_sessions_keep_separate_histories(make_store):
+    store = make_store()
+    store.append('alice', user("my name is Alice"))
+    store.append('bob', user("hello"))
+    assert store.get_history('alice') == [user("my name is Alice")]
+    assert store.get_history('bob') == [user("hello")]
+    assert store.get_history('carol') == []
+    assert store.count() == 2
+
+
+def test_only_the_most_recent_messages_are_kept(make_store):
+    store = make_store(max_messages=3)
+    for index in range(5):
+        store.append('alice', user(str(index)))
+    assert [m["content"] for m in store.get_history('alice')] == ['2', '3', '4']
+
+
+def test_history_is_a_copy(make_store):
+    store = make_store()
+    store.append('alice', user("hi"))
+    store.get_history('alice').append(user("injected"))
+    assert store.get_history('alice') == [user("hi")]
+
+
+def test_idle_sessions_expire(make_store):
+    store = make_store(idle_timeout=0.05)
+    store.append('alice', user("hi"))
+    time.sleep(0.1)
+    store.append('bob', user("hi"))
+    assert store.get_history('alice') == []
+    assert store.count() == 1
+
+
+def test_clear_forgets_a_session(make_store):
+    store = make_store()
+    store.append('alice', user("hi"))
+    store.clear('alice')
+    assert store.get_history('alice') == []
+    assert store.count() == 0
+
+
+def test_memory_store_drops_least_recently_used_sessions_when_full():
+    store = InMemorySessionStore(max_sessions=2)
+    store.append('alice', user("hi"))
+    store.append('bob', user("hi"))
+    store.get_history('alice')
+    store.append('carol', user("hi"))
+    assert store.get_history('bob') == []
+    assert store.get_history('alice') == [user("hi")]
+
+
+def test_sqlite_store_is_shared_between_connections(tmp_path):
+    path = str(tmp_path / 'sessions.db')
+    SQLiteSessionStore(path).append('alice', user("hi"))
+    assert SQLiteSessionStore(path).get_history('alice') == [user("hi")]
+
+
+def test_concurrent_appends_are_all_kept(make_store):
+    store = make_store(max_messages=100)
+    threads = [threading.Thread(target=store.append, args=('alice', user(str(index)))) for index in range(20)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+    assert sorted(int(m["content"]) for m in store.get_history('alice')) == list(range(20))
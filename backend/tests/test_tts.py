@@ -0,0 +1,46 @@
+import time
+
+from llm_scheduler import FALLBACK_RESPONSE
+from tts import COMMON_PHRASES, SpeechSynthesizer, StubTTSEngine
+
+
+class CountingEngine(StubTTSEngine):
+    def __init__(self):
+        super().__init__()
+        self.calls = []
+
+    def synthesize(self, text):
+        self.calls.append(text)
+        return super().synthesize(text)
+
+
+def warmed(engine, cache_size=2):
+    speech = SpeechSynthesizer(engine, cache_size=cache_size)
+    speech.warm()
+    # Every phrase is one sentence except the two-sentence fallback reply
+    deadline = time.monotonic() + 5
+    while len(speech.pinned) < len(COMMON_PHRASES) + 1 and time.monotonic() < deadline:
+        time.sleep(0.01)
+    return speech
+
+
+def test_warmed_phrases_survive_a_full_cache():
+    engine = CountingEngine()
+    speech = warmed(engine)
+
+    for index in range(10):
+        speech.synthesize(f"Reply sentence number {index}.")
+    engine.calls.clear()
+
+    assert speech.synthesize(COMMON_PHRASES[0].upper())
+    assert engine.calls == []
+
+
+def test_spoken_replies_are_pinned_sentence_by_sentence():
+    engine = CountingEngine()
+    speech = warmed(engine)
+    engine.calls.clear()
+
+    events = list(speech.speak(FALLBACK_RESPONSE))
+    assert len(events) == 2
+    assert engine.calls == []
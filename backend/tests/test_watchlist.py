@@ -0,0 +1,115 @@
+import pytest
+
+from watchlist import Watchlist
+
+
+class FakeQuotes:
+    """Batched fetchers that return one price per symbol and record each call"""
+
+    def __init__(self):
+        self.prices = {}
+        self.calls = []
+
+    def fetch(self, symbols):
+        self.calls.append(list(symbols))
+        return {symbol: {'price': self.prices.get(symbol, 1.0)} for symbol in symbols}
+
+
+@pytest.fixture
+def quotes():
+    return FakeQuotes()
+
+
+@pytest.fixture
+def watchlist(quotes):
+    stored = []
+    watchlist = Watchlist({'stock': quotes.fetch, 'crypto': quotes.fetch},
+                          lambda kind, data: stored.append((kind, data)),
+                          max_symbols=3, min_hits=2, idle_seconds=60)
+    watchlist.stored = stored
+    return watchlist
+
+
+def test_idle_until_first_ask_or_subscriber(watchlist):
+    assert watchlist.is_idle()
+    watchlist.observe('stock', ['AAPL'])
+    assert not watchlist.is_idle()
+
+
+def test_subscriber_keeps_the_watchlist_awake(watchlist):
+    subscription = watchlist.subscribe(lambda: None)
+    assert not watchlist.is_idle()
+    watchlist.unsubscribe(subscription)
+    assert watchlist.is_idle()
+
+
+def test_symbols_join_after_enough_asks(watchlist):
+    watchlist.observe('stock', ['AAPL'])
+    assert watchlist.stats()['watched']['stock'] == []
+    watchlist.observe('stock', ['AAPL'])
+    assert watchlist.stats()['watched']['stock'] == ['AAPL']
+
+
+def test_full_watchlist_replaces_its_least_asked_symbol_but_not_seeds(watchlist):
+    watchlist.seed('stock', ['SPY'])
+    watchlist.observe('stock', ['AAPL', 'AAPL', 'MSFT', 'MSFT'])
+    watchlist.observe('stock', ['NVDA', 'NVDA', 'NVDA'])
+    assert watchlist.stats()['watched']['stock'] == ['SPY', 'NVDA', 'MSFT']
+
+
+def test_refresh_fetches_each_kind_once_and_stores_quotes(watchlist, quotes):
+    watchlist.seed('stock', ['AAPL', 'MSFT'])
+    watchlist.seed('crypto', ['BTC'])
+    watchlist.refresh()
+    assert quotes.calls == [['AAPL', 'MSFT'], ['BTC']]
+    assert [kind for kind, _ in watchlist.stored] == ['stock', 'crypto']
+
+
+def test_subscribers_get_only_the_prices_that_changed_and_they_want(watchlist, quotes):
+    watchlist.seed('stock', ['AAPL', 'MSFT'])
+    woken = []
+    subscription = watchlist.subscribe(lambda: woken.append(1), {'stock': ['AAPL']})
+    watchlist.refresh()
+    assert list(subscription.updates) == [{'stock': {'AAPL': {'price': 1.0}}}]
+
+    quotes.prices['MSFT'] = 2.0
+    watchlist.refresh()
+    assert len(subscription.updates) == 1
+
+    quotes.prices['AAPL'] = 3.0
+    watchlist.refresh()
+    assert subscription.updates[-1] == {'stock': {'AAPL': {'price': 3.0}}}
+    assert len(woken) == 2
+    assert watchlist.current(subscription) == {'stock': {'AAPL': {'price': 3.0}}, 'crypto': {}}
+
+
+def test_subscriber_only_symbols_are_dropped_with_their_last_subscriber(watchlist):
+    first = watchlist.subscribe(lambda: None, {'crypto': ['DOGE']})
+    second = watchlist.subscribe(lambda: None, {'crypto': ['DOGE']})
+    watchlist.refresh()
+    watchlist.unsubscribe(first)
+    assert watchlist.stats()['watched']['crypto'] == ['DOGE']
+
+    watchlist.unsubscribe(second)
+    assert watchlist.stats()['watched']['crypto'] == []
+    assert watchlist.current() == {'stock': {}, 'crypto': {}}
+    assert watchlist.stats()['subscribers'] == 0
+
+
+def test_symbols_asked_about_often_stay_after_their_subscriber_leaves(watchlist):
+    subscription = watchlist.subscribe(lambda: None, {'stock': ['AAPL']})
+    watchlist.observe('stock', ['AAPL', 'AAPL'])
+    watchlist.unsubscribe(subscription)
+    assert watchlist.stats()['watched']['stock'] == ['AAPL']
+
+
+def test_subscribers_cannot_grow_the_watchlist_past_its_limit(watchlist):
+    watchlist.subscribe(lambda: None, {'stock': ['A', 'B', 'C', 'D', 'E']})
+    assert watchlist.stats()['watched']['stock'] == ['A', 'B', 'C']
+
+
+def test_unsubscribing_twice_is_harmless(watchlist):
+    subscription = watchlist.subscribe(lambda: None, {'stock': ['AAPL']})
+    watchlist.unsubscribe(subscription)
+    watchlist.unsubscribe(subscription)
+    assert watchlist.stats()['subscribers'] == 0
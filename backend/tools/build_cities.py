@@ -0,0 +1,141 @@
+"""Rebuild data/cities.tsv, the city gazetteer behind time and weather lookups
+
+Keeps every row already in the file, adds a row for each city named by a tz
+database zone (e.g. America/Argentina/Cordoba), adds the country name as an
+alias of the largest city of every single-timezone country, and optionally
+merges a GeoNames dump (https://download.geonames.org/export/dump/, e.g.
+cities15000.txt) for much broader coverage.
+
+Run from the backend directory:
+    python tools/build_cities.py [--geonames cities15000.txt] [--min-population 15000]
+"""
+import argparse
+import csv
+import os
+import sys
+
+import pytz
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from gazetteer import DEFAULT_CITIES_PATH, normalize  # noqa: E402
+
+FIELDS = ['name', 'country', 'timezone', 'population', 'aliases']
+ZONE_REGIONS = {'Africa', 'America', 'Asia', 'Atlantic', 'Australia', 'Europe', 'Indian', 'Pacific'}
+MAX_ALIASES = 5
+# Zones named after islands whose bare name is an everyday word ("what day is Christmas")
+ZONE_NAMES = {'Christmas': 'Christmas Island', 'Easter': 'Easter Island', 'Canary': 'Canary Islands',
+              'Cocos': 'Cocos Islands', 'Midway': 'Midway Islands', 'Wake': 'Wake Island'}
+# Zones named after small places whose name is mostly an everyday word; left out
+SKIPPED_ZONE_NAMES = {'Center', 'Knox', 'Oral', 'Resolute'}
+
+
+def read_rows(path):
+    if not os.path.exists(path):
+        return []
+    with open(path, encoding='utf-8', newline='') as f:
+        return list(csv.DictReader(f, delimiter='\t'))
+
+
+def known_names(rows):
+    names = set()
+    for row in rows:
+        names.add(normalize(row['name']))
+        names.update(normalize(alias) for alias in row['aliases'].split(',') if alias)
+    return names
+
+
+def zone_rows():
+    """One row per city named by a tz database zone"""
+    countries = {zone: country for country, zones in pytz.country_timezones.items() for zone in zones}
+    for zone in pytz.common_timezones:
+        parts = zone.split('/')
+        if len(parts) < 2 or parts[0] not in ZONE_REGIONS:
+            continue
+        name = parts[-1].replace('_', ' ')
+        if name in SKIPPED_ZONE_NAMES:
+            continue
+        yield {'name': ZONE_NAMES.get(name, name), 'country': countries.get(zone, ''),
+               'timezone': zone, 'population': '0', 'aliases': ''}
+
+
+def clean_zone_rows(rows):
+    """Apply ZONE_NAMES and SKIPPED_ZONE_NAMES to zone-only rows already in the file"""
+    cleaned = []
+    for row in rows:
+        if row['population'] == '0':
+            if row['name'] in SKIPPED_ZONE_NAMES:
+                continue
+            row['name'] = ZONE_NAMES.get(row['name'], row['name'])
+            key = normalize(row['name'])
+            row['aliases'] = ','.join(alias for alias in row['aliases'].split(',')
+                                      if alias and normalize(alias) != key)
+        cleaned.append(row)
+    return cleaned
+
+
+def geonames_rows(path, min_population):
+    """Rows from a GeoNames cities dump (tab-separated, no header)"""
+    with open(path, encoding='utf-8') as f:
+        for line in f:
+            columns = line.rstrip('\n').split('\t')
+            if len(columns) < 18 or int(columns[14] or 0) < min_population:
+                continue
+            name, ascii_name = columns[1], columns[2]
+            aliases = [ascii_name] if ascii_name != name else []
+            # Keep short Latin-script alternate names only, to stay compact
+            aliases += [alias for alias in columns[3].split(',')
+                        if alias.isascii() and 2 < len(alias) <= 30 and len(alias.split()) <= 3][:MAX_ALIASES]
+            yield {'name': name, 'country': columns[8], 'timezone': columns[17],
+                   'population': columns[14], 'aliases': ','.join(alias.lower() for alias in aliases)}
+
+
+def add_rows(rows, new_rows):
+    """Append rows whose name is not yet a name or alias of an existing row"""
+    names = known_names(rows)
+    for row in new_rows:
+        key = normalize(row['name'])
+        if key and key not in names and row['timezone'] in pytz.all_timezones_set:
+            rows.append(row)
+            names.add(key)
+
+
+def add_country_aliases(rows):
+    names = known_names(rows)
+    for country, zones in pytz.country_timezones.items():
+        country_name = pytz.country_names.get(country, '')
+        if len(zones) != 1 or '(' in country_name or normalize(country_name) in names:
+            continue
+        candidates = [row for row in rows if row['country'] == country]
+        if not candidates:
+            continue
+        largest = max(candidates, key=lambda row: int(row['population'] or 0))
+        aliases = [alias for alias in largest['aliases'].split(',') if alias]
+        largest['aliases'] = ','.join(aliases + [country_name.lower()])
+        names.add(normalize(country_name))
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument('--output', default=DEFAULT_CITIES_PATH)
+    parser.add_argument('--geonames', help="GeoNames cities file to merge")
+    parser.add_argument('--min-population', type=int, default=15000)
+    args = parser.parse_args()
+
+    rows = clean_zone_rows(read_rows(args.output))
+    if args.geonames:
+        add_rows(rows, geonames_rows(args.geonames, args.min_population))
+    add_rows(rows, zone_rows())
+    add_country_aliases(rows)
+
+    # Most populous first, so an ambiguous name resolves to the largest city
+    rows.sort(key=lambda row: (-int(row['population'] or 0), row['name']))
+    with open(args.output, 'w', encoding='utf-8', newline='') as f:
+        writer = csv.DictWriter(f, FIELDS, delimiter='\t', lineterminator='\n')
+        writer.writeheader()
+        writer.writerows(rows)
+    print(f"Wrote {len(rows)} cities to {args.output}")
+
+
+if __name__ == '__main__':
+    main()
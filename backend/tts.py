@@ -0,0 +1,266 @@
+import array
+import asyncio
+import base64
+import io
+import math
+import os
+import re
+import tempfile
+import threading
+import wave
+from collections import deque
+from concurrent.futures import ThreadPoolExecutor
+
+try:
+    import pyttsx3
+except ImportError:  # Optional: only needed for TTS_ENGINE=pyttsx3
+    pyttsx3 = None
+
+from cache import TTLCache
+from llm_scheduler import FALLBACK_RESPONSE
+from metrics import registry
+
+SENTENCE_END = re.compile(r"[.!?]+(?:\s+|$)")
+
+# Phrases the server speaks often enough to synthesize ahead of time: the wake
+# word greeting (sent to /tts by the frontend) and the busy fallback reply
+COMMON_PHRASES = [
+    "Yes, how can I help you?",
+    FALLBACK_RESPONSE,
+]
+
+
+class SentenceSplitter:
+    """Cut streamed text into complete sentences as it arrives"""
+
+    def __init__(self):
+        self.buffer = ""
+
+    def feed(self, text):
+        """Add text and return the sentences it completed"""
+        self.buffer += text
+        sentences = []
+        start = 0
+        for match in SENTENCE_END.finditer(self.buffer):
+            # A boundary at the very end may still grow ("3." -> "3.5")
+            if match.end() == len(self.buffer) and not match.group().endswith((' ', '\n')):
+                break
+            sentences.append(self.buffer[start:match.end()].strip())
+            start = match.end()
+        self.buffer = self.buffer[start:]
+        return [sentence for sentence in sentences if sentence]
+
+    def flush(self):
+        """Return whatever is left as a final sentence"""
+        rest, self.buffer = self.buffer.strip(), ""
+        return [rest] if rest else []
+
+
+def phrase_key(sentence):
+    return ' '.join(sentence.lower().split())
+
+
+def encode_wav(samples, sample_rate):
+    """16-bit mono WAV bytes for an array of samples"""
+    output = io.BytesIO()
+    with wave.open(output, 'wb') as wav:
+        wav.setnchannels(1)
+        wav.setsampwidth(2)
+        wav.setframerate(sample_rate)
+        wav.writeframes(samples.tobytes())
+    return output.getvalue()
+
+
+class StubTTSEngine:
+    """A short tone per word instead of speech, for tests and benchmarks"""
+
+    format = 'wav'
+
+    def __init__(self, sample_rate=16000, word_seconds=0.08):
+        self.sample_rate = sample_rate
+        self.word_seconds = word_seconds
+
+    def synthesize(self, text):
+        frames = int(self.sample_rate * self.word_seconds * max(1, len(text.split())))
+        samples = array.array('h', (
+            int(8000 * math.sin(2 * math.pi * 440 * i / self.sample_rate)) for i in range(frames)
+        ))
+        return encode_wav(samples, self.sample_rate)
+
+
+class Pyttsx3Engine:
+    """Offline speech through pyttsx3 (eSpeak, SAPI5 or NSSpeechSynthesizer)"""
+
+    format = 'wav'
+
+    def __init__(self, rate=None, voice=None):
+        if pyttsx3 is None:
+            raise RuntimeError("pyttsx3 is not installed")
+        self.engine = pyttsx3.init()
+        if rate:
+            self.engine.setProperty('rate', rate)
+        if voice:
+            self.engine.setProperty('voice', voice)
+        # The underlying driver is not thread-safe
+        self.lock = threading.Lock()
+
+    def synthesize(self, text):
+        handle, path = tempfile.mkstemp(suffix='.wav')
+        os.close(handle)
+        try:
+            with self.lock:
+                self.engine.save_to_file(text, path)
+                self.engine.runAndWait()
+            with open(path, 'rb') as f:
+                return f.read()
+        finally:
+            os.remove(path)
+
+
+def create_tts_engine(engine, **options):
+    """Build the TTS engine named by engine ("stub" or "pyttsx3"), or None for "none" """
+    if engine == "none":
+        return None
+    if engine == "stub":
+        return StubTTSEngine()
+    if engine == "pyttsx3":
+        return Pyttsx3Engine(rate=options.get("rate"), voice=options.get("voice"))
+    raise ValueError(f"Unknown TTS engine: {engine}")
+
+
+class SpeechSynthesizer:
+    """Sentence-by-sentence synthesis with a phrase cache
+
+    Sentences are synthesized on a small pool while the reply is still
+    streaming and emitted in order, so the first audio chunk is ready as soon
+    as the first sentence is. Warmed phrases are pinned outside the cache so
+    reply sentences never evict them.
+    """
+
+    def __init__(self, engine, cache_size=256, cache_ttl=86400, max_workers=2):
+        self.engine = engine
+        self.cache = TTLCache(cache_ttl, cache_size)
+        self.pinned = {}  # phrase key -> audio for warmed phrases
+        self.executor = ThreadPoolExecutor(max_workers=max_workers, thread_name_prefix="tts")
+
+    def synthesize(self, sentence):
+        """Audio bytes for one sentence, from the cache when it was said before"""
+        key = phrase_key(sentence)
+        audio = self.pinned.get(key)
+        if audio is not None:
+            return audio
+        return self.cache.get_or_fetch(key, lambda: self._synthesize_uncached(sentence))
+
+    def _synthesize_uncached(self, sentence):
+        with registry.span('tts'):
+            return self.engine.synthesize(sentence)
+
+    def warm(self, phrases=COMMON_PHRASES):
+        """Synthesize common phrases in the background and pin them"""
+        for phrase in phrases:
+            self.executor.submit(self._pin, phrase)
+
+    def _pin(self, phrase):
+        # Replies are synthesized a sentence at a time, so pin each sentence
+        splitter = SentenceSplitter()
+        for sentence in splitter.feed(phrase) + splitter.flush():
+            try:
+                self.pinned[phrase_key(sentence)] = self._synthesize_uncached(sentence)
+            except Exception as e:
+                print(f"TTS error: {e}")
+
+    def _synthesize_quietly(self, sentence):
+        try:
+            return self.synthesize(sentence)
+        except Exception as e:
+            print(f"TTS error: {e}")
+            return None
+
+    def audio_event(self, index, sentence, audio):
+        return {
+            "type": "audio",
+            "index": index,
+            "text": sentence,
+            "format": self.engine.format,
+            "audio": base64.b64encode(audio).decode('ascii')
+        }
+
+    def speak(self, text):
+        """Yield audio events for a complete text"""
+        splitter = SentenceSplitter()
+        sentences = splitter.feed(text) + splitter.flush()
+        futures = [(sentence, self.executor.submit(self._synthesize_quietly, sentence)) for sentence in sentences]
+        index = 0
+        for sentence, future in futures:
+            audio = future.result()
+            if audio:
+                yield self.audio_event(index, sentence, audio)
+                index += 1
+
+    def with_audio(self, events):
+        """Interleave audio events into a chat event stream, before its "done" event"""
+        splitter = SentenceSplitter()
+        pending = deque()
+        streamed = False
+        index = 0
+
+        def submit(sentences):
+            for sentence in sentences:
+                pending.append((sentence, self.executor.submit(self._synthesize_quietly, sentence)))
+
+        for event in events:
+            if event["type"] == "delta":
+                streamed = True
+                yield event
+                submit(splitter.feed(event["content"]))
+            elif event["type"] == "done":
+                if not streamed:
+                    submit(splitter.feed(event["response"]))
+                submit(splitter.flush())
+            else:
+                yield event
+
+            # Emit finished chunks in order; wait for the rest once the reply is complete
+            while pending and (event["type"] == "done" or pending[0][1].done()):
+                sentence, future = pending.popleft()
+                audio = future.result()
+                if audio:
+                    yield self.audio_event(index, sentence, audio)
+                    index += 1
+
+            if event["type"] == "done":
+                yield event
+
+    async def with_audio_async(self, events):
+        """Async variant of with_audio for an async event stream"""
+        splitter = SentenceSplitter()
+        pending = deque()
+        streamed = False
+        index = 0
+
+        def submit(sentences):
+            for sentence in sentences:
+                future = self.executor.submit(self._synthesize_quietly, sentence)
+                pending.append((sentence, asyncio.wrap_future(future)))
+
+        async for event in events:
+            if event["type"] == "delta":
+                streamed = True
+                yield event
+                submit(splitter.feed(event["content"]))
+            elif event["type"] == "done":
+                if not streamed:
+                    submit(splitter.feed(event["response"]))
+                submit(splitter.flush())
+            else:
+                yield event
+
+            while pending and (event["type"] == "done" or pending[0][1].done()):
+                sentence, future = pending.popleft()
+                audio = await future
+                if audio:
+                    yield self.audio_event(index, sentence, audio)
+                    index += 1
+
+            if event["type"] == "done":
+                yield event
@@ -0,0 +1,206 @@
+import threading
+import time
+from collections import Counter, deque
+
+from metrics import registry
+
+KINDS = ('stock', 'crypto')
+
+
+class Subscription:
+    """Price changes queued for one listener; wake() is called after each push"""
+
+    def __init__(self, wake, kinds=None, max_pending=100):
+        self.wake = wake
+        self.kinds = kinds
+        self.updates = deque(maxlen=max_pending)
+
+    def wants(self, kind, symbol):
+        return self.kinds is None or symbol in self.kinds.get(kind, ())
+
+
+class Watchlist:
+    """Keep the most asked-about stocks and coins warm with one batched fetch per interval
+
+    Seeded symbols are always watched. Others join after min_hits asks, up to
+    max_symbols per kind, replacing the least asked one, or while a subscriber
+    asks for them (dropped again when the last such subscriber leaves, unless
+    they were asked about often enough by then). Each refresh stores
+    its quotes through store(kind, quotes), so the request path reads them
+    from memory, and pushes the prices that moved to subscribers. Refreshing
+    pauses after idle_seconds without asks or subscribers.
+    """
+
+    def __init__(self, fetchers, store, interval=15, max_symbols=25, min_hits=2, idle_seconds=600):
+        self.fetchers = fetchers
+        self.store = store
+        self.interval = interval
+        self.max_symbols = max_symbols
+        self.min_hits = min_hits
+        self.idle_seconds = idle_seconds
+        self.seeds = {kind: set() for kind in KINDS}
+        self.watched = {kind: [] for kind in KINDS}
+        self.hits = {kind: Counter() for kind in KINDS}
+        self.subscribed = {kind: Counter() for kind in KINDS}
+        self.snapshot = {kind: {} for kind in KINDS}
+        self.subscriptions = set()
+        # Idle until the first ask or subscriber, so no worker polls from boot with no consumer
+        self.last_activity = None
+        self.last_refresh = None
+        self.lock = threading.Lock()
+        self.wake = threading.Event()
+        self.stopped = False
+        self.thread = None
+
+    def start(self):
+        """Start the refresh thread (idempotent)"""
+        with self.lock:
+            if self.thread is not None:
+                return
+            self.thread = threading.Thread(target=self._run, name="watchlist", daemon=True)
+        self.thread.start()
+
+    def stop(self):
+        self.stopped = True
+        self.wake.set()
+
+    def seed(self, kind, symbols):
+        """Always watch these symbols"""
+        with self.lock:
+            for symbol in symbols:
+                self.seeds[kind].add(symbol)
+                if symbol not in self.watched[kind]:
+                    self.watched[kind].append(symbol)
+
+    def observe(self, kind, symbols):
+        """Count asks for symbols, watching the ones asked about often enough"""
+        with self.lock:
+            self.last_activity = time.monotonic()
+            hits = self.hits[kind]
+            watched = self.watched[kind]
+            for symbol in symbols:
+                hits[symbol] += 1
+                if symbol in watched or hits[symbol] < self.min_hits:
+                    continue
+                if len(watched) < self.max_symbols:
+                    watched.append(symbol)
+                    continue
+                candidates = [s for s in watched if s not in self.seeds[kind]]
+                coldest = min(candidates, key=lambda s: hits[s], default=None)
+                if coldest is not None and hits[coldest] < hits[symbol]:
+                    watched[watched.index(coldest)] = symbol
+
+    def subscribe(self, wake, kinds=None):
+        """Register a listener; kinds ({"stock": [...], "crypto": [...]}) limits what it gets
+
+        Symbols in kinds are watched while there is room, however often they
+        were asked about; callers should pass only known symbols.
+        """
+        subscription = Subscription(wake, kinds)
+        with self.lock:
+            for kind in KINDS:
+                for symbol in (kinds or {}).get(kind, ()):
+                    self.subscribed[kind][symbol] += 1
+                    if symbol not in self.watched[kind] and len(self.watched[kind]) < self.max_symbols:
+                        self.watched[kind].append(symbol)
+            # Refresh right away when there is nothing current to show yet
+            if self._idle() or not any(self.snapshot.values()):
+                self.wake.set()
+            self.subscriptions.add(subscription)
+            registry.set('jarvis_watchlist_subscribers', len(self.subscriptions))
+        return subscription
+
+    def unsubscribe(self, subscription):
+        with self.lock:
+            if subscription not in self.subscriptions:
+                return
+            self.subscriptions.discard(subscription)
+            registry.set('jarvis_watchlist_subscribers', len(self.subscriptions))
+            for kind in KINDS:
+                for symbol in (subscription.kinds or {}).get(kind, ()):
+                    self.subscribed[kind][symbol] -= 1
+                    if self.subscribed[kind][symbol] <= 0:
+                        del self.subscribed[kind][symbol]
+                        self._drop(kind, symbol)
+
+    def _drop(self, kind, symbol):
+        """Stop watching a symbol only a subscriber wanted"""
+        if symbol in self.seeds[kind] or self.hits[kind][symbol] >= self.min_hits:
+            return
+        if symbol in self.watched[kind]:
+            self.watched[kind].remove(symbol)
+        self.snapshot[kind].pop(symbol, None)
+
+    def current(self, subscription=None):
+        """The latest price of every watched symbol (those a subscription wants, if given)"""
+        with self.lock:
+            return {
+                kind: {symbol: data for symbol, data in self.snapshot[kind].items()
+                       if subscription is None or subscription.wants(kind, symbol)}
+                for kind in KINDS
+            }
+
+    def refresh(self):
+        """Fetch every watched symbol, one batched call per kind, and publish what changed"""
+        changes = {}
+        for kind in KINDS:
+            with self.lock:
+                symbols = list(self.watched[kind])
+            if not symbols:
+                continue
+            try:
+                with registry.span(f'watchlist_{kind}'):
+                    quotes = self.fetchers[kind](symbols)
+            except Exception as e:
+                print(f"Watchlist refresh error ({kind}): {e}")
+                continue
+            if not quotes:
+                continue
+            self.store(kind, quotes)
+            with self.lock:
+                previous = self.snapshot[kind]
+                changed = {symbol: data for symbol, data in quotes.items()
+                           if previous.get(symbol, {}).get('price') != data.get('price')}
+                previous.update(quotes)
+            if changed:
+                changes[kind] = changed
+        self.last_refresh = time.time()
+        if changes:
+            self.publish(changes)
+        return changes
+
+    def publish(self, changes):
+        with self.lock:
+            subscriptions = list(self.subscriptions)
+        for subscription in subscriptions:
+            update = {kind: {symbol: data for symbol, data in quotes.items() if subscription.wants(kind, symbol)}
+                      for kind, quotes in changes.items()}
+            update = {kind: quotes for kind, quotes in update.items() if quotes}
+            if update:
+                subscription.updates.append(update)
+                subscription.wake()
+
+    def is_idle(self):
+        with self.lock:
+            return self._idle()
+
+    def _idle(self):
+        if self.subscriptions:
+            return False
+        return self.last_activity is None or time.monotonic() - self.last_activity > self.idle_seconds
+
+    def stats(self):
+        with self.lock:
+            return {
+                "watched": {kind: list(symbols) for kind, symbols in self.watched.items()},
+                "subscribers": len(self.subscriptions),
+                "last_refresh": self.last_refresh,
+                "idle": self._idle()
+            }
+
+    def _run(self):
+        while not self.stopped:
+            if not self.is_idle():
+                self.refresh()
+            self.wake.wait(self.interval)
+            self.wake.clear()
@@ -10,11 +10,42 @@ class JarvisVoiceAssistant {
       rate: 1.0,
       wakeWordEnabled: true,
       autoSpeak: true,
+      streamResponses: true,
+      prefetchWhileSpeaking: true,
+      // Play audio synthesized by the backend (TTS_ENGINE) instead of speechSynthesis
+      serverSpeech: false,
+      // Stream microphone audio to the backend's /audio WebSocket (STT_ENGINE) for recognition.
+      // Used automatically when the browser has no SpeechRecognition and /health reports support.
+      serverRecognition: false,
+      // Show live prices pushed by the backend's /prices/stream (server-sent events)
+      livePrices: false,
+      // Symbols to show, e.g. { stocks: ["AAPL", "NVDA"], crypto: ["BTC"] }; empty shows the whole watchlist
+      livePriceSymbols: { stocks: [], crypto: [] },
     };
 
+    // Microphone stream, audio graph and WebSocket while recognizing on the server
+    this.serverCapture = null;
+    // Set from /health: an STT engine behind an /audio WebSocket (the ASGI server only)
+    this.serverRecognitionAvailable = false;
+
+    // Interim transcript last sent to /prefetch, and the pending debounce timer
+    this.lastPrefetch = "";
+    this.prefetchTimer = null;
+
+    // Live price subscription and the latest price per symbol
+    this.priceSource = null;
+    this.prices = {};
+
+    // Sentences (or server audio chunks) waiting to be spoken while a response is still streaming
+    this.speechQueue = [];
+    this.currentAudio = null;
+
     // Backend URL
     this.backendUrl = "http://localhost:5000";
 
+    // Conversation session, kept for the lifetime of the browser tab
+    this.sessionId = this.getSessionId();
+
     // Initialize the assistant
     this.init();
   }
@@ -26,6 +57,77 @@ class JarvisVoiceAssistant {
     this.loadVoices();
     this.checkBackendConnection();
     this.setupWakeWordDetection();
+    this.subscribePrices();
+  }
+
+  // Keep the price strip current from the backend watchlist; EventSource reconnects on its own
+  subscribePrices() {
+    if (!this.settings.livePrices || !window.EventSource) return;
+
+    const { stocks = [], crypto = [] } = this.settings.livePriceSymbols || {};
+    const params = new URLSearchParams();
+    if (stocks.length) params.set("stocks", stocks.join(","));
+    if (crypto.length) params.set("crypto", crypto.join(","));
+
+    this.priceSource = new EventSource(`${this.backendUrl}/prices/stream?${params}`);
+    this.priceSource.addEventListener("prices", (event) => {
+      const update = JSON.parse(event.data);
+      for (const quotes of [update.stock || {}, update.crypto || {}]) {
+        Object.assign(this.prices, quotes);
+      }
+      this.renderPrices();
+    });
+  }
+
+  renderPrices() {
+    const strip = document.getElementById("priceTicker");
+    if (!strip) return;
+
+    strip.hidden = false;
+    strip.innerHTML = "";
+    for (const data of Object.values(this.prices)) {
+      const change = data.change_percent ?? data.change_24h ?? 0;
+      const item = document.createElement("span");
+      item.className = `price ${change >= 0 ? "up" : "down"}`;
+      item.textContent = `${data.symbol} ${Number(data.price).toLocaleString(undefined, {
+        maximumFractionDigits: 2,
+      })} ${change >= 0 ? "▲" : "▼"}${Math.abs(change).toFixed(2)}%`;
+      strip.appendChild(item);
+    }
+  }
+
+  // Let the backend warm weather/quote caches while the user is still talking
+  schedulePrefetch(transcript) {
+    if (!this.settings.prefetchWhileSpeaking) return;
+
+    clearTimeout(this.prefetchTimer);
+    this.prefetchTimer = setTimeout(() => {
+      const text = transcript.trim();
+      if (!text || text === this.lastPrefetch) return;
+      this.lastPrefetch = text;
+
+      fetch(`${this.backendUrl}/prefetch`, {
+        method: "POST",
+        headers: {
+          "Content-Type": "application/json",
+        },
+        body: JSON.stringify({ text: text, session_id: this.sessionId }),
+      }).catch(() => {
+        // Best effort only; the final message is processed either way
+      });
+    }, 250);
+  }
+
+  getSessionId() {
+    let sessionId = sessionStorage.getItem("jarvisSessionId");
+    if (!sessionId) {
+      sessionId =
+        window.crypto && crypto.randomUUID
+          ? crypto.randomUUID()
+          : `${Date.now()}-${Math.random().toString(36).slice(2)}`;
+      sessionStorage.setItem("jarvisSessionId", sessionId);
+    }
+    return sessionId;
   }
 
   async checkMicrophonePermissions() {
@@ -221,9 +323,12 @@ class JarvisVoiceAssistant {
         // Show interim results to user
         if (interimTranscript) {
           this.updateStatus(`Hearing: "${interimTranscript}"`, "listening");
+          this.schedulePrefetch(interimTranscript);
         }
 
         if (finalTranscript) {
+          clearTimeout(this.prefetchTimer);
+          this.lastPrefetch = "";
           console.log("Final transcript:", finalTranscript);
           // Clear the timeout since we got speech
           if (this.recognitionTimeout) {
@@ -276,8 +381,102 @@ class JarvisVoiceAssistant {
         this.stopListening();
       };
     } else {
-      console.error("Speech recognition not supported");
-      this.updateStatus("Speech recognition not supported", "error");
+      console.log("Browser speech recognition not supported, checking the backend");
+    }
+  }
+
+  async startServerListening() {
+    if (this.isListening) return;
+
+    const wsUrl = `${this.backendUrl.replace(/^http/, "ws")}/audio?session_id=${encodeURIComponent(this.sessionId)}`;
+
+    try {
+      const stream = await navigator.mediaDevices.getUserMedia({ audio: true });
+      const audioContext = new (window.AudioContext ||
+        window.webkitAudioContext)({ sampleRate: 16000 });
+      const source = audioContext.createMediaStreamSource(stream);
+      const processor = audioContext.createScriptProcessor(4096, 1, 1);
+      const socket = new WebSocket(wsUrl);
+      socket.binaryType = "arraybuffer";
+
+      // Send 16-bit PCM frames as they are captured
+      processor.onaudioprocess = (event) => {
+        if (socket.readyState !== WebSocket.OPEN) return;
+        const input = event.inputBuffer.getChannelData(0);
+        const pcm = new Int16Array(input.length);
+        for (let i = 0; i < input.length; i++) {
+          pcm[i] = Math.max(-1, Math.min(1, input[i])) * 0x7fff;
+        }
+        socket.send(pcm.buffer);
+      };
+
+      socket.onmessage = (message) => {
+        this.handleAudioEvent(JSON.parse(message.data));
+      };
+
+      socket.onerror = () => {
+        this.updateStatus("Server speech recognition unavailable", "error");
+      };
+
+      socket.onclose = () => {
+        if (this.serverCapture && this.serverCapture.socket === socket) {
+          this.stopListening();
+        }
+      };
+
+      source.connect(processor);
+      processor.connect(audioContext.destination);
+      this.serverCapture = { stream, audioContext, socket };
+
+      this.isListening = true;
+      this.updateUI("listening");
+      this.updateStatus("Listening... Speak now!", "listening");
+      this.playBeep();
+    } catch (error) {
+      console.error("Error starting server recognition:", error);
+      this.updateStatus("Microphone not accessible. Please check permissions.", "error");
+    }
+  }
+
+  stopServerListening() {
+    const capture = this.serverCapture;
+    if (!capture) return;
+    this.serverCapture = null;
+
+    capture.stream.getTracks().forEach((track) => track.stop());
+    capture.audioContext.close();
+
+    // The backend finishes the current utterance, answers it, then closes the socket
+    if (capture.socket.readyState === WebSocket.OPEN) {
+      capture.socket.send(JSON.stringify({ type: "end" }));
+    }
+  }
+
+  handleAudioEvent(event) {
+    if (event.type === "partial") {
+      this.updateStatus(`Hearing: "${event.text}"`, "listening");
+      this.schedulePrefetch(event.text);
+    } else if (event.type === "final") {
+      clearTimeout(this.prefetchTimer);
+      this.lastPrefetch = "";
+      console.log("Final transcript:", event.text);
+      this.stopListening();
+      this.addMessage(event.text, "user");
+      this.updateStatus("Processing...", "processing");
+    } else if (event.type === "response") {
+      this.addMessage(event.response, "assistant");
+      if (this.settings.autoSpeak) {
+        this.speak(event.response);
+      }
+      if (event.action === "open_website" && event.url) {
+        window.open(event.url, "_blank");
+      }
+      if (!this.isSpeaking) {
+        this.updateStatus("Ready to assist", "ready");
+      }
+    } else if (event.type === "error") {
+      console.error("Server recognition error:", event.error);
+      this.updateStatus(event.error, "error");
     }
   }
 
@@ -444,6 +643,11 @@ class JarvisVoiceAssistant {
       const response = await fetch(`${this.backendUrl}/health`);
       if (response.ok) {
         this.updateConnectionStatus(true);
+        const health = await response.json();
+        this.serverRecognitionAvailable = Boolean(health.stt && health.stt_websocket);
+        if (!this.recognition && !this.serverRecognitionAvailable) {
+          this.updateStatus("Speech recognition not supported", "error");
+        }
       } else {
         this.updateConnectionStatus(false);
       }
@@ -519,8 +723,20 @@ class JarvisVoiceAssistant {
     }
   }
 
+  usesServerRecognition() {
+    return this.serverRecognitionAvailable && (this.settings.serverRecognition || !this.recognition);
+  }
+
   startListening() {
-    if (!this.recognition || this.isListening) return;
+    if (this.usesServerRecognition()) {
+      this.startServerListening();
+      return;
+    }
+    if (!this.recognition) {
+      this.updateStatus("Speech recognition not supported", "error");
+      return;
+    }
+    if (this.isListening) return;
 
     try {
       this.recognition.start();
@@ -533,6 +749,7 @@ class JarvisVoiceAssistant {
     if (this.recognition && this.isListening) {
       this.recognition.stop();
     }
+    this.stopServerListening();
 
     // Clear the timeout
     if (this.recognitionTimeout) {
@@ -550,35 +767,14 @@ class JarvisVoiceAssistant {
     this.updateStatus("Processing...", "processing");
 
     try {
-      const response = await fetch(`${this.backendUrl}/chat`, {
-        method: "POST",
-        headers: {
-          "Content-Type": "application/json",
-        },
-        body: JSON.stringify({ message: message }),
-      });
-
-      if (!response.ok) {
-        throw new Error(`HTTP error! status: ${response.status}`);
-      }
-
-      const data = await response.json();
-
-      if (data.error) {
-        throw new Error(data.error);
-      }
-
-      this.addMessage(data.response, "assistant");
+      const data = this.settings.streamResponses
+        ? await this.streamChat(message)
+        : await this.fetchChat(message);
 
       // Handle special actions
       if (data.action === "open_website" && data.url) {
         window.open(data.url, "_blank");
       }
-
-      // Speak the response if auto-speak is enabled
-      if (this.settings.autoSpeak) {
-        this.speak(data.response);
-      }
     } catch (error) {
       console.error("Error processing message:", error);
       const errorMessage =
@@ -590,12 +786,257 @@ class JarvisVoiceAssistant {
       }
     }
 
-    this.updateStatus("Ready to assist", "ready");
+    if (!this.isSpeaking) {
+      this.updateStatus("Ready to assist", "ready");
+    }
+  }
+
+  async fetchChat(message) {
+    const response = await fetch(`${this.backendUrl}/chat`, {
+      method: "POST",
+      headers: {
+        "Content-Type": "application/json",
+      },
+      body: JSON.stringify({ message: message, session_id: this.sessionId }),
+    });
+
+    if (!response.ok) {
+      throw new Error(`HTTP error! status: ${response.status}`);
+    }
+
+    const data = await response.json();
+
+    if (data.error) {
+      throw new Error(data.error);
+    }
+
+    this.addMessage(data.response, "assistant");
+
+    // Speak the response if auto-speak is enabled
+    if (this.settings.autoSpeak) {
+      this.speak(data.response);
+    }
+
+    return data;
+  }
+
+  async streamChat(message) {
+    // Decided once per request, so the browser never speaks what the server voices
+    const wantsServerAudio = this.settings.serverSpeech && this.settings.autoSpeak;
+    const response = await fetch(`${this.backendUrl}/chat/stream`, {
+      method: "POST",
+      headers: {
+        "Content-Type": "application/json",
+      },
+      body: JSON.stringify({
+        message: message,
+        session_id: this.sessionId,
+        audio: wantsServerAudio,
+      }),
+    });
+
+    if (!response.ok || !response.body) {
+      throw new Error(`HTTP error! status: ${response.status}`);
+    }
+
+    const messageText = this.addMessage("", "assistant");
+    let fullText = "";
+    let serverAudio = false;
+    let spokenUpTo = 0;
+    let result = null;
+
+    // Speak every complete sentence as soon as it has arrived
+    const speakCompleteSentences = (final) => {
+      if (!this.settings.autoSpeak || wantsServerAudio) return;
+      const pending = fullText.slice(spokenUpTo);
+      let end = final ? pending.length : 0;
+      if (!final) {
+        const boundary = /[\.!?]+\s/g;
+        let match;
+        while ((match = boundary.exec(pending)) !== null) {
+          end = match.index + match[0].length;
+        }
+      }
+      if (end > 0) {
+        this.queueSpeech(pending.slice(0, end));
+        spokenUpTo += end;
+      }
+    };
+
+    for await (const event of this.readEvents(response)) {
+      if (event.type === "error") {
+        throw new Error(event.error);
+      } else if (event.type === "delta") {
+        fullText += event.content;
+        messageText.textContent = fullText;
+        speakCompleteSentences(false);
+      } else if (event.type === "audio") {
+        serverAudio = true;
+        this.queueAudio(event);
+      } else if (event.type === "done") {
+        result = event;
+        fullText = event.response;
+        messageText.textContent = fullText;
+      }
+    }
+
+    if (!result) {
+      throw new Error("Stream ended without a response");
+    }
+
+    if (wantsServerAudio && !serverAudio) {
+      // The backend has no TTS engine, so fall back to the browser voice
+      this.queueSpeech(fullText);
+    } else {
+      speakCompleteSentences(true);
+    }
+    return result;
+  }
+
+  // Parse a newline-delimited JSON response body into events
+  async *readEvents(response) {
+    const reader = response.body.getReader();
+    const decoder = new TextDecoder();
+    let buffer = "";
+
+    while (true) {
+      const { value, done } = await reader.read();
+      if (done) break;
+
+      buffer += decoder.decode(value, { stream: true });
+      const lines = buffer.split("\n");
+      buffer = lines.pop();
+
+      for (const line of lines) {
+        if (line.trim()) {
+          yield JSON.parse(line);
+        }
+      }
+    }
+  }
+
+  queueAudio(event) {
+    this.speechQueue.push(event);
+    this.startSpeechQueue();
+  }
+
+  queueSpeech(text) {
+    // Split text into sentences for more consistent voice
+    const sentences = text.match(/[^\.!?]+(?:[\.!?]+|$)/g) || [text];
+    sentences.forEach((sentence) => {
+      if (sentence.trim()) {
+        this.speechQueue.push(sentence.trim());
+      }
+    });
+
+    this.startSpeechQueue();
+  }
+
+  startSpeechQueue() {
+    if (!this.isSpeaking) {
+      this.isSpeaking = true;
+      this.updateUI("speaking");
+      this.updateStatus("Speaking...", "speaking");
+      this.speakNextQueued();
+    }
+  }
+
+  speakNextQueued() {
+    if (this.speechQueue.length === 0 || !this.isSpeaking) {
+      this.speechQueue = [];
+      this.isSpeaking = false;
+      this.updateUI("idle");
+      this.updateStatus("Ready to assist", "ready");
+      return;
+    }
+
+    const next = this.speechQueue.shift();
+    if (typeof next !== "string") {
+      this.playAudioChunk(next);
+      return;
+    }
+
+    const utterance = new SpeechSynthesisUtterance(next);
+
+    // Use the same voice for all chunks
+    if (this.settings.voice) {
+      utterance.voice = this.settings.voice;
+    }
+
+    utterance.rate = this.settings.rate;
+    utterance.pitch = 1;
+    utterance.volume = 1;
+    utterance.lang = "en-US";
+
+    utterance.onend = () => {
+      // Small delay between chunks to prevent voice switching
+      setTimeout(() => this.speakNextQueued(), 50);
+    };
+
+    utterance.onerror = (event) => {
+      console.error("Chunk speech error:", event);
+      setTimeout(() => this.speakNextQueued(), 100);
+    };
+
+    this.synthesis.speak(utterance);
+  }
+
+  playAudioChunk(chunk) {
+    const audio = new Audio(`data:audio/${chunk.format};base64,${chunk.audio}`);
+    this.currentAudio = audio;
+
+    audio.onended = () => {
+      this.currentAudio = null;
+      this.speakNextQueued();
+    };
+
+    audio.onerror = (event) => {
+      console.error("Audio chunk error:", event);
+      this.currentAudio = null;
+      this.speakNextQueued();
+    };
+
+    audio.play().catch((error) => {
+      console.error("Audio playback error:", error);
+      this.currentAudio = null;
+      this.speakNextQueued();
+    });
+  }
+
+  // Fetch and play backend speech; falls back to the browser voice on failure
+  async speakOnServer(text) {
+    try {
+      const response = await fetch(`${this.backendUrl}/tts`, {
+        method: "POST",
+        headers: {
+          "Content-Type": "application/json",
+        },
+        body: JSON.stringify({ text: text }),
+      });
+
+      if (!response.ok || !response.body) {
+        throw new Error(`HTTP error! status: ${response.status}`);
+      }
+
+      for await (const event of this.readEvents(response)) {
+        this.queueAudio(event);
+      }
+    } catch (error) {
+      console.error("Server speech error:", error);
+      if (!this.isSpeaking) {
+        this.performSpeech(text);
+      }
+    }
   }
 
   speak(text) {
     if (!this.synthesis || this.isSpeaking) return;
 
+    if (this.settings.serverSpeech) {
+      this.speakOnServer(text);
+      return;
+    }
+
     // Cancel any ongoing speech
     this.synthesis.cancel();
 
@@ -723,7 +1164,12 @@ class JarvisVoiceAssistant {
 
   stopSpeaking() {
     if (this.synthesis && this.isSpeaking) {
+      this.speechQueue = [];
       this.synthesis.cancel();
+      if (this.currentAudio) {
+        this.currentAudio.pause();
+        this.currentAudio = null;
+      }
       this.isSpeaking = false;
       this.updateUI("idle");
       this.updateStatus("Speech stopped - Ready to assist", "ready");
@@ -753,6 +1199,9 @@ class JarvisVoiceAssistant {
 
     // Scroll to bottom
     chatMessages.scrollTop = chatMessages.scrollHeight;
+
+    // Return the text element so streamed responses can fill it in
+    return contentDiv.querySelector("p");
   }
 
   updateUI(state) {